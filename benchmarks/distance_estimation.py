@@ -0,0 +1,40 @@
+"""Size of the routing input with the distances of the locations versus only the coordinates, and time to parse it
+   and estimate the distances from the coordinates, versus the number of locations.
+   Run with python -m benchmarks.distance_estimation"""
+import json
+import timeit
+from benchmarks.instances import generate_routing_input
+from routing.services.input_parser import InputParser
+from routing.services.locations import LocationsService
+
+NUM_LOCATIONS = [100, 500, 2000]
+METHODS = ['haversine', 'equirectangular']
+REPEAT = 3
+
+
+def get_estimation_input(routing_input, method):
+    estimation_input = dict(routing_input, distance_estimation={'method': method, 'speeds': {'Moto': 40}})
+    estimation_input['locations'] = [{key: value for key, value in location.items() if key != 'distances'}
+                                     for location in routing_input['locations']]
+    return estimation_input
+
+
+def build_locations_service(text):
+    system_entities = InputParser(json.loads(text)).parse()
+    return LocationsService(system_entities.locations, system_entities.penalty_type,
+                            distance_estimation=system_entities.distance_estimation)
+
+
+def main():
+    print(f'{"locations":>9} ' + ' '.join(f'{name:>23}' for name in ['distances'] + METHODS))
+    for num_locations in NUM_LOCATIONS:
+        routing_input = generate_routing_input(num_locations)
+        texts = [json.dumps(routing_input)] + [json.dumps(get_estimation_input(routing_input, method))
+                                               for method in METHODS]
+        times = [min(timeit.repeat(lambda: build_locations_service(text), number=1, repeat=REPEAT)) for text in texts]
+        print(f'{num_locations:>9} ' + ' '.join(f'{len(text) / 2 ** 20:>10.2f}MB {time * 1000:>8.1f}ms'
+                                                for text, time in zip(texts, times)))
+
+
+if __name__ == '__main__':
+    main()
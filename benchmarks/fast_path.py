@@ -0,0 +1,45 @@
+"""Time and cost of the fast path versus the OR-Tools search with the interactive preset, on instances one vehicle
+   can serve, versus the number of stops.
+   Run with python -m benchmarks.fast_path"""
+import copy
+import time
+from benchmarks.instances import generate_routing_input
+from routing.app import solve, solve_fast_path
+from routing.services.input_parser import InputParser
+
+NUM_STOPS = [5, 10, 20, 30]
+SEEDS = range(3)
+
+
+def generate_single_vehicle_input(num_stops, seed):
+    routing_input = generate_routing_input(num_stops + 1, num_vehicles=1, seed=seed, spread=0.05)
+    for location in routing_input['locations']:
+        location['accessibility'] = ['Carro', 'Moto']
+    routing_input['vehicles'][0]['types'] = ['Carro', 'Moto']
+    # the time limit of the preset
+    del routing_input['search_time_limit']
+    routing_input['search_parameters'] = {'preset': 'interactive'}
+    return routing_input
+
+
+def timed(function, routing_input):
+    system_entities = InputParser(copy.deepcopy(routing_input)).parse()
+    start = time.perf_counter()
+    solution = function(system_entities)
+    return solution, time.perf_counter() - start
+
+
+def main():
+    print(f'{"stops":>5} {"seed":>4} {"fast path":>12} {"cost":>6} {"method":>9} {"or-tools":>12} {"cost":>6}')
+    for num_stops in NUM_STOPS:
+        for seed in SEEDS:
+            routing_input = generate_single_vehicle_input(num_stops, seed)
+            fast_path_solution, fast_path_time = timed(solve_fast_path, routing_input)
+            solution, solve_time = timed(solve, routing_input)
+            print(f'{num_stops:>5} {seed:>4} {fast_path_time * 1000:>10.1f}ms '
+                  f'{fast_path_solution.objective_cost:>6} {fast_path_solution.metadata["fast_path"]["method"]:>9} '
+                  f'{solve_time * 1000:>10.1f}ms {solution.objective_cost:>6}')
+
+
+if __name__ == '__main__':
+    main()
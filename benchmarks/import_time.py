@@ -0,0 +1,28 @@
+"""Time to import the solver, the command line and the web application on a fresh interpreter.
+   Run with python -m benchmarks.import_time"""
+import subprocess
+import sys
+
+MODULES = ['routing', 'routing.app', 'routing.cli', 'routing.api']
+REPEAT = 5
+SCRIPT = ('import sys, time\n'
+          'start = time.perf_counter()\n'
+          'import {module}\n'
+          'print(time.perf_counter() - start, "flask" in sys.modules)')
+
+
+def import_time(module):
+    output = subprocess.run([sys.executable, '-c', SCRIPT.format(module=module)],
+                            capture_output=True, text=True, check=True).stdout.split()
+    return float(output[0]), output[1] == 'True'
+
+
+def main():
+    print(f'{"module":<12} {"import":>10} {"flask":>6}')
+    for module in MODULES:
+        times, flask_imported = zip(*(import_time(module) for _ in range(REPEAT)))
+        print(f'{module:<12} {min(times) * 1000:>8.1f}ms {str(flask_imported[0]):>6}')
+
+
+if __name__ == '__main__':
+    main()
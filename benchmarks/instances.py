@@ -0,0 +1,41 @@
+import random
+
+
+def get_distance(from_coordinates, to_coordinates):
+    return int(300 * (abs(from_coordinates[0] - to_coordinates[0]) + abs(from_coordinates[1] - to_coordinates[1]))) + 1
+
+
+def generate_routing_input(num_locations, num_vehicles=10, seed=0, distance_matrix=False, spread=0.5):
+    """Routing input with random locations around the depot and the distances between every pair of them,
+       in the distances of the locations or, if distance_matrix, in the compact distance matrix.
+       Locations are spread over a square with sides of spread degrees."""
+    rnd = random.Random(seed)
+    coordinates = [(rnd.uniform(-23, -23 + spread), rnd.uniform(-43.6, -43.6 + spread)) for _ in range(num_locations)]
+    names = ['Deposito'] + [f'Ponto {index}' for index in range(1, num_locations)]
+    locations = []
+    for index, name in enumerate(names):
+        latitude, longitude = coordinates[index]
+        locations.append({
+            'name': name,
+            'is_depot': index == 0,
+            'demand': 0 if index == 0 else rnd.randint(1, 50),
+            'service_time': 0 if index == 0 else 5,
+            'time_windows': [{'start': 360, 'end': 1260}] if index == 0 else [{'start': 480, 'end': 720},
+                                                                              {'start': 780, 'end': 1080}],
+            'accessibility': ['Carro', 'Moto'] if index % 3 else ['Carro'],
+            'coordinates': {'latitude': latitude, 'longitude': longitude}
+        })
+        if not distance_matrix:
+            locations[-1]['distances'] = [{'name': names[other],
+                                           'distance': get_distance(coordinates[index], coordinates[other])}
+                                          for other in range(num_locations) if other != index]
+    vehicles = [{'name': f'Veiculo {index}',
+                 'types': ['Carro'] if index % 2 else ['Carro', 'Moto'],
+                 'max_load_weight': 2000,
+                 'journey': 600} for index in range(num_vehicles)]
+    routing_input = {'locations': locations, 'vehicles': vehicles, 'search_time_limit': 1}
+    if distance_matrix:
+        routing_input['distance_matrix'] = [[0 if from_coordinates is to_coordinates
+                                             else get_distance(from_coordinates, to_coordinates)
+                                             for to_coordinates in coordinates] for from_coordinates in coordinates]
+    return routing_input
@@ -0,0 +1,50 @@
+"""Time to decode and parse the routing input with the distances of the locations, the distance matrix or the
+   catalogue ids of a matrix store, versus the number of locations.
+   Run with python -m benchmarks.matrix_store"""
+import json
+import tempfile
+import timeit
+import numpy
+from benchmarks.instances import generate_routing_input
+from routing.services import input_parser
+from routing.services.input_parser import InputParser
+from routing.services.matrix_store import MatrixStore
+
+CATALOGUE_SIZE = 10_000
+NUM_LOCATIONS = [100, 500, 1000]
+REPEAT = 3
+
+
+def get_catalogue_input(routing_input, rnd):
+    catalogue_input = dict(routing_input)
+    catalogue_ids = rnd.choice(CATALOGUE_SIZE, len(routing_input['locations']), replace=False)
+    catalogue_input['locations'] = [{**location, 'catalogue_id': int(catalogue_id)}
+                                    for location, catalogue_id in zip(routing_input['locations'], catalogue_ids)]
+    for location in catalogue_input['locations']:
+        del location['distances']
+    return catalogue_input
+
+
+def parse(text):
+    return InputParser(json.loads(text)).parse()
+
+
+def main():
+    rnd = numpy.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = MatrixStore(f'{directory}/catalogue.npy')
+        store.write(rnd.integers(1, 300, (CATALOGUE_SIZE, CATALOGUE_SIZE), dtype=numpy.int32))
+        input_parser.matrix_store = store
+        print(f'catalogue of {CATALOGUE_SIZE} locations, {CATALOGUE_SIZE ** 2 * 4 / 2 ** 20:.0f}MB')
+        print(f'{"locations":>9} {"distances":>12} {"matrix":>12} {"catalogue":>12}')
+        for num_locations in NUM_LOCATIONS:
+            routing_input = generate_routing_input(num_locations)
+            matrix_input = generate_routing_input(num_locations, distance_matrix=True)
+            texts = [json.dumps(routing_input), json.dumps(matrix_input),
+                     json.dumps(get_catalogue_input(routing_input, rnd))]
+            times = [min(timeit.repeat(lambda: parse(text), number=1, repeat=REPEAT)) for text in texts]
+            print(f'{num_locations:>9} ' + ' '.join(f'{time * 1000:>10.1f}ms' for time in times))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Time to parse the routing input and build the OR-Tools model, without searching, versus the number of locations.
+   Run with python -m benchmarks.model_build"""
+import timeit
+from benchmarks.instances import generate_routing_input
+from routing.services.input_parser import InputParser
+from routing.services.locations import LocationsService
+from routing.services.vehicles import VehiclesService
+from routing.services.ortools import ORToolsService
+from routing.services.routing import RoutingService
+
+NUM_LOCATIONS = [100, 500, 2000]
+PENALTY_TYPES = ['distancia deposito', 'distancia maxima', 'demanda']
+REPEAT = 3
+
+
+def build_model(routing_input):
+    system_entities = InputParser(routing_input).parse()
+    locations_service = LocationsService(system_entities.locations,
+                                         system_entities.penalty_type,
+                                         system_entities.max_reload)
+    vehicles_service = VehiclesService(system_entities.vehicles)
+    ortools_service = ORToolsService(vehicles_service, locations_service)
+    return RoutingService(locations_service, vehicles_service, ortools_service, system_entities.search_time_limit)
+
+
+def main():
+    print('locations ' + ' '.join(f'{penalty_type:>20}' for penalty_type in PENALTY_TYPES))
+    for num_locations in NUM_LOCATIONS:
+        routing_input = generate_routing_input(num_locations, distance_matrix=True)
+        times = []
+        for penalty_type in PENALTY_TYPES:
+            routing_input['drop_penalty_type'] = penalty_type
+            times.append(min(timeit.repeat(lambda: build_model(routing_input), number=1, repeat=REPEAT)))
+        print(f'{num_locations:>9} ' + ' '.join(f'{time * 1000:>18.1f}ms' for time in times))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Model size and solution of the reload models: depot copies shared by every vehicle versus depot copies of each
+   vehicle, on instances the vehicles can only serve reloading.
+   Run with python -m benchmarks.reload"""
+import copy
+import time
+from benchmarks.instances import generate_routing_input
+from routing.app import solve
+from routing.services.input_parser import InputParser
+
+# (locations, vehicles), a vehicle carries about 6 locations at once
+INSTANCES = [(120, 10), (400, 40)]
+MAX_LOAD_WEIGHT = 150
+SEARCH_TIME_LIMIT = 5
+# (reload_model, max_reload), a shared max_reload is for the whole fleet, a vehicle one is for each vehicle
+CASES = [('shared', 10), ('shared', 40), ('vehicle', 1), ('vehicle', 2), ('vehicle', 10)]
+
+
+def generate_reload_input(num_locations, num_vehicles):
+    routing_input = generate_routing_input(num_locations, num_vehicles=num_vehicles, distance_matrix=True,
+                                           spread=0.1)
+    for vehicle in routing_input['vehicles']:
+        vehicle['max_load_weight'] = MAX_LOAD_WEIGHT
+    routing_input['search_time_limit'] = SEARCH_TIME_LIMIT
+    routing_input['use_cache'] = False
+    return routing_input
+
+
+def get_reloads(solution):
+    return sum(route_step.location.is_depot for route_plan in solution.routes_plan
+               for route_step in route_plan.vehicle_route[1:-1])
+
+
+def run_case(routing_input, num_vehicles, reload_model, max_reload):
+    routing_input = copy.deepcopy(routing_input)
+    routing_input['reload_model'] = reload_model
+    routing_input['max_reload'] = max_reload
+    system_entities = InputParser(routing_input).parse()
+    num_locations = len(system_entities.locations)
+    start = time.perf_counter()
+    solution = solve(system_entities)
+    build_time = time.perf_counter() - start - solution.timings['search']
+    # the copies are appended to the locations of the entities
+    num_copies = len(system_entities.locations) - num_locations
+    # a shared copy can be visited by every vehicle
+    vehicle_copy_pairs = num_copies * num_vehicles if reload_model == 'shared' else num_copies
+    print(f'{num_locations:>9} {num_vehicles:>8} {reload_model:>7} {max_reload:>10} {num_copies:>6} '
+          f'{vehicle_copy_pairs:>18} {build_time * 1000:>7.1f}ms {solution.objective_cost:>8} '
+          f'{len(solution.get_dropped_locations()):>7} {get_reloads(solution):>7}')
+
+
+def main():
+    print(f'{"locations":>9} {"vehicles":>8} {"model":>7} {"max_reload":>10} {"copies":>6} {"vehicle-copy pairs":>18} '
+          f'{"build":>9} {"cost":>8} {"dropped":>7} {"reloads":>7}')
+    for num_locations, num_vehicles in INSTANCES:
+        routing_input = generate_reload_input(num_locations, num_vehicles)
+        for reload_model, max_reload in CASES:
+            run_case(routing_input, num_vehicles, reload_model, max_reload)
+
+
+if __name__ == '__main__':
+    main()
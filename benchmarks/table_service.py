@@ -0,0 +1,60 @@
+"""Time to build the distance matrix of the model from a table service: the gateway fetching the matrix and inlining
+   it on the distances of the input versus the locations service fetching it, with and without the rows cached,
+   versus the number of locations. The table service is the local stub of the tests.
+   Run with python -m benchmarks.table_service"""
+import json
+import time
+from benchmarks.instances import generate_routing_input
+from routing.services import locations
+from routing.services.input_parser import InputParser
+from routing.services.locations import LocationsService
+from routing.services.table_service import TableService
+from test.table_service_stub import TableServiceStub
+
+NUM_LOCATIONS = [100, 500, 1000]
+
+
+def get_coordinates(routing_input):
+    return [(location['coordinates']['latitude'], location['coordinates']['longitude'])
+            for location in routing_input['locations']]
+
+
+def build_locations_service(text):
+    system_entities = InputParser(json.loads(text)).parse()
+    return LocationsService(system_entities.locations, system_entities.penalty_type,
+                            distance_estimation=system_entities.distance_estimation)
+
+
+def get_gateway_time(routing_input, url):
+    start = time.perf_counter()
+    matrix = TableService(url).get_matrix(get_coordinates(routing_input)).tolist()
+    names = [location['name'] for location in routing_input['locations']]
+    gateway_input = dict(routing_input, locations=[
+        dict(location, distances=[{'name': name, 'distance': distance} for name, distance in zip(names, row)])
+        for location, row in zip(routing_input['locations'], matrix)])
+    build_locations_service(json.dumps(gateway_input))
+    return time.perf_counter() - start
+
+
+def get_service_time(routing_input):
+    table_input = dict(routing_input, distance_estimation={'method': 'table'},
+                       locations=[{key: value for key, value in location.items() if key != 'distances'}
+                                  for location in routing_input['locations']])
+    start = time.perf_counter()
+    build_locations_service(json.dumps(table_input))
+    return time.perf_counter() - start
+
+
+def main():
+    with TableServiceStub(max_table_size=100) as stub:
+        print(f'{"locations":>9} {"gateway":>10} {"service":>10} {"cached":>10}')
+        for num_locations in NUM_LOCATIONS:
+            routing_input = generate_routing_input(num_locations)
+            gateway_time = get_gateway_time(routing_input, stub.url)
+            locations.table_service = TableService(stub.url)
+            times = [gateway_time, get_service_time(routing_input), get_service_time(routing_input)]
+            print(f'{num_locations:>9} ' + ' '.join(f'{time * 1000:>8.1f}ms' for time in times))
+
+
+if __name__ == '__main__':
+    main()
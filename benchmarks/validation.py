@@ -0,0 +1,36 @@
+"""Validation time of the routing input versus the number of locations.
+   Run with python -m benchmarks.validation"""
+import os
+import timeit
+import jsonschema
+import yaml
+from benchmarks.instances import generate_routing_input
+from routing.services.schema_validator import SchemaValidator, inline_refs
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'routing', 'open_api', 'routing.yaml')
+NUM_LOCATIONS = [100, 250, 500]
+REPEAT = 3
+
+
+def get_flasgger_validate():
+    """jsonschema.validate on the definition, as the flasgger validation does on every request."""
+    with open(SCHEMA_PATH) as file:
+        definitions = yaml.safe_load(file)['definitions']
+    schema = inline_refs(definitions['Routing'], definitions)
+    return lambda data: jsonschema.validate(data, schema)
+
+
+def main():
+    validators = {'flasgger': get_flasgger_validate()}
+    for distances_validation in ['full', 'sampled', 'structural']:
+        validators[distances_validation] = SchemaValidator(SCHEMA_PATH, 'Routing', distances_validation).validate
+    print('locations ' + ' '.join(f'{name:>12}' for name in validators))
+    for num_locations in NUM_LOCATIONS:
+        routing_input = generate_routing_input(num_locations)
+        times = [min(timeit.repeat(lambda: validate(routing_input), number=1, repeat=REPEAT))
+                 for validate in validators.values()]
+        print(f'{num_locations:>9} ' + ' '.join(f'{time * 1000:>10.1f}ms' for time in times))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+"""Gunicorn settings, run with gunicorn -c gunicorn.conf.py
+   The application is imported and warmed up on the master process before the workers are forked,
+   the workers share the imported modules and the parsed open api specs copy on write and are ready on start."""
+import gc
+import os
+
+wsgi_app = 'routing.api:app'
+bind = f'0.0.0.0:{os.environ.get("PORT", 8080)}'
+# read by routing.settings too, it divides the solver workers between the API workers
+workers = int(os.environ.setdefault('GUNICORN_WORKERS', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+preload_app = True
+
+
+def when_ready(server):
+    from routing.app import warm_up
+    warm_up()
+    # objects created so far are never collected, the collector doesn't touch their pages on the workers
+    gc.collect()
+    gc.freeze()
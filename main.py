@@ -1,4 +1,7 @@
-from routing import app
+import threading
+from routing.api import app
+from routing.app import warm_up
 
 if __name__ == '__main__':
+    threading.Thread(target=warm_up, daemon=True).start()
     app.run(debug=True)
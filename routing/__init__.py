@@ -1 +1,10 @@
-from routing.api import app  # noqa: F401
+import importlib
+
+# imported on first access, the solver (routing.app) is used without importing the web stack (routing.api)
+SUBMODULES = ('api', 'app', 'cli', 'entities', 'services', 'settings')
+
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
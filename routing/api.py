@@ -1,39 +1,132 @@
 
-from flask import Flask, request, Response, abort
+from flask import Flask, request, Response, abort, stream_with_context
 import json
+import os
+import yaml
 from flask_restful import Resource
 from flask_restful import Api
 from flasgger import Swagger, swag_from
-from routing.app import routing
+from routing.app import routing, routing_batch, routing_to_json, timings_histograms, warm_up_done
+from routing.entities.exception import (BatchLimitError, JobNotFoundError, JobQueueFullError, SchemaValidationError,
+                                        INPUT_ERRORS)
+from routing.services.jobs import JobsService
 from routing.services.logging import logger
-from routing.settings import APP_NAME
+from routing.services.schema_validator import SchemaValidator, compile_schema
+from routing.services.timings import Timings
+from routing.settings import (APP_NAME, SOLVER_WORKERS, SOLVER_QUEUE_SIZE, FINISHED_JOBS_RETENTION, JOBS_PATH,
+                              JOB_TIMEOUT, BATCH_DEADLINE)
 
 app = Flask(APP_NAME)
 api = Api(app=app, prefix='/v1')
 swagger = Swagger(app, template_file='open_api/template.yaml')
+jobs_service = JobsService(routing_to_json, SOLVER_WORKERS, SOLVER_QUEUE_SIZE, FINISHED_JOBS_RETENTION, JOBS_PATH,
+                           JOB_TIMEOUT)
+routing_validator = SchemaValidator(os.path.join(os.path.dirname(__file__), 'open_api/routing.yaml'), 'Routing')
+with open(os.path.join(os.path.dirname(__file__), 'open_api/routing_batch.yaml')) as file:
+    routing_batch_schema = yaml.safe_load(file)['definitions']['RoutingBatch']
+# the problems are validated one by one by the routing validator, the errors have their index on the path
+routing_batch_schema['properties']['problems']['items'] = {'type': 'object'}
+validate_routing_batch = compile_schema(routing_batch_schema)
 
 
-def swag_error_handler(exception_error, data, schema):
-    logger.error(exception_error)
-    exception_message = str(exception_error).split('\n')
-    exception_response = (f"Open API schema validation error. {exception_message[0]}. {exception_message[2][:-1]}. "
-                          "See log for more information.")
+def abort_validation_error(message, path):
+    path_text = '/'.join(path)
     response = {
         'status': 'ERROR',
-        'message': exception_response
-
+        'message': f'Open API schema validation error. {message} at /{path_text}.',
+        'path': path
     }
     abort(Response(json.dumps(response), status=400))
 
 
+def validate_routing_input(input_json, path=()):
+    timings = Timings()
+    try:
+        with timings.measure('validation'):
+            routing_validator.validate(input_json)
+    except SchemaValidationError as e:
+        logger.error(f'{e} at {list(path) + e.path}')
+        abort_validation_error(e, list(path) + e.path)
+    finally:
+        timings_histograms.observe(timings.phases)
+
+
+def validate_routing_batch_input(batch_json):
+    try:
+        validate_routing_batch(batch_json)
+    except SchemaValidationError as e:
+        logger.error(f'{e} at {e.path}')
+        abort_validation_error(e, e.path)
+    for index, problem in enumerate(batch_json['problems']):
+        validate_routing_input(problem, ['problems', str(index)])
+
+
+@app.route('/metrics')
+def metrics():
+    """Histograms of the phases durations of the requests served by this process, in the Prometheus format."""
+    return Response(timings_histograms.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/ready')
+def ready():
+    """Ready once the warm up solve finished, the first requests would pay the OR Tools initialization before."""
+    if not warm_up_done.is_set():
+        return Response(json.dumps({'status': 'WARMING_UP'}), status=503, mimetype='application/json')
+    return {'status': 'READY'}
+
+
 class RouteOptimizer(Resource):
-    @swag_from('open_api/routing.yaml', definition='Routing',
-               validation=True,
-               validation_error_handler=swag_error_handler)
+    @swag_from('open_api/routing.yaml', definition='Routing')
     def get(self):
         input_json = request.json
-        solution = routing(input_json)
+        validate_routing_input(input_json)
+        try:
+            solution = routing(input_json)
+        except INPUT_ERRORS as e:
+            logger.error(e)
+            return {'status': 'ERROR', 'message': str(e)}, 400
         return solution.to_json(), 200
 
 
+class RoutingBatch(Resource):
+    @swag_from('open_api/routing_batch.yaml')
+    def post(self):
+        batch_json = request.json
+        validate_routing_batch_input(batch_json)
+        # started before the response, the errors of the problems and a refused batch have their status code
+        try:
+            results = routing_batch(batch_json['problems'], batch_json.get('deadline', BATCH_DEADLINE))
+        except BatchLimitError as e:
+            return {'status': 'ERROR', 'message': str(e)}, 429
+        except INPUT_ERRORS as e:
+            logger.error(e)
+            return {'status': 'ERROR', 'message': str(e)}, 400
+        lines = (json.dumps(result) + '\n' for result in results)
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+
+class RoutingJobs(Resource):
+    @swag_from('open_api/routing_jobs.yaml')
+    def post(self):
+        validate_routing_input(request.json)
+        try:
+            job = jobs_service.submit(request.json)
+        except JobQueueFullError as e:
+            return {'status': 'ERROR', 'message': str(e)}, 429
+        return job.to_json(), 202
+
+
+class RoutingJob(Resource):
+    @swag_from('open_api/routing_job.yaml')
+    def get(self, job_id):
+        try:
+            job = jobs_service.get_job(job_id)
+        except JobNotFoundError:
+            return {'status': 'ERROR', 'message': f'Job {job_id} not found.'}, 404
+        return job.to_json(), 200
+
+
 api.add_resource(RouteOptimizer, '/routing')
+api.add_resource(RoutingBatch, '/routing/batch')
+api.add_resource(RoutingJobs, '/routing/jobs')
+api.add_resource(RoutingJob, '/routing/jobs/<string:job_id>')
@@ -1,3 +1,7 @@
+import threading
+import time
+import yaml
+from typing import Dict, Iterator, List, Optional
 from routing.entities.exception import InvalidSolutionError
 from routing.services.logging import logger
 from routing.services.locations import LocationsService
@@ -6,23 +10,149 @@ from routing.services.routing import RoutingService
 from routing.services.ortools import ORToolsService
 from routing.services.input_parser import InputParser
 from routing.services.solution_verifier import SolutionVerifier
+from routing.services.cache import SolutionCache
+from routing.services.portfolio import PortfolioService
+from routing.services.decomposition import DecompositionService
+from routing.services.fast_path import FastPathService
+from routing.services.batch import BatchService
+from routing.services.timings import Timings, TimingsHistograms
+from routing.entities.routing_solution import RoutingSolution, RoutingSolutionStatus, CachedRoutingSolution
+from routing.entities.search_strategy import SearchStrategy
+from routing.entities.system_entities import SystemEntities
+from routing.settings import (SOLUTION_CACHE_SIZE, SOLUTION_CACHE_PATH, SOLUTION_CACHE_TTL, SOLVER_WORKERS,
+                              TIMINGS_BUCKETS, FAST_PATH_MAX_STOPS, WARM_UP_INPUT_PATH, WARM_UP_SEARCH_TIME_LIMIT,
+                              BATCH_DEADLINE, MAX_CONCURRENT_BATCHES)
 
+solution_cache = SolutionCache(SOLUTION_CACHE_SIZE, SOLUTION_CACHE_PATH, SOLUTION_CACHE_TTL)
+batch_slots = threading.BoundedSemaphore(MAX_CONCURRENT_BATCHES)
+timings_histograms = TimingsHistograms('routing_phase_seconds', TIMINGS_BUCKETS)
+warm_up_done = threading.Event()
 
-def routing(input_json):
-    input_parser = InputParser(input_json=input_json)
-    system_entities = input_parser.parse()
-    locations_service = LocationsService(system_entities.locations,
-                                         system_entities.penalty_type,
-                                         system_entities.max_reload)
-    vehicles_service = VehiclesService(system_entities.vehicles)
-    ortools_service = ORToolsService(vehicles_service, locations_service)
+
+def solve(system_entities: SystemEntities, search_strategy: SearchStrategy = None) -> RoutingSolution:
+    """Solution with the timings of the model build and search phases."""
+    timings = Timings()
+    with timings.measure('services'):
+        vehicles_service = VehiclesService(system_entities.vehicles)
+        vehicles_reloads = None
+        num_depot_copies = system_entities.max_reload
+        if system_entities.reload_model == 'vehicle':
+            vehicles_reloads = vehicles_service.get_vehicles_reloads(system_entities.locations,
+                                                                     system_entities.max_reload)
+            num_depot_copies = sum(vehicles_reloads)
+        locations_service = LocationsService(system_entities.locations,
+                                             system_entities.penalty_type,
+                                             num_depot_copies,
+                                             system_entities.distance_estimation)
+        ortools_service = ORToolsService(vehicles_service, locations_service)
     routing_service = RoutingService(locations_service, vehicles_service,
                                      ortools_service,
-                                     system_entities.search_time_limit)
+                                     system_entities.search_time_limit,
+                                     system_entities.initial_routes,
+                                     search_strategy,
+                                     timings,
+                                     system_entities.stopping_criteria,
+                                     system_entities.search_parameters,
+                                     vehicles_reloads)
     routing_service.start()
     # routing_service.print_solution()
     solution = routing_service.get_solution()
+    solution.timings = timings.to_json()
+    return solution
+
+
+def solve_fast_path(system_entities: SystemEntities) -> Optional[RoutingSolution]:
+    """Solution found without the solver for the instances only one vehicle of the fleet can serve.
+       None if the instance is not eligible or the solution fails the verification, the solver is used then."""
+    # the stops of the depot copies are not counted, the fast path doesn't reload
+    num_stops = sum(not location.is_depot for location in system_entities.locations)
+    if system_entities.initial_routes or num_stops > FAST_PATH_MAX_STOPS:
+        return None
+    locations_service = LocationsService(system_entities.locations, system_entities.penalty_type,
+                                         distance_estimation=system_entities.distance_estimation)
+    vehicles_service = VehiclesService(system_entities.vehicles)
+    solution = FastPathService(locations_service, vehicles_service).solve()
+    if solution is None:
+        return None
     solution_verifier = SolutionVerifier(system_entities, solution)
-    # verify solution changes the solution status and message if needed.
     solution_verifier.verify_solution()
+    if solution.status != RoutingSolutionStatus.SUCCESS:
+        logger.warning('Fast path solution is invalid, solving with OR Tools: %s', solution.message)
+        return None
     return solution
+
+
+def set_timings(system_entities: SystemEntities, solution: RoutingSolution, timings: Timings, start):
+    """Records the request timings on the histograms, they are kept on the solution only if requested."""
+    timings.add('total', time.perf_counter() - start)
+    timings_histograms.observe(timings.phases)
+    solution.timings = timings.to_json() if system_entities.timings else {}
+
+
+def routing(input_json):
+    start = time.perf_counter()
+    timings = Timings()
+    with timings.measure('parse'):
+        input_parser = InputParser(input_json=input_json)
+        system_entities = input_parser.parse()
+    if system_entities.use_cache:
+        with timings.measure('cache'):
+            # the key must be taken before the services change the entities, e.g. adding depot copies
+            cache_key = solution_cache.get_key(system_entities)
+            solution_json = solution_cache.get(cache_key)
+        if solution_json is not None:
+            logger.info('Solution found on cache %s', cache_key)
+            # the timings are of this request
+            solution = CachedRoutingSolution(solution_json)
+            set_timings(system_entities, solution, timings, start)
+            return solution
+    with timings.measure('solve'):
+        if system_entities.decomposition.enabled:
+            decomposition_service = DecompositionService(solve, system_entities, SOLVER_WORKERS)
+            solution = decomposition_service.start()
+        elif system_entities.portfolio:
+            portfolio_service = PortfolioService(solve, system_entities, system_entities.portfolio)
+            solution = portfolio_service.start()
+        else:
+            with timings.measure('fast_path'):
+                solution = solve_fast_path(system_entities)
+            if solution is None:
+                solution = solve(system_entities)
+    # phases of the solve, of the best strategy or of the first cluster if it was run in parallel
+    timings.update(solution.timings)
+    with timings.measure('verify'):
+        solution_verifier = SolutionVerifier(system_entities, solution)
+        # verify solution changes the solution status and message if needed.
+        solution_verifier.verify_solution()
+    set_timings(system_entities, solution, timings, start)
+    if system_entities.use_cache and solution.status == RoutingSolutionStatus.SUCCESS:
+        # the timings are of this request
+        solution_cache.set(cache_key, {key: value for key, value in solution.to_json().items() if key != 'timings'})
+    return solution
+
+
+def routing_to_json(input_json):
+    """Solves and serializes in the same process, used by the background solver workers."""
+    solution = routing(input_json)
+    return solution.to_json()
+
+
+def routing_batch(inputs: List[Dict], deadline=BATCH_DEADLINE, max_workers=SOLVER_WORKERS) -> Iterator[Dict]:
+    """Solutions of independent routing inputs, solved in parallel within the deadline (seconds).
+       They are yielded as they finish, with the index of the input. Raises BatchLimitError while
+       MAX_CONCURRENT_BATCHES batches are running."""
+    batch_service = BatchService(routing_to_json, max_workers, deadline, batch_slots)
+    return batch_service.solve(inputs)
+
+
+def warm_up(input_path=WARM_UP_INPUT_PATH):
+    """Solves the bundled example once and marks the process as ready.
+       The first solve of a process pays the initialization of OR Tools, on the preloaded gunicorn master
+       it is paid before the workers are forked and they start warm."""
+    with open(input_path) as file:
+        input_json = yaml.safe_load(file)
+    input_json['search_time_limit'] = WARM_UP_SEARCH_TIME_LIMIT
+    # solved without routing(), the cache and the histograms of the requests are left untouched
+    solution = solve(InputParser(input_json=input_json).parse())
+    logger.info('Warm up solve finished with status %s', solution.status.name)
+    warm_up_done.set()
@@ -0,0 +1,105 @@
+"""Command line solver, without the web stack.
+   python -m routing solve [input ...] reads each routing input, in json or yaml, from the files or from
+   the standard input (no files or -) and writes the solutions as json, one per line.
+   python -m routing matrix-store build source replaces the catalogue matrix store with the matrix of the source,
+   python -m routing matrix-store info prints the number of locations of the store."""
+import argparse
+import json
+import os
+import sys
+import numpy
+import yaml
+from routing.app import routing
+from routing.entities.exception import MatrixStoreError, SchemaValidationError, INPUT_ERRORS
+from routing.services.matrix_store import MatrixStore
+from routing.services.schema_validator import SchemaValidator
+from routing.settings import MATRIX_STORE_PATH
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'open_api/routing.yaml')
+
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser(prog='python -m routing', description='Vehicle routing solver.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    solve_parser = subparsers.add_parser('solve', help='solve routing inputs and write the solutions as json')
+    solve_parser.add_argument('inputs', nargs='*', default=['-'],
+                              help='json or yaml input files, - or none for the standard input')
+    solve_parser.add_argument('--no-validate', dest='validate', action='store_false',
+                              help='skip the open api schema validation of the inputs')
+    solve_parser.add_argument('--indent', type=int, default=None, help='indentation of the json solutions')
+    store_parser = subparsers.add_parser('matrix-store', help='manage the catalogue matrix store')
+    store_parser.add_argument('action', choices=['build', 'info'],
+                              help='build: replace the store with the source matrix, info: describe the store')
+    store_parser.add_argument('source', nargs='?', default='-',
+                              help='.npy file or json or yaml list of rows, - or none for the standard input')
+    store_parser.add_argument('--store', default=MATRIX_STORE_PATH,
+                              help='path of the store, defaults to MATRIX_STORE_PATH')
+    return parser
+
+
+def read_input(path):
+    if path == '-':
+        text = sys.stdin.read()
+    else:
+        with open(path) as file:
+            text = file.read()
+    try:
+        return json.loads(text)
+    except ValueError:
+        # yaml is a superset of json but much slower to parse, it is the fallback
+        return yaml.safe_load(text)
+
+
+def solve(inputs, validate, indent, output) -> int:
+    """Writes the solution of each input, returns 1 if any input is invalid."""
+    validator = SchemaValidator(SCHEMA_PATH, 'Routing') if validate else None
+    exit_code = 0
+    for path in inputs:
+        input_json = read_input(path)
+        if validator is not None:
+            try:
+                validator.validate(input_json)
+            except SchemaValidationError as e:
+                print(f'{path}: {e} at /{"/".join(e.path)}', file=sys.stderr)
+                exit_code = 1
+                continue
+        try:
+            solution = routing(input_json)
+        except INPUT_ERRORS as e:
+            print(f'{path}: {e}', file=sys.stderr)
+            exit_code = 1
+            continue
+        output.write(json.dumps(solution.to_json(), indent=indent) + '\n')
+    return exit_code
+
+
+def read_matrix(path) -> numpy.ndarray:
+    if path.endswith('.npy'):
+        return numpy.load(path, mmap_mode='r', allow_pickle=False)
+    return numpy.array(read_input(path))
+
+
+def manage_matrix_store(action, source, store_path, output) -> int:
+    """Builds or describes the store, returns 1 if the store or the source is invalid."""
+    if store_path is None:
+        print('There is no matrix store, set MATRIX_STORE_PATH or --store.', file=sys.stderr)
+        return 1
+    store = MatrixStore(store_path)
+    try:
+        if action == 'build':
+            store.write(read_matrix(source))
+        matrix = store.get_matrix()
+    except (MatrixStoreError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    output.write(json.dumps({'path': store_path, 'locations': len(matrix)}) + '\n')
+    return 0
+
+
+def main(argv=None, output=None) -> int:
+    args = get_argument_parser().parse_args(argv)
+    output = output if output is not None else sys.stdout
+    if args.command == 'solve':
+        return solve(args.inputs, args.validate, args.indent, output)
+    if args.command == 'matrix-store':
+        return manage_matrix_store(args.action, args.source, args.store, output)
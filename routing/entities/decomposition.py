@@ -0,0 +1,20 @@
+import json
+
+
+class Decomposition:
+    """Settings of the cluster first, route second decomposition of large instances."""
+
+    def __init__(self, enabled: bool = False, cluster_size: int = 200, repair: bool = True):
+        self.enabled = enabled
+        self.cluster_size = cluster_size
+        self.repair = repair
+
+    def to_json(self):
+        return {
+            'enabled': self.enabled,
+            'cluster_size': self.cluster_size,
+            'repair': self.repair
+        }
+
+    def __repr__(self):
+        return json.dumps(self.to_json())
@@ -0,0 +1,32 @@
+import json
+from typing import Dict, Iterable
+
+
+class DistanceEstimation:
+    """Settings of the travel times estimated from the coordinates of the locations, for the pairs of locations
+       without distance. Kilometers by the method ('haversine' or 'equirectangular') times the detour factor,
+       in minutes at the speed (km/h) of the vehicle types, or the road travel times of the table service with the
+       'table' method."""
+
+    def __init__(self, method: str = 'haversine', speeds: Dict[str, float] = None, default_speed: float = 30,
+                 detour_factor: float = 1.3):
+        self.method = method
+        self.speeds = speeds if speeds is not None else {}
+        self.default_speed = default_speed
+        self.detour_factor = detour_factor
+
+    def get_speed(self, vehicle_types: Iterable[str] = ()):
+        """Speed of the slowest of the vehicle types with a speed, the default speed if none has."""
+        speeds = [self.speeds[vehicle_type] for vehicle_type in vehicle_types if vehicle_type in self.speeds]
+        return min(speeds, default=self.default_speed)
+
+    def to_json(self):
+        return {
+            'method': self.method,
+            'speeds': dict(sorted(self.speeds.items())),
+            'default_speed': self.default_speed,
+            'detour_factor': self.detour_factor
+        }
+
+    def __repr__(self):
+        return json.dumps(self.to_json())
@@ -12,3 +12,49 @@ class InvalidSolutionError(Exception):
 class LocationNameError(KeyError):
     def __init__(self, message):
         super().__init__(message)
+
+
+class JobQueueFullError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class BatchLimitError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class JobNotFoundError(KeyError):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class InvalidDistanceMatrixError(ValueError):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class SchemaValidationError(ValueError):
+    def __init__(self, message, path):
+        super().__init__(message)
+        self.path = path
+
+
+class InvalidSearchParametersError(ValueError):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class MatrixStoreError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class TableServiceError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+# errors of inputs the schema accepts, they are answered as bad requests
+INPUT_ERRORS = (InvalidPenaltyTypeError, InvalidDistanceMatrixError, InvalidSearchParametersError, MatrixStoreError,
+                TableServiceError)
@@ -1,8 +1,71 @@
 import json
+import numpy
+from collections.abc import Mapping
 from typing import List, Set, Tuple, Dict
+from routing.settings import INFINITY
+
+
+class DistanceMatrix:
+    """Distances between locations, row and column i are the i-th location name.
+       Missing distances are infinity."""
+    __slots__ = ('matrix', 'names', 'names_indices')
+
+    def __init__(self, matrix: numpy.ndarray, names: List[str]):
+        self.matrix = matrix
+        self.names = names
+        self.names_indices = {name: index for index, name in enumerate(names)}
+
+    def get_row(self, index) -> 'DistanceRow':
+        return DistanceRow(self, index)
+
+
+class DistanceRow(Mapping):
+    """Distances from one location, read from a row of a matrix shared by all locations.
+       Behaves like the dict of distances by location name, missing distances are not in the mapping.
+       The location itself comes first, then the others in matrix order."""
+    __slots__ = ('distance_matrix', 'index')
+
+    def __init__(self, distance_matrix: DistanceMatrix, index: int):
+        self.distance_matrix = distance_matrix
+        self.index = index
+
+    def __getitem__(self, location_name):
+        column = self.distance_matrix.names_indices[location_name]
+        distance = int(self.distance_matrix.matrix[self.index, column])
+        if distance >= INFINITY:
+            raise KeyError(location_name)
+        return distance
+
+    def __setitem__(self, location_name, distance):
+        column = self.distance_matrix.names_indices[location_name]
+        self.distance_matrix.matrix[self.index, column] = distance
+
+    def __iter__(self):
+        names = self.distance_matrix.names
+        yield names[self.index]
+        for column in numpy.flatnonzero(self.distance_matrix.matrix[self.index] < INFINITY):
+            if column != self.index:
+                yield names[column]
+
+    def __len__(self):
+        return int(numpy.count_nonzero(self.distance_matrix.matrix[self.index] < INFINITY))
+
+
+def get_shared_distance_matrix(locations: List['Location']) -> DistanceMatrix:
+    """Matrix all the locations distances are read from, None if a location has its own distances."""
+    distance_matrices = set()
+    for location in locations:
+        if not isinstance(location.distance_map, DistanceRow):
+            return None
+        distance_matrices.add(id(location.distance_map.distance_matrix))
+    if len(distance_matrices) != 1:
+        return None
+    return locations[0].distance_map.distance_matrix
 
 
 class TimeWindow:
+    __slots__ = ('start', 'end')
+
     def __init__(self, start, end):
         self.start = start
         self.end = end
@@ -13,6 +76,9 @@ class TimeWindow:
 
 
 class Location:
+    __slots__ = ('name', 'distance_map', 'is_depot', 'is_clone', 'accessibility', 'time_windows', 'demand',
+                 'service_time', 'high_priority', 'coordinates')
+
     def __init__(self,
                  name: str,
                  accessibility: Set or List,
@@ -22,9 +88,10 @@ class Location:
                  is_depot: bool = False,
                  high_priority: bool = False,
                  coordinates: Tuple[int, int] = None,
-                 is_clone: bool = False):
+                 is_clone: bool = False,
+                 distance_map: Mapping = None):
         self.name = name
-        self.distance_map: Dict = {name: 0}
+        self.distance_map: Mapping = distance_map if distance_map is not None else {name: 0}
         self.is_depot = is_depot
         self.is_clone = is_clone
         self.accessibility: Set[str] = set(accessibility)
@@ -69,7 +136,7 @@ class Location:
             'service_time': self.service_time,
             'time_windows': [json.loads(repr(time_window)) for time_window in self.time_windows],
             'distances': [{'name': name, 'distance': distance} for name, distance in self.distance_map.items()],
-            'accessibility': list(self.accessibility)
+            'accessibility': sorted(self.accessibility)
         }
         return json.dumps(ret)
 
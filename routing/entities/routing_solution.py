@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from routing.entities.location import Location
 from routing.entities.vehicle import Vehicle
 from routing.services.locations import LocationsService
-from typing import List
+from typing import List, Dict
 
 
 @dataclass
@@ -38,7 +38,7 @@ class VehicleBreakSolution:
         self.type = break_type
 
     def to_json(self):
-        return {'break_type': self.type,
+        return {'break_type': self.type.name,
                 'break_start': self.break_start,
                 'break_duration': self.break_duration}
 
@@ -72,6 +72,8 @@ class RoutingSolution:
         self.objective_cost = None
         self.locations: List[Location] = locations_service.locations
         self.routes_plan: List[VehicleRoutingSolution] = []
+        self.metadata: Dict = {}
+        self.timings: Dict[str, float] = {}
 
     def set_status(self, status: RoutingSolutionStatus, message: str):
         self.status = status
@@ -91,10 +93,32 @@ class RoutingSolution:
         return list(available_locations.difference(visited_locations))
 
     def to_json(self):
-        return {
+        ret = {
             'status': self.status.name,
             'message': self.message,
             'objective_cost': self.objective_cost,
             'dropped_locations': self.get_dropped_locations(),
             'solution': [vehicle_routing_solution.to_json() for vehicle_routing_solution in self.routes_plan]
         }
+        if self.metadata:
+            ret['metadata'] = self.metadata
+        if self.timings:
+            ret['timings'] = self.timings
+        return ret
+
+
+class CachedRoutingSolution:
+    """Solution answered from the cache. It is kept as its JSON, the routes of a RoutingSolution reference the
+       locations and through them the whole distance matrix."""
+
+    def __init__(self, solution_json: Dict) -> None:
+        self.solution_json = solution_json
+        self.status = RoutingSolutionStatus[solution_json['status']]
+        self.message = solution_json['message']
+        self.timings: Dict[str, float] = {}
+
+    def to_json(self):
+        ret = dict(self.solution_json)
+        if self.timings:
+            ret['timings'] = self.timings
+        return ret
@@ -0,0 +1,23 @@
+import json
+from typing import Dict
+
+
+class SearchParameters:
+    """OR Tools search parameters exposed on the input, None keeps the OR Tools default.
+       Time limits are in seconds and local_search_operators enables or disables operators by name."""
+
+    def __init__(self, lns_time_limit: float = None, guided_local_search_lambda_coefficient: float = None,
+                 local_search_operators: Dict[str, bool] = None):
+        self.lns_time_limit = lns_time_limit
+        self.guided_local_search_lambda_coefficient = guided_local_search_lambda_coefficient
+        self.local_search_operators = local_search_operators if local_search_operators is not None else {}
+
+    def to_json(self):
+        return {
+            'lns_time_limit': self.lns_time_limit,
+            'guided_local_search_lambda_coefficient': self.guided_local_search_lambda_coefficient,
+            'local_search_operators': self.local_search_operators
+        }
+
+    def __repr__(self):
+        return json.dumps(self.to_json(), sort_keys=True)
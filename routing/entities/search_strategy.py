@@ -0,0 +1,20 @@
+import json
+
+
+class SearchStrategy:
+    """Names of the OR Tools first solution strategy and local search metaheuristic."""
+
+    def __init__(self,
+                 first_solution_strategy: str = 'LOCAL_CHEAPEST_ARC',
+                 local_search_metaheuristic: str = 'GUIDED_LOCAL_SEARCH'):
+        self.first_solution_strategy = first_solution_strategy
+        self.local_search_metaheuristic = local_search_metaheuristic
+
+    def to_json(self):
+        return {
+            'first_solution_strategy': self.first_solution_strategy,
+            'local_search_metaheuristic': self.local_search_metaheuristic
+        }
+
+    def __repr__(self):
+        return json.dumps(self.to_json())
@@ -0,0 +1,26 @@
+import json
+
+
+class StoppingCriteria:
+    """Criteria to stop the search before the time limit.
+       The search stops after solution_limit solutions, when the objective improves less than
+       plateau_improvement percent in plateau_time seconds or when it reaches objective_target.
+       Criteria set to None are not used."""
+
+    def __init__(self, solution_limit: int = None, plateau_time: float = None, plateau_improvement: float = 0,
+                 objective_target: int = None):
+        self.solution_limit = solution_limit
+        self.plateau_time = plateau_time
+        self.plateau_improvement = plateau_improvement
+        self.objective_target = objective_target
+
+    def to_json(self):
+        return {
+            'solution_limit': self.solution_limit,
+            'plateau_time': self.plateau_time,
+            'plateau_improvement': self.plateau_improvement,
+            'objective_target': self.objective_target
+        }
+
+    def __repr__(self):
+        return json.dumps(self.to_json())
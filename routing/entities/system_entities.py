@@ -1,26 +1,61 @@
 import json
 from routing.entities.location import Location
 from routing.entities.vehicle import Vehicle
-from typing import List
+from routing.entities.search_strategy import SearchStrategy
+from routing.entities.decomposition import Decomposition
+from routing.entities.stopping_criteria import StoppingCriteria
+from routing.entities.search_parameters import SearchParameters
+from routing.entities.distance_estimation import DistanceEstimation
+from routing.settings import RELOAD_MODEL
+from typing import List, Dict
 
 
 class SystemEntities:
     def __init__(self, locations: List[Location], vehicles: List[Vehicle],
-                 max_reload, penalty_type, search_time_limit):
+                 max_reload, penalty_type, search_time_limit, use_cache=True,
+                 initial_routes: Dict[str, List[str]] = None,
+                 portfolio: List[SearchStrategy] = None,
+                 decomposition: Decomposition = None,
+                 timings=False,
+                 stopping_criteria: StoppingCriteria = None,
+                 search_parameters: SearchParameters = None,
+                 reload_model=RELOAD_MODEL,
+                 distance_estimation: DistanceEstimation = None):
         self.locations = locations
         self.vehicles = vehicles
         self.max_reload = max_reload
+        self.reload_model = reload_model
+        # None when the missing distances are not estimated
+        self.distance_estimation = distance_estimation
         self.penalty_type = penalty_type
         self.search_time_limit = search_time_limit
+        self.initial_routes = initial_routes if initial_routes is not None else {}
+        self.portfolio = portfolio if portfolio is not None else []
+        self.decomposition = decomposition if decomposition is not None else Decomposition()
+        self.stopping_criteria = stopping_criteria if stopping_criteria is not None else StoppingCriteria()
+        self.search_parameters = search_parameters if search_parameters is not None else SearchParameters()
+        # not part of the representation, they don't change the solution
+        self.use_cache = use_cache
+        self.timings = timings
 
     def __repr__(self):
         ret = {
             'locations': [json.loads(repr(location)) for location in self.locations],
             'vehicles': [json.loads(repr(vehicle)) for vehicle in self.vehicles],
             'max_reload': self.max_reload,
+            'reload_model': self.reload_model,
             'penalty_type': self.penalty_type.__name__,
-            'search_time_limit': self.search_time_limit
+            'search_time_limit': self.search_time_limit,
+            'initial_routes': self.initial_routes,
+            'portfolio': [search_strategy.to_json() for search_strategy in self.portfolio],
+            'decomposition': self.decomposition.to_json(),
+            'stopping_criteria': self.stopping_criteria.to_json(),
+            'search_parameters': self.search_parameters.to_json()
         }
+        if self.distance_estimation is not None:
+            # the estimated distances depend on the coordinates
+            ret['distance_estimation'] = self.distance_estimation.to_json()
+            ret['coordinates'] = [location.coordinates for location in self.locations]
         return json.dumps(ret)
 
     def __str__(self):  # pragma: no cover
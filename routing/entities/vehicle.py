@@ -3,6 +3,8 @@ import json
 
 
 class LunchTimeWindow:
+    __slots__ = ('minimum_start', 'maximum_start', 'duration')
+
     def __init__(self, minimum_start, maximum_start, duration) -> None:
         self.minimum_start = minimum_start
         self.maximum_start = maximum_start
@@ -18,6 +20,8 @@ class LunchTimeWindow:
 
 
 class ShortBreak:
+    __slots__ = ('frequency', 'duration')
+
     def __init__(self, frequency, duration):
         self.frequency = frequency
         self.duration = duration
@@ -31,6 +35,8 @@ class ShortBreak:
 
 
 class Vehicle:
+    __slots__ = ('name', 'types', 'max_load_weight', 'journey', 'lunch_time_window', 'short_break')
+
     def __init__(self,
                  name: str,
                  max_load_weight: int,
@@ -0,0 +1,104 @@
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed, wait
+from typing import Callable, Dict, Iterator, List
+from routing.entities.exception import BatchLimitError
+from routing.services.input_parser import InputParser
+from routing.settings import BATCH_MIN_SEARCH_TIME_LIMIT
+
+
+def get_time_budgets(sizes: List[int], search_time_limits: List[float], capacity: float) -> List[float]:
+    """Search time of each problem, the capacity (workers x deadline seconds) is divided proportionally to the
+       sizes. A problem never gets more than its own search time limit, what it doesn't use is divided among
+       the others."""
+    budgets = [None] * len(sizes)
+    pending = set(range(len(sizes)))
+    while pending:
+        pending_size = sum(sizes[index] for index in pending)
+        capped = {index for index in pending
+                  if search_time_limits[index] <= capacity * sizes[index] / pending_size}
+        if not capped:
+            for index in pending:
+                budgets[index] = max(capacity * sizes[index] / pending_size, BATCH_MIN_SEARCH_TIME_LIMIT)
+            break
+        for index in capped:
+            budgets[index] = search_time_limits[index]
+            capacity -= search_time_limits[index]
+        pending -= capped
+    return budgets
+
+
+def solve_before_deadline(solver: Callable, input_json, search_time_limit, deadline_time) -> Dict:
+    """Solves with the budget, or less if the deadline of the batch is closer."""
+    remaining_time = deadline_time - time.time()
+    if remaining_time < BATCH_MIN_SEARCH_TIME_LIMIT:
+        return {'status': 'ERROR', 'message': 'Batch deadline reached before the problem was solved.'}
+    input_json['search_time_limit'] = round(min(search_time_limit, remaining_time), 3)
+    return {'search_time_limit': input_json['search_time_limit'], **solver(input_json)}
+
+
+class BatchService:
+    """Solves independent routing problems on a pool of processes, within a deadline shared by all of them.
+       The time of the workers until the deadline is divided among the problems proportionally to their number
+       of locations. The biggest problems are submitted first, solutions are yielded as they finish.
+       A batch holds one of the slots, shared by the batches of the process, until its problems are finished,
+       starting a batch without a free slot raises BatchLimitError."""
+
+    def __init__(self, solver: Callable, max_workers: int, deadline: float, slots: threading.Semaphore = None):
+        self.solver = solver
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.slots = slots
+
+    def get_time_budgets(self, inputs: List[Dict]) -> List[float]:
+        sizes = [len(input_json['locations']) for input_json in inputs]
+        # a problem runs on a single worker, it can't search for longer than the deadline
+        search_time_limits = [min(InputParser(input_json).get_search_time_limit(), self.deadline)
+                              for input_json in inputs]
+        # the problems can't use more workers than there are problems
+        capacity = min(self.max_workers, len(inputs)) * self.deadline
+        return get_time_budgets(sizes, search_time_limits, capacity)
+
+    def solve(self, inputs: List[Dict]) -> Iterator[Dict]:
+        """Starts solving the problems, the results are yielded in the order they finish, with the index of the
+           problem on the inputs. The errors of the inputs and BatchLimitError are raised here, before any result."""
+        if not inputs:
+            return iter(())
+        deadline_time = time.time() + self.deadline
+        budgets = self.get_time_budgets(inputs)
+        if self.slots is not None and not self.slots.acquire(blocking=False):
+            raise BatchLimitError('Too many batches running, try again later.')
+        executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(inputs)))
+        futures = {}
+        try:
+            for index in sorted(range(len(inputs)), key=lambda index: budgets[index], reverse=True):
+                future = executor.submit(solve_before_deadline, self.solver, inputs[index], budgets[index],
+                                         deadline_time)
+                futures[future] = index
+        except Exception:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            # released once the problems are finished, the results may never be consumed
+            threading.Thread(target=self.release_slot, args=(futures,), daemon=True).start()
+        return self.get_results(executor, futures)
+
+    def release_slot(self, futures: Dict[Future, int]):
+        """Once the problems are finished or cancelled."""
+        wait(futures)
+        if self.slots is not None:
+            self.slots.release()
+
+    @staticmethod
+    def get_results(executor: ProcessPoolExecutor, futures: Dict[Future, int]) -> Iterator[Dict]:
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'status': 'ERROR', 'message': str(e)}
+                yield {'index': index, **result}
+        finally:
+            # the problems not started yet are dropped if the consumer stops early
+            executor.shutdown(wait=False, cancel_futures=True)
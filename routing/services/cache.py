@@ -0,0 +1,153 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+import numpy
+from routing.entities.system_entities import SystemEntities
+from routing.entities.location import Location, get_shared_distance_matrix
+
+
+def get_location_key_fields(location: Location, with_distances=True):
+    """Every field of the location the solution depends on. The coordinates are used by the estimated distances
+       and by the decomposition in clusters."""
+    key_fields = {
+        'name': location.name,
+        'is_depot': location.is_depot,
+        'demand': location.demand,
+        'service_time': location.service_time,
+        'high_priority': location.high_priority,
+        'coordinates': list(location.coordinates),
+        'time_windows': [[time_window.start, time_window.end] for time_window in location.time_windows],
+        'accessibility': sorted(location.accessibility)
+    }
+    if with_distances:
+        key_fields['distances'] = sorted(location.distance_map.items())
+    return key_fields
+
+
+def get_key_fields(system_entities: SystemEntities, with_distances=True):
+    """Every field of the entities the solution depends on, use_cache and timings are left out."""
+    return {
+        'locations': [get_location_key_fields(location, with_distances) for location in system_entities.locations],
+        'vehicles': [json.loads(repr(vehicle)) for vehicle in system_entities.vehicles],
+        'max_reload': system_entities.max_reload,
+        'reload_model': system_entities.reload_model,
+        'penalty_type': system_entities.penalty_type.__name__,
+        'search_time_limit': system_entities.search_time_limit,
+        'initial_routes': system_entities.initial_routes,
+        'portfolio': [search_strategy.to_json() for search_strategy in system_entities.portfolio],
+        'decomposition': system_entities.decomposition.to_json(),
+        'stopping_criteria': system_entities.stopping_criteria.to_json(),
+        'search_parameters': system_entities.search_parameters.to_json(),
+        'distance_estimation': (None if system_entities.distance_estimation is None
+                                else system_entities.distance_estimation.to_json())
+    }
+
+
+class SolutionCache:
+    """JSON of the solutions indexed by the hash of the parsed input.
+       Entries are kept in a bounded LRU in memory and, if a path is given,
+       in a sqlite database shared by every process using the same file.
+       Entries older than ttl seconds are evicted, they never expire if ttl is None.
+    """
+
+    def __init__(self, max_size=128, path=None, ttl=None):
+        self.max_size = max_size
+        self.path = path
+        self.ttl = ttl
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if self.path is not None:
+            self.create_table()
+
+    @staticmethod
+    def get_key(system_entities: SystemEntities):
+        """Hash of the fields of the entities. The distances read from a shared matrix are hashed as its bytes,
+           formatting the N² distances would cost more than parsing them."""
+        distance_matrix = get_shared_distance_matrix(system_entities.locations)
+        key_fields = get_key_fields(system_entities, with_distances=distance_matrix is None)
+        key = hashlib.sha256(json.dumps(key_fields, sort_keys=True).encode())
+        if distance_matrix is not None:
+            rows = [location.distance_map.index for location in system_entities.locations]
+            matrix = numpy.ascontiguousarray(distance_matrix.matrix)
+            key.update(json.dumps([distance_matrix.names, rows, matrix.dtype.str, matrix.shape]).encode())
+            key.update(matrix.tobytes())
+        return key.hexdigest()
+
+    def is_expired(self, created_at):
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def create_table(self):
+        with self.connect() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS solutions '
+                               '(key TEXT PRIMARY KEY, created_at REAL, solution BLOB)')
+
+    def get_from_memory(self, key):
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is None:
+                return None
+            created_at, solution = entry
+            if self.is_expired(created_at):
+                del self.memory[key]
+                return None
+            self.memory.move_to_end(key)
+            return solution
+
+    def set_in_memory(self, key, solution, created_at):
+        with self.lock:
+            self.memory[key] = (created_at, solution)
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_size:
+                self.memory.popitem(last=False)
+
+    def get_from_disk(self, key):
+        if self.path is None:
+            return None
+        with self.connect() as connection:
+            row = connection.execute('SELECT created_at, solution FROM solutions WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        created_at, solution = row
+        if self.is_expired(created_at):
+            return None
+        return created_at, pickle.loads(solution)
+
+    def set_on_disk(self, key, solution, created_at):
+        if self.path is None:
+            return
+        with self.connect() as connection:
+            if self.ttl is not None:
+                connection.execute('DELETE FROM solutions WHERE created_at < ?', (created_at - self.ttl,))
+            connection.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)',
+                               (key, created_at, pickle.dumps(solution)))
+
+    def get(self, key) -> Dict:
+        solution = self.get_from_memory(key)
+        if solution is None:
+            disk_entry = self.get_from_disk(key)
+            if disk_entry is not None:
+                created_at, solution = disk_entry
+                self.set_in_memory(key, solution, created_at)
+        if solution is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return solution
+
+    def set(self, key, solution: Dict):
+        created_at = time.time()
+        self.set_in_memory(key, solution, created_at)
+        self.set_on_disk(key, solution, created_at)
+
+    def get_stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.memory)}
@@ -0,0 +1,229 @@
+import copy
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List
+from routing.entities.location import Location
+from routing.entities.routing_solution import RoutingSolution, RoutingSolutionStatus
+from routing.entities.system_entities import SystemEntities
+from routing.entities.stopping_criteria import StoppingCriteria
+from routing.entities.vehicle import Vehicle
+from routing.services.logging import logger
+from routing.services.utils import has_accessibility
+from routing.settings import DECOMPOSITION_REPAIR_TIME_SHARE
+
+
+class Cluster:
+    def __init__(self, locations: List[Location]):
+        self.locations = locations
+        self.vehicles: List[Vehicle] = []
+        self.initial_routes: Dict[str, List[str]] = {}
+        self.solution: RoutingSolution = None
+
+    def get_demand(self):
+        return sum(max(location.demand, 0) for location in self.locations)
+
+    def get_capacity(self):
+        return sum(vehicle.max_load_weight for vehicle in self.vehicles)
+
+    def get_accessible_demand(self, vehicle: Vehicle):
+        return sum(max(location.demand, 0) for location in self.locations if has_accessibility(vehicle.types, location))
+
+
+class DecompositionService:
+    """Cluster first, route second.
+       Locations are swept by their angle around the depot into clusters of about cluster_size locations,
+       vehicles are assigned to the clusters by capacity and accessibility and every cluster is solved
+       as an independent problem in its own process. The cluster solutions are stitched into one solution.
+       With repair, dropped locations are moved to the closest other cluster and the clusters that
+       received locations are solved again starting from their previous routes, in the share of the
+       search time limit left to the repair.
+       The objective cost of the stitched solution is the sum of the clusters objective costs.
+    """
+
+    def __init__(self, solve: Callable, system_entities: SystemEntities, max_workers: int):
+        self.solve = solve
+        self.system_entities = system_entities
+        self.max_workers = max_workers
+        self.cluster_size = system_entities.decomposition.cluster_size
+        self.repair = system_entities.decomposition.repair
+        self.depot = self.get_depot()
+
+    def get_depot(self) -> Location:
+        for location in self.system_entities.locations:
+            if location.is_depot:
+                return location
+
+    def get_num_clusters(self, num_locations):
+        num_clusters = math.ceil(num_locations / self.cluster_size)
+        return max(min(num_clusters, len(self.system_entities.vehicles)), 1)
+
+    def get_angle(self, location: Location):
+        depot_latitude, depot_longitude = self.depot.coordinates
+        latitude, longitude = location.coordinates
+        longitude_scale = math.cos(math.radians(depot_latitude))
+        return math.atan2(latitude - depot_latitude, (longitude - depot_longitude) * longitude_scale)
+
+    def sweep(self, locations: List[Location]) -> List[Location]:
+        """Sorts the locations by angle around the depot, starting after the largest angular gap
+           so no cluster is split by it."""
+        swept_locations = sorted(locations, key=lambda location: (self.get_angle(location),
+                                                                  location.distance_to(self.depot.name)
+                                                                  if self.depot.name in location.distance_map
+                                                                  else 0))
+        if len(swept_locations) < 2:
+            return swept_locations
+        angles = [self.get_angle(location) for location in swept_locations]
+        gaps = [angles[index + 1] - angles[index] for index in range(len(angles) - 1)]
+        gaps.append(angles[0] + 2 * math.pi - angles[-1])
+        start = (gaps.index(max(gaps)) + 1) % len(swept_locations)
+        return swept_locations[start:] + swept_locations[:start]
+
+    def get_clusters(self) -> List[Cluster]:
+        locations = [location for location in self.system_entities.locations if not location.is_depot]
+        swept_locations = self.sweep(locations)
+        num_clusters = self.get_num_clusters(len(swept_locations))
+        clusters = []
+        for cluster_index in range(num_clusters):
+            start = cluster_index * len(swept_locations) // num_clusters
+            end = (cluster_index + 1) * len(swept_locations) // num_clusters
+            clusters.append(Cluster(swept_locations[start:end]))
+        return clusters
+
+    def assign_vehicles(self, clusters: List[Cluster]):
+        """Bigger vehicles first, every vehicle goes to the cluster with the largest demand it can access
+           that is not covered yet. Clusters without vehicles are served first."""
+        vehicles = sorted(self.system_entities.vehicles, key=lambda vehicle: vehicle.max_load_weight, reverse=True)
+        for vehicle in vehicles:
+            cluster = max(clusters, key=lambda cluster: (
+                not cluster.vehicles,
+                min(cluster.get_accessible_demand(vehicle), cluster.get_demand() - cluster.get_capacity())))
+            cluster.vehicles.append(vehicle)
+
+    def get_cluster_stopping_criteria(self) -> StoppingCriteria:
+        """Stopping criteria of the request, but the objective target, which is for the whole instance."""
+        stopping_criteria = copy.copy(self.system_entities.stopping_criteria)
+        stopping_criteria.objective_target = None
+        return stopping_criteria
+
+    def get_cluster_system_entities(self, cluster: Cluster, search_time_limit) -> SystemEntities:
+        vehicles_names = set(vehicle.name for vehicle in cluster.vehicles)
+        initial_routes = cluster.initial_routes or self.system_entities.initial_routes
+        initial_routes = {vehicle_name: route for vehicle_name, route in initial_routes.items()
+                          if vehicle_name in vehicles_names}
+        vehicles = [vehicle for vehicle in self.system_entities.vehicles if vehicle.name in vehicles_names]
+        return SystemEntities(locations=[self.depot] + cluster.locations,
+                              vehicles=vehicles,
+                              max_reload=self.system_entities.max_reload,
+                              reload_model=self.system_entities.reload_model,
+                              distance_estimation=self.system_entities.distance_estimation,
+                              penalty_type=self.system_entities.penalty_type,
+                              search_time_limit=search_time_limit,
+                              initial_routes=initial_routes,
+                              stopping_criteria=self.get_cluster_stopping_criteria(),
+                              search_parameters=self.system_entities.search_parameters)
+
+    def solve_clusters(self, clusters: List[Cluster], search_time_limit):
+        clusters_system_entities = [self.get_cluster_system_entities(cluster, search_time_limit)
+                                    for cluster in clusters]
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(clusters))) as executor:
+            solutions = list(executor.map(self.solve, clusters_system_entities))
+        for cluster, solution in zip(clusters, solutions):
+            cluster.solution = solution
+
+    def get_dropped_locations(self, cluster: Cluster) -> List[Location]:
+        if cluster.solution.status != RoutingSolutionStatus.SUCCESS:
+            return list(cluster.locations)
+        dropped_names = set(cluster.solution.get_dropped_locations())
+        return [location for location in cluster.locations if location.name in dropped_names]
+
+    def get_distance_to_cluster(self, location: Location, cluster: Cluster):
+        distances = [location.distance_map.get(cluster_location.name, math.inf) for cluster_location in
+                     cluster.locations]
+        return min(distances, default=math.inf)
+
+    def get_cluster_routes(self, cluster: Cluster) -> Dict[str, List[str]]:
+        if cluster.solution.status != RoutingSolutionStatus.SUCCESS:
+            return {}
+        return {vehicle_routing_solution.vehicle.name: [route_step.location.name for route_step in
+                                                        vehicle_routing_solution.vehicle_route]
+                for vehicle_routing_solution in cluster.solution.routes_plan}
+
+    def get_repaired_clusters(self, clusters: List[Cluster]) -> Dict[int, Cluster]:
+        """Moves each dropped location to the closest other cluster. The moved locations are removed from their
+           cluster, whose solution doesn't visit them, so a location is in a single cluster even when two clusters
+           exchange locations. Returns the clusters that received locations, by index, to be solved again."""
+        moved_locations: Dict[int, List[Location]] = {}
+        moved_names = set()
+        for cluster_index, cluster in enumerate(clusters):
+            other_clusters = [other_index for other_index in range(len(clusters)) if other_index != cluster_index]
+            if not other_clusters:
+                continue
+            for location in self.get_dropped_locations(cluster):
+                closest_index = min(other_clusters,
+                                    key=lambda other_index: self.get_distance_to_cluster(location,
+                                                                                         clusters[other_index]))
+                moved_locations.setdefault(closest_index, []).append(location)
+                moved_names.add(location.name)
+        for cluster in clusters:
+            cluster.locations = [location for location in cluster.locations if location.name not in moved_names]
+        repaired_clusters = {}
+        for cluster_index, locations in moved_locations.items():
+            cluster = clusters[cluster_index]
+            repaired_cluster = Cluster(cluster.locations + locations)
+            repaired_cluster.vehicles = cluster.vehicles
+            repaired_cluster.initial_routes = self.get_cluster_routes(cluster)
+            repaired_clusters[cluster_index] = repaired_cluster
+        return repaired_clusters
+
+    def repair_clusters(self, clusters: List[Cluster], repair_time_limit):
+        """Moves each dropped location to the closest other cluster and solves those clusters again,
+           the new cluster solution is kept if it visits more locations."""
+        repaired_clusters = self.get_repaired_clusters(clusters)
+        if not repaired_clusters:
+            return
+        self.solve_clusters(list(repaired_clusters.values()), repair_time_limit)
+        for cluster_index, repaired_cluster in repaired_clusters.items():
+            cluster = clusters[cluster_index]
+            if repaired_cluster.solution.status != RoutingSolutionStatus.SUCCESS:
+                continue
+            visited = len(repaired_cluster.locations) - len(self.get_dropped_locations(repaired_cluster))
+            previously_visited = len(cluster.locations) - len(self.get_dropped_locations(cluster))
+            if visited > previously_visited:
+                moved_locations = set(location.name for location in repaired_cluster.locations) - set(
+                    location.name for location in cluster.locations)
+                logger.info('Repair moved %s locations to cluster %s', len(moved_locations), cluster_index)
+                clusters[cluster_index] = repaired_cluster
+
+    def stitch(self, clusters: List[Cluster]) -> RoutingSolution:
+        solutions = [cluster.solution for cluster in clusters if cluster.solution.status == RoutingSolutionStatus.SUCCESS]
+        if not solutions:
+            return clusters[0].solution
+        vehicles_indices = {vehicle.name: index for index, vehicle in enumerate(self.system_entities.vehicles)}
+        routing_solution = copy.copy(solutions[0])
+        routing_solution.metadata = {}
+        routing_solution.locations = self.system_entities.locations
+        routing_solution.objective_cost = sum(solution.objective_cost for solution in solutions)
+        routing_solution.routes_plan = sorted(
+            [vehicle_routing_solution for solution in solutions for vehicle_routing_solution in solution.routes_plan],
+            key=lambda vehicle_routing_solution: vehicles_indices[vehicle_routing_solution.vehicle.name])
+        routing_solution.metadata['decomposition'] = [{
+            'num_locations': len(cluster.locations),
+            'vehicles': [vehicle.name for vehicle in cluster.vehicles],
+            'objective_cost': cluster.solution.objective_cost
+        } for cluster in clusters]
+        return routing_solution
+
+    def start(self) -> RoutingSolution:
+        """The clusters and their repair share the search time limit of the request."""
+        start = time.perf_counter()
+        search_time_limit = self.system_entities.search_time_limit
+        clusters = self.get_clusters()
+        self.assign_vehicles(clusters)
+        cluster_time_limit = search_time_limit * (1 - DECOMPOSITION_REPAIR_TIME_SHARE if self.repair else 1)
+        self.solve_clusters(clusters, cluster_time_limit)
+        # the time left, the clusters may have taken longer than their search time limit to build and solve
+        repair_time_limit = search_time_limit - (time.perf_counter() - start)
+        if self.repair and repair_time_limit > 0:
+            self.repair_clusters(clusters, repair_time_limit)
+        return self.stitch(clusters)
@@ -0,0 +1,352 @@
+import numpy
+from typing import List, Optional
+from routing.services.locations import LocationsService
+from routing.services.vehicles import VehiclesService
+from routing.services.utils import has_accessibility
+from routing.entities.vehicle import Vehicle
+from routing.entities.routing_solution import (
+    RouteStep,
+    RoutingSolution,
+    RoutingSolutionStatus,
+    VehicleRoutingSolution)
+from routing.settings import (DISTANCE_SLACK, VEHICLE_MAX_DISTANCE, FAST_PATH_MAX_STOPS, FAST_PATH_EXACT_STOPS,
+                              FAST_PATH_MAX_EXPANSIONS)
+
+
+def shift_intervals(intervals, transit, slack):
+    """Times reachable from the intervals after the transit, waiting at most slack."""
+    shifted = []
+    for start, end in intervals:
+        start, end = start + transit, end + transit + slack
+        if shifted and start <= shifted[-1][1] + 1:
+            shifted[-1][1] = max(shifted[-1][1], end)
+        else:
+            shifted.append([start, end])
+    return shifted
+
+
+def intersect_intervals(intervals, other_intervals):
+    """Intersection of two sorted lists of disjoint closed intervals."""
+    intersection = []
+    index, other_index = 0, 0
+    while index < len(intervals) and other_index < len(other_intervals):
+        start = max(intervals[index][0], other_intervals[other_index][0])
+        end = min(intervals[index][1], other_intervals[other_index][1])
+        if start <= end:
+            intersection.append([start, end])
+        if intervals[index][1] < other_intervals[other_index][1]:
+            index += 1
+        else:
+            other_index += 1
+    return intersection
+
+
+class FastPathService:
+    """Routes the instances only one vehicle, without breaks, can serve, visiting every location, without building
+       the OR Tools model. Tiny instances are solved exactly by a branch and bound, small ones by a cheapest
+       insertion improved by 2-opt and relocate moves.
+       Nodes are local: 0 is the depot and 1..n the stops, the arc costs are the transit costs of the solver,
+       distance plus the service time of the origin."""
+
+    def __init__(self, locations_service: LocationsService, vehicles_service: VehiclesService,
+                 max_stops=FAST_PATH_MAX_STOPS, exact_stops=FAST_PATH_EXACT_STOPS,
+                 max_expansions=FAST_PATH_MAX_EXPANSIONS):
+        self.locations_service = locations_service
+        self.vehicles_service = vehicles_service
+        self.max_stops = max_stops
+        self.exact_stops = exact_stops
+        self.max_expansions = max_expansions
+        depot_node = locations_service.get_depot_index()
+        self.nodes = [depot_node] + [location_node for location_node, location in
+                                     enumerate(locations_service.locations) if not location.is_depot]
+        self.vehicle_index = None
+        self.transit_matrix = None
+        self.transits = None
+        self.windows = None
+        self.method = None
+
+    def get_vehicle_index(self) -> Optional[int]:
+        """The only vehicle of the fleet that can access a stop, if it has no breaks, can access every location
+           and carry the whole demand. None if the instance is not served by the fast path: with other vehicles
+           that can serve stops, splitting them may be cheaper."""
+        locations = [self.locations_service.get_location_from_index(node) for node in self.nodes]
+        if len(locations) - 1 > self.max_stops:
+            return None
+        if any(not location.time_windows or location.demand < 0 for location in locations):
+            return None
+        usable_vehicles_indexes = [vehicle_index for vehicle_index, vehicle in enumerate(self.vehicles_service.vehicles)
+                                   if any(has_accessibility(vehicle.types, location) for location in locations[1:])]
+        if len(usable_vehicles_indexes) != 1:
+            return None
+        vehicle_index = usable_vehicles_indexes[0]
+        vehicle = self.vehicles_service.get_vehicle_from_index(vehicle_index)
+        if vehicle.lunch_time_window is not None or vehicle.short_break is not None:
+            return None
+        if vehicle.max_load_weight < sum(location.demand for location in locations):
+            return None
+        if not all(has_accessibility(vehicle.types, location) for location in locations):
+            return None
+        return vehicle_index
+
+    def get_windows(self, location_node):
+        """Sorted disjoint intervals of times the node can be visited, inside the horizon of the time dimension."""
+        location = self.locations_service.get_location_from_index(location_node)
+        if location.is_depot:
+            # as in the solver, the route starts and ends inside the first time window of the depot
+            time_windows = [[location.get_time_windows_start()[0], location.get_time_windows_end()[0]]]
+        else:
+            time_windows = sorted([time_window.start, time_window.end] for time_window in location.time_windows)
+        return intersect_intervals(shift_intervals(time_windows, 0, 0), [[0, VEHICLE_MAX_DISTANCE]])
+
+    def setup(self, vehicle: Vehicle):
+        self.transit_matrix = self.locations_service.get_transit_matrix(vehicle.types)[numpy.ix_(self.nodes,
+                                                                                                 self.nodes)]
+        self.transits = self.transit_matrix.tolist()
+        self.windows = [self.get_windows(location_node) for location_node in self.nodes]
+
+    def get_route_cost(self, route: List[int]) -> int:
+        nodes = [0] + route + [0]
+        return int(self.transit_matrix[nodes[:-1], nodes[1:]].sum())
+
+    def get_reachable_times(self, route: List[int]):
+        """Times each node of the route can be reached, from the depot start up to the depot end.
+           None if a node can't be reached inside its time windows."""
+        reachable_times = [self.windows[0]]
+        previous = 0
+        for node in route + [0]:
+            intervals = intersect_intervals(
+                shift_intervals(reachable_times[-1], self.transits[previous][node], DISTANCE_SLACK),
+                self.windows[node])
+            if not intervals:
+                return None
+            reachable_times.append(intervals)
+            previous = node
+        return reachable_times
+
+    def get_schedule(self, route: List[int], journey) -> Optional[List[int]]:
+        """Times of the depot, the stops of the route and the depot again. The route ends as early as possible
+           and starts as late as it can for that end. None if the time windows, the waiting or the journey
+           are not respected."""
+        reachable_times = self.get_reachable_times(route)
+        if reachable_times is None:
+            return None
+        nodes = [0] + route + [0]
+        schedule = [reachable_times[-1][0][0]]
+        for position in range(len(nodes) - 2, -1, -1):
+            latest = schedule[-1] - self.transits[nodes[position]][nodes[position + 1]]
+            for start, end in reversed(reachable_times[position]):
+                if start <= latest:
+                    schedule.append(min(end, latest))
+                    break
+        schedule.reverse()
+        if schedule[-1] - schedule[0] > journey:
+            return None
+        return schedule
+
+    def get_insertion_route(self, journey) -> Optional[List[int]]:
+        """Route built inserting, one at a time, the stop at the position increasing the cost the least
+           while the route stays feasible."""
+        route = []
+        unrouted = list(range(1, len(self.nodes)))
+        while unrouted:
+            nodes = [0] + route + [0]
+            previous_nodes, next_nodes = nodes[:-1], nodes[1:]
+            stops = numpy.array(unrouted)
+            # insertion cost of each stop (columns) at each position (rows)
+            insertion_costs = (self.transit_matrix[numpy.ix_(previous_nodes, stops)]
+                               + self.transit_matrix[numpy.ix_(stops, next_nodes)].T
+                               - self.transit_matrix[previous_nodes, next_nodes][:, numpy.newaxis])
+            for candidate in numpy.argsort(insertion_costs, axis=None, kind='stable'):
+                position, stop_index = divmod(int(candidate), len(unrouted))
+                candidate_route = route[:position] + [unrouted[stop_index]] + route[position:]
+                if self.get_reachable_times(candidate_route) is not None:
+                    route = candidate_route
+                    unrouted.pop(stop_index)
+                    break
+            else:
+                return None
+        if self.get_schedule(route, journey) is None:
+            return None
+        return route
+
+    def get_two_opt_moves(self, route: List[int]):
+        """Cost changes of reversing each segment of the route and the routes they lead to.
+           The arc costs may be asymmetric, reversed segments are costed backwards."""
+        nodes = numpy.array([0] + route + [0])
+        forward_costs = numpy.concatenate(([0], numpy.cumsum(self.transit_matrix[nodes[:-1], nodes[1:]])))
+        backward_costs = numpy.concatenate(([0], numpy.cumsum(self.transit_matrix[nodes[1:], nodes[:-1]])))
+        # segments nodes[first..last] of the stops
+        first, last = numpy.triu_indices(len(nodes) - 1, k=1)
+        segments = first >= 1
+        first, last = first[segments], last[segments]
+        deltas = (self.transit_matrix[nodes[first - 1], nodes[last]]
+                  + self.transit_matrix[nodes[first], nodes[last + 1]]
+                  + backward_costs[last] - backward_costs[first]
+                  - self.transit_matrix[nodes[first - 1], nodes[first]]
+                  - self.transit_matrix[nodes[last], nodes[last + 1]]
+                  - (forward_costs[last] - forward_costs[first]))
+
+        def get_route(move):
+            # stops of the route are nodes shifted by the depot
+            start, end = int(first[move]) - 1, int(last[move])
+            return route[:start] + route[start:end][::-1] + route[end:]
+        return deltas, get_route
+
+    def get_relocate_moves(self, route: List[int]):
+        """Cost changes of moving each stop to each other position of the route and the routes they lead to."""
+        nodes = [0] + route + [0]
+        deltas, moves = [], []
+        for position, stop in enumerate(route):
+            previous_node, next_node = nodes[position], nodes[position + 2]
+            removal_cost = (self.transits[previous_node][stop] + self.transits[stop][next_node]
+                            - self.transits[previous_node][next_node])
+            other_nodes = numpy.array(nodes[:position + 1] + nodes[position + 2:])
+            insertion_costs = (self.transit_matrix[other_nodes[:-1], stop] + self.transit_matrix[stop, other_nodes[1:]]
+                               - self.transit_matrix[other_nodes[:-1], other_nodes[1:]])
+            deltas.append(insertion_costs - removal_cost)
+            moves.extend((position, insertion) for insertion in range(len(insertion_costs)))
+
+        def get_route(move):
+            position, insertion = moves[move]
+            other_stops = route[:position] + route[position + 1:]
+            return other_stops[:insertion] + [route[position]] + other_stops[insertion:]
+        return numpy.concatenate(deltas), get_route
+
+    def improve_route(self, route: List[int], journey) -> List[int]:
+        """Applies the feasible 2-opt or relocate move decreasing the cost the most until there is none."""
+        while len(route) > 1:
+            for deltas, get_route in sorted((self.get_two_opt_moves(route), self.get_relocate_moves(route)),
+                                            key=lambda moves: moves[0].min()):
+                improving_moves = numpy.flatnonzero(deltas < 0)
+                for move in improving_moves[numpy.argsort(deltas[improving_moves], kind='stable')]:
+                    candidate_route = get_route(move)
+                    if self.get_schedule(candidate_route, journey) is not None:
+                        route = candidate_route
+                        break
+                else:
+                    continue
+                break
+            else:
+                return route
+        return route
+
+    def get_completion_costs(self):
+        """Held-Karp table of the cheapest cost from each stop (columns), through each set of stops (rows, bit
+           masks of the stops without the depot), back to the depot. Time windows are relaxed, it bounds the
+           cost of completing a route on the branch and bound."""
+        num_stops = len(self.nodes) - 1
+        completion_costs = numpy.zeros((1 << num_stops, num_stops), dtype=numpy.int64)
+        completion_costs[0] = self.transit_matrix[1:, 0]
+        stops_bits = numpy.arange(num_stops)
+        for mask in range(1, 1 << num_stops):
+            stops = numpy.flatnonzero((mask >> stops_bits) & 1)
+            completion_costs[mask] = (self.transit_matrix[1:, stops + 1]
+                                      + completion_costs[mask ^ (1 << stops), stops]).min(axis=1)
+        return completion_costs
+
+    def get_exact_route(self, journey, best_route: Optional[List[int]]):
+        """Cheapest feasible route, by a depth first branch and bound from the best route known.
+           Returns the route and whether the search was exhausted, proving it is optimal."""
+        completion_costs = self.get_completion_costs().tolist()
+        num_stops = len(self.nodes) - 1
+        best = {'route': best_route,
+                'cost': self.get_route_cost(best_route) if best_route is not None else float('inf')}
+        expansions = 0
+
+        def completion_cost(node, mask):
+            if node == 0:
+                return min((self.transits[0][stop + 1] + completion_costs[mask ^ (1 << stop)][stop]
+                            for stop in range(num_stops)), default=self.transits[0][0])
+            return completion_costs[mask][node - 1]
+
+        def branch(route, mask, cost, reachable_times):
+            nonlocal expansions
+            expansions += 1
+            if expansions > self.max_expansions:
+                return False
+            node = route[-1] if route else 0
+            if cost + completion_cost(node, mask) >= best['cost']:
+                return True
+            if mask == 0:
+                if self.get_schedule(route, journey) is not None:
+                    best['route'], best['cost'] = route, cost + self.transits[node][0]
+                return True
+            stops = [stop for stop in range(num_stops) if mask & (1 << stop)]
+            stops.sort(key=lambda stop: self.transits[node][stop + 1] + completion_costs[mask ^ (1 << stop)][stop])
+            for stop in stops:
+                next_reachable_times = intersect_intervals(
+                    shift_intervals(reachable_times, self.transits[node][stop + 1], DISTANCE_SLACK),
+                    self.windows[stop + 1])
+                if not next_reachable_times:
+                    continue
+                if not branch(route + [stop + 1], mask ^ (1 << stop),
+                              cost + self.transits[node][stop + 1], next_reachable_times):
+                    return False
+            return True
+
+        exhausted = branch([], (1 << num_stops) - 1, 0, self.windows[0])
+        return best['route'], exhausted
+
+    def get_vehicle_route(self, vehicle: Vehicle, route: List[int], schedule: List[int]) -> List[RouteStep]:
+        """Route steps as the solver reports them: the departure is the arrival on the next node minus the distance,
+           so it includes the waiting, and the demand is accumulated up to the step."""
+        location_nodes = [self.nodes[node] for node in [0] + route + [0]]
+        locations = [self.locations_service.get_location_from_index(location_node)
+                     for location_node in location_nodes]
+        total_demand = sum(location.demand for location in locations[:-1])
+        vehicle_route = []
+        demand = 0
+        for position, location in enumerate(locations[:-1]):
+            demand += location.demand
+            departure_time = schedule[position + 1] - self.locations_service.get_distance_by_index(
+                vehicle.types, location_nodes[position], location_nodes[position + 1])
+            # the vehicle arrives empty at the depot and leaves it loaded
+            arrival_load = total_demand - demand + location.demand if position > 0 else 0
+            vehicle_route.append(RouteStep(location, schedule[position], departure_time, demand,
+                                           arrival_load=arrival_load, departure_load=total_demand - demand))
+        vehicle_route.append(RouteStep(locations[-1], schedule[-1], schedule[-1], demand,
+                                       arrival_load=0, departure_load=0))
+        return vehicle_route
+
+    def get_unused_vehicle_schedule(self):
+        start = self.windows[0][0][0]
+        return [start, start + self.transits[0][0]]
+
+    def solve(self) -> Optional[RoutingSolution]:
+        """Solution with every location visited by a single vehicle, None if the instance is not eligible
+           or no feasible route was found."""
+        self.vehicle_index = self.get_vehicle_index()
+        if self.vehicle_index is None:
+            return None
+        vehicle = self.vehicles_service.get_vehicle_from_index(self.vehicle_index)
+        self.setup(vehicle)
+        route = self.get_insertion_route(vehicle.journey)
+        if route is not None:
+            route = self.improve_route(route, vehicle.journey)
+        self.method = 'heuristic'
+        if len(self.nodes) - 1 <= self.exact_stops:
+            route, exhausted = self.get_exact_route(vehicle.journey, route)
+            if exhausted:
+                self.method = 'exact'
+        if route is None:
+            return None
+        return self.parse_solution(route)
+
+    def parse_solution(self, route: List[int]) -> RoutingSolution:
+        routing_solution = RoutingSolution(self.locations_service)
+        routing_solution.set_status(RoutingSolutionStatus.SUCCESS, 'Solution found')
+        routing_solution.objective_cost = self.get_route_cost(route)
+        for vehicle_index, vehicle in enumerate(self.vehicles_service.vehicles):
+            vehicle_routing_solution = VehicleRoutingSolution(vehicle)
+            if vehicle_index == self.vehicle_index:
+                schedule = self.get_schedule(route, vehicle.journey)
+                vehicle_routing_solution.vehicle_route = self.get_vehicle_route(vehicle, route, schedule)
+            else:
+                vehicle_routing_solution.vehicle_route = self.get_vehicle_route(
+                    vehicle, [], self.get_unused_vehicle_schedule())
+            vehicle_routing_solution.vehicle_short_breaks = []
+            routing_solution.add_vehicle_routing_solution(vehicle_routing_solution)
+        routing_solution.metadata['fast_path'] = {
+            'method': self.method,
+            'vehicle': self.vehicles_service.get_name_from_index(self.vehicle_index)}
+        return routing_solution
@@ -1,16 +1,51 @@
+import base64
+from ortools.constraint_solver import pywrapcp
+import numpy
 from math import ceil
-from routing.entities.location import Location, TimeWindow
+from routing.entities.location import Location, TimeWindow, DistanceMatrix
 from routing.entities.vehicle import ShortBreak, Vehicle, LunchTimeWindow
 from routing.entities.system_entities import SystemEntities
-from routing.entities.exception import InvalidPenaltyTypeError
-from routing.settings import PENALTY_FUNCS
+from routing.entities.search_strategy import SearchStrategy
+from routing.entities.decomposition import Decomposition
+from routing.entities.stopping_criteria import StoppingCriteria
+from routing.entities.search_parameters import SearchParameters
+from routing.entities.distance_estimation import DistanceEstimation
+from routing.entities.exception import InvalidPenaltyTypeError, InvalidDistanceMatrixError, InvalidSearchParametersError
+from routing.services.matrix_store import matrix_store
+from routing.settings import (INFINITY,
+                              PENALTY_FUNCS,
+                              PORTFOLIO_WIDTH,
+                              PORTFOLIO_STRATEGIES,
+                              DECOMPOSITION_THRESHOLD,
+                              DECOMPOSITION_CLUSTER_SIZE,
+                              SEARCH_TIME_LIMIT,
+                              SEARCH_PRESETS,
+                              RELOAD_MODEL,
+                              DISTANCE_ESTIMATION_METHOD,
+                              DISTANCE_ESTIMATION_SPEED,
+                              DISTANCE_ESTIMATION_DETOUR_FACTOR)
 
 
 class LocationParser:
-    def __init__(self):
-        pass
+    def __init__(self, distance_matrix: DistanceMatrix):
+        self.distance_matrix = distance_matrix
 
-    def parse(self, input_json):
+    def parse_distances(self, input_json, location_index):
+        """Writes the distances straight into the location row of the shared matrix,
+           distances to unknown locations are ignored."""
+        names_indices = self.distance_matrix.names_indices
+        columns = []
+        distances = []
+        for distance_location in input_json.get('distances', []):
+            column = names_indices.get(distance_location['name'])
+            if column is None:
+                continue
+            columns.append(column)
+            distances.append(distance_location['distance'])
+        if columns:
+            self.distance_matrix.matrix[location_index, columns] = numpy.ceil(distances)
+
+    def parse(self, input_json, location_index):
         time_windows = []
         for time_window in input_json['time_windows']:
             start_time_window = ceil(time_window['start'])
@@ -25,10 +60,9 @@ class LocationParser:
                             service_time=ceil(input_json['service_time']),
                             time_windows=time_windows,
                             high_priority=input_json.get('high_priority', False),
-                            coordinates=coordinates)
-        for distance_location in input_json['distances']:
-            distance_value = ceil(distance_location['distance'])
-            location.add_distance_to_another_location(distance_location['name'], distance_value)
+                            coordinates=coordinates,
+                            distance_map=self.distance_matrix.get_row(location_index))
+        self.parse_distances(input_json, location_index)
         return location
 
 
@@ -71,19 +105,159 @@ class InputParser:
     def parse(self) -> SystemEntities:
         locations = list()
         vehicles = list()
-        search_time_limit = ceil(self.input.get('search_time_limit', 3))
+        search_time_limit = self.get_search_time_limit()
         for vehicle in self.input['vehicles']:
             vehicles.append(VehicleParser.parse(vehicle))
-        for location in self.input['locations']:
-            locations.append(LocationParser().parse(location))
+        location_parser = LocationParser(self.get_distance_matrix())
+        for location_index, location in enumerate(self.input['locations']):
+            locations.append(location_parser.parse(location, location_index))
         penalty_type_input = self.input.get('drop_penalty_type', None)
         penalty_type = self.get_penalty_type(penalty_type_input)
         max_reload = ceil(self.input.get('max_reload', 0))
+        reload_model = self.input.get('reload_model', RELOAD_MODEL)
+        use_cache = self.input.get('use_cache', True)
+        timings = self.input.get('timings', False)
+        initial_routes = self.get_initial_routes()
+        portfolio = self.get_portfolio()
+        decomposition = self.get_decomposition(len(locations))
+        stopping_criteria = self.get_stopping_criteria()
+        search_parameters = self.get_search_parameters()
+        distance_estimation = self.get_distance_estimation()
         return SystemEntities(locations=locations,
                               vehicles=vehicles,
                               max_reload=max_reload,
+                              reload_model=reload_model,
                               penalty_type=penalty_type,
-                              search_time_limit=search_time_limit)
+                              search_time_limit=search_time_limit,
+                              use_cache=use_cache,
+                              initial_routes=initial_routes,
+                              portfolio=portfolio,
+                              decomposition=decomposition,
+                              timings=timings,
+                              stopping_criteria=stopping_criteria,
+                              search_parameters=search_parameters,
+                              distance_estimation=distance_estimation)
+
+    def get_input_distance_matrix(self, num_locations):
+        """Row major matrix ordered like the locations, from distance_matrix_base64 (int32 little-endian)
+           or distance_matrix (list of rows). None if there is none."""
+        try:
+            if 'distance_matrix_base64' in self.input:
+                # a view over the decoded bytes, read only
+                matrix = numpy.frombuffer(base64.b64decode(self.input['distance_matrix_base64']), dtype='<i4')
+            elif 'distance_matrix' in self.input:
+                matrix = numpy.ceil(numpy.array(self.input['distance_matrix'], dtype=numpy.float64)).astype(numpy.int32)
+            else:
+                return None
+        except ValueError as e:
+            raise InvalidDistanceMatrixError(str(e))
+        if matrix.size != num_locations ** 2:
+            raise InvalidDistanceMatrixError(f'Distance matrix must have {num_locations}x{num_locations} distances, '
+                                             f'found {matrix.size}.')
+        matrix = matrix.reshape(num_locations, num_locations)
+        # distances of the locations and of the catalogue are written over the matrix
+        is_written = any('distances' in location or 'catalogue_id' in location
+                         for location in self.input['locations'])
+        if not matrix.flags.writeable and is_written:
+            matrix = matrix.copy()
+        return matrix
+
+    def get_catalogue_rows(self):
+        """Indices and catalogue ids of the locations with a catalogue_id."""
+        rows = []
+        catalogue_ids = []
+        for location_index, location in enumerate(self.input['locations']):
+            if 'catalogue_id' in location:
+                rows.append(location_index)
+                catalogue_ids.append(location['catalogue_id'])
+        return rows, catalogue_ids
+
+    def get_distance_matrix(self) -> DistanceMatrix:
+        """Matrix the location parser fills, distance to itself is zero and missing distances are infinity.
+           Distances between locations with a catalogue_id, read from the matrix store, are written over the
+           input distance matrix, if there is one, and the distances of the locations over both."""
+        names = [location['name'] for location in self.input['locations']]
+        matrix = self.get_input_distance_matrix(len(names))
+        rows, catalogue_ids = self.get_catalogue_rows()
+        if matrix is None and len(rows) == len(names):
+            # the sub matrix of the store is already a copy in the order of the locations
+            return DistanceMatrix(matrix_store.get_sub_matrix(catalogue_ids), names)
+        if matrix is None:
+            matrix = numpy.full((len(names), len(names)), INFINITY, dtype=numpy.int32)
+            numpy.fill_diagonal(matrix, 0)
+        if rows:
+            matrix[numpy.ix_(rows, rows)] = matrix_store.get_sub_matrix(catalogue_ids)
+        return DistanceMatrix(matrix, names)
+
+    def get_initial_routes(self):
+        initial_routes = {}
+        for initial_route in self.input.get('initial_routes', []):
+            initial_routes[initial_route['vehicle']] = list(initial_route['route'])
+        return initial_routes
+
+    def get_portfolio(self):
+        portfolio_input = self.input.get('portfolio')
+        if portfolio_input is None:
+            return []
+        width = portfolio_input.get('width', PORTFOLIO_WIDTH)
+        strategies_input = portfolio_input.get('strategies', PORTFOLIO_STRATEGIES)
+        return [SearchStrategy(**strategy_input) for strategy_input in strategies_input[:width]]
+
+    def get_decomposition(self, num_locations):
+        decomposition_input = self.input.get('decomposition', {})
+        return Decomposition(enabled=decomposition_input.get('enabled', num_locations > DECOMPOSITION_THRESHOLD),
+                             cluster_size=decomposition_input.get('cluster_size', DECOMPOSITION_CLUSTER_SIZE),
+                             repair=decomposition_input.get('repair', True))
+
+    def get_distance_estimation(self):
+        estimation_input = self.input.get('distance_estimation')
+        if estimation_input is None:
+            return None
+        locations_names = [location['name'] for location in self.input['locations'] if 'coordinates' not in location]
+        if locations_names:
+            raise InvalidDistanceMatrixError(f'Distances can\'t be estimated, locations {locations_names} have no '
+                                             f'coordinates.')
+        return DistanceEstimation(method=estimation_input.get('method', DISTANCE_ESTIMATION_METHOD),
+                                  speeds=estimation_input.get('speeds', {}),
+                                  default_speed=estimation_input.get('default_speed', DISTANCE_ESTIMATION_SPEED),
+                                  detour_factor=estimation_input.get('detour_factor',
+                                                                     DISTANCE_ESTIMATION_DETOUR_FACTOR))
+
+    def get_stopping_criteria(self):
+        stopping_input = self.input.get('stopping_criteria', {})
+        return StoppingCriteria(solution_limit=stopping_input.get('solution_limit'),
+                                plateau_time=stopping_input.get('plateau_time'),
+                                plateau_improvement=stopping_input.get('plateau_improvement', 0),
+                                objective_target=stopping_input.get('objective_target'))
+
+    def get_search_preset(self):
+        preset = self.input.get('search_parameters', {}).get('preset')
+        if preset is None:
+            return {}
+        if preset not in SEARCH_PRESETS:
+            raise InvalidSearchParametersError(f'Unknown search preset {preset}, the presets are '
+                                               f'{list(SEARCH_PRESETS)}.')
+        return SEARCH_PRESETS[preset]
+
+    def get_search_time_limit(self):
+        """Seconds, with millisecond resolution, from the input or the preset."""
+        preset_search_time_limit = self.get_search_preset().get('search_time_limit', SEARCH_TIME_LIMIT)
+        return self.input.get('search_time_limit', preset_search_time_limit)
+
+    def get_search_parameters(self):
+        """Search parameters of the input over the ones of the preset."""
+        search_parameters_input = dict(self.get_search_preset())
+        search_parameters_input.update(self.input.get('search_parameters', {}))
+        local_search_operators = dict(self.get_search_preset().get('local_search_operators', {}))
+        local_search_operators.update(self.input.get('search_parameters', {}).get('local_search_operators', {}))
+        valid_operators = pywrapcp.DefaultRoutingSearchParameters().local_search_operators.DESCRIPTOR.fields_by_name
+        invalid_operators = [operator for operator in local_search_operators if operator not in valid_operators]
+        if invalid_operators:
+            raise InvalidSearchParametersError(f'Unknown local search operators {invalid_operators}.')
+        return SearchParameters(lns_time_limit=search_parameters_input.get('lns_time_limit'),
+                                guided_local_search_lambda_coefficient=search_parameters_input.get(
+                                    'guided_local_search_lambda_coefficient'),
+                                local_search_operators=local_search_operators)
 
     def get_penalty_type(self, penalty_type_input):
         if penalty_type_input is None:
@@ -0,0 +1,163 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from enum import Enum, auto
+from typing import Callable, Dict
+from routing.entities.exception import JobNotFoundError, JobQueueFullError
+from routing.settings import JOBS_PATH, JOB_TIMEOUT
+
+
+class JobStatus(Enum):
+    QUEUED = auto()
+    RUNNING = auto()
+    DONE = auto()
+    FAILED = auto()
+
+
+def connect(path):
+    return sqlite3.connect(path, timeout=30)
+
+
+def run_job(solver: Callable, path, job_id, input_json):
+    """Runs on a solver worker process, the job is running for every API process from now on."""
+    with connect(path) as connection:
+        connection.execute('UPDATE jobs SET status = ? WHERE job_id = ?', (JobStatus.RUNNING.name, job_id))
+    return solver(input_json)
+
+
+class Job:
+    def __init__(self, job_id: str, status: JobStatus, result=None, message=None):
+        self.job_id = job_id
+        self.status = status
+        self.result = result
+        self.message = message
+
+    def get_status(self) -> JobStatus:
+        return self.status
+
+    def is_finished(self):
+        return self.status in (JobStatus.DONE, JobStatus.FAILED)
+
+    def to_json(self):
+        ret = {'job_id': self.job_id, 'status': self.status.name}
+        if self.status == JobStatus.DONE:
+            ret['result'] = self.result
+        elif self.status == JobStatus.FAILED:
+            ret['message'] = self.message
+        return ret
+
+
+class JobsService:
+    """Runs the solver on a pool of worker processes so the HTTP workers stay free.
+       At most max_workers jobs run at the same time and max_queue_size jobs wait
+       for a worker, submitting more jobs than that raises JobQueueFullError.
+       Jobs are kept in a sqlite database, every process using the same file sees the jobs
+       submitted by the others. Only the latest finished_jobs_retention finished jobs are kept.
+       A pool broken by a dead solver process is replaced, jobs not finished after job_timeout seconds are failed,
+       the API process that submitted them may have died.
+    """
+
+    def __init__(self, solver: Callable, max_workers: int, max_queue_size: int, finished_jobs_retention: int = 1000,
+                 path=JOBS_PATH, job_timeout=JOB_TIMEOUT):
+        self.solver = solver
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.finished_jobs_retention = finished_jobs_retention
+        self.path = path
+        self.job_timeout = job_timeout
+        self.executor = None
+        # jobs submitted by this process not finished yet
+        self.futures: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+        self.create_table()
+
+    def create_table(self):
+        with connect(self.path) as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, status TEXT, '
+                               'created_at REAL, finished_at REAL, result TEXT, message TEXT)')
+
+    def get_executor(self):
+        # created on first use, after gunicorn forked the worker process
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self.executor
+
+    def replace_broken_executor(self, executor: ProcessPoolExecutor):
+        """A solver process died, the pool can't run jobs anymore. The next job creates a new one."""
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False)
+
+    def remove_old_finished_jobs(self, connection):
+        connection.execute('DELETE FROM jobs WHERE finished_at IS NOT NULL AND job_id NOT IN '
+                           '(SELECT job_id FROM jobs WHERE finished_at IS NOT NULL '
+                           'ORDER BY finished_at DESC LIMIT ?)', (self.finished_jobs_retention,))
+
+    def submit(self, input_json) -> Job:
+        with self.lock:
+            if len(self.futures) >= self.max_workers + self.max_queue_size:
+                raise JobQueueFullError('Solver queue is full, try again later.')
+            job_id = uuid.uuid4().hex
+            with connect(self.path) as connection:
+                self.remove_old_finished_jobs(connection)
+                connection.execute('INSERT INTO jobs (job_id, status, created_at) VALUES (?, ?, ?)',
+                                   (job_id, JobStatus.QUEUED.name, time.time()))
+            try:
+                executor = self.get_executor()
+                try:
+                    future = executor.submit(run_job, self.solver, self.path, job_id, input_json)
+                except BrokenProcessPool:
+                    # a solver process died since the last job, the pool is replaced
+                    executor.shutdown(wait=False)
+                    self.executor = None
+                    executor = self.get_executor()
+                    future = executor.submit(run_job, self.solver, self.path, job_id, input_json)
+            except Exception:
+                # the job would stay queued forever
+                with connect(self.path) as connection:
+                    connection.execute('DELETE FROM jobs WHERE job_id = ?', (job_id,))
+                raise
+            self.futures[job_id] = future
+        # outside of the lock, the callback runs right away if the job is already finished
+        future.add_done_callback(lambda finished_future: self.finish_job(job_id, finished_future, executor))
+        return Job(job_id, JobStatus.QUEUED)
+
+    def finish_job(self, job_id, future: Future, executor: ProcessPoolExecutor = None):
+        """Stores the result or the error of the job, the job is finished for every API process."""
+        status, result, message = JobStatus.DONE, None, None
+        if future.cancelled():
+            status, message = JobStatus.FAILED, 'Job was cancelled.'
+        elif future.exception() is not None:
+            status, message = JobStatus.FAILED, str(future.exception())
+            if isinstance(future.exception(), BrokenProcessPool) and executor is not None:
+                self.replace_broken_executor(executor)
+        else:
+            result = json.dumps(future.result())
+        with connect(self.path) as connection:
+            connection.execute('UPDATE jobs SET status = ?, finished_at = ?, result = ?, message = ? '
+                               'WHERE job_id = ?', (status.name, time.time(), result, message, job_id))
+        with self.lock:
+            self.futures.pop(job_id, None)
+
+    def get_job(self, job_id) -> Job:
+        with connect(self.path) as connection:
+            connection.execute('UPDATE jobs SET status = ?, finished_at = ?, message = ? '
+                               'WHERE job_id = ? AND finished_at IS NULL AND created_at < ?',
+                               (JobStatus.FAILED.name, time.time(), 'Job expired before finishing.', job_id,
+                                time.time() - self.job_timeout))
+            row = connection.execute('SELECT status, result, message FROM jobs WHERE job_id = ?',
+                                     (job_id,)).fetchone()
+        if row is None:
+            raise JobNotFoundError(job_id)
+        status, result, message = row
+        return Job(job_id, JobStatus[status], json.loads(result) if result is not None else None, message)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
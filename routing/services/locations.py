@@ -1,21 +1,36 @@
-import intervals
+import numpy
+from itertools import islice
 from typing import List
-from routing.entities.location import Location
+from routing.entities.location import Location, DistanceMatrix, get_shared_distance_matrix
+from routing.entities.distance_estimation import DistanceEstimation
 from routing.entities.exception import LocationNameError
-from routing.settings import INFINITY
-from routing.services.utils import has_accessibility
+from routing.settings import INFINITY, DISTANCE_ESTIMATION_METHODS, EARTH_RADIUS
+from routing.services.utils import has_accessibility, get_forbidden_ranges
+from routing.services.table_service import table_service
 
 
 class LocationsService:
     infinity = INFINITY
+    day_end = 24 * 60
 
-    def __init__(self, locations: List[Location], penalty_strategy=None, num_depot_copies=0):
+    def __init__(self, locations: List[Location], penalty_strategy=None, num_depot_copies=0,
+                 distance_estimation: DistanceEstimation = None):
         self.locations = locations
+        self.statistics = {}
+        self.distance_estimation = distance_estimation
+        # arcs without distance and their length in kilometers, when the distances are estimated
+        self.estimated_arcs = None
+        self.estimated_kilometers = None
         self.set_depot_index()
+        self.build_nodes_index()
         self.add_depot_copies(num_depot_copies)
-        self.build_distance_map()
+        self.build_distance_matrix()
+        self.estimate_distances()
         self.set_depot_index()
         self.penalty_strategy = penalty_strategy
+        self.transit_matrices = {}
+        # vehicle of each depot copy, empty when the copies are shared by the vehicles
+        self.refill_depots_vehicles = {}
 
     def set_depot_index(self):
         for index, location in enumerate(self.locations):
@@ -34,13 +49,38 @@ class LocationsService:
             depot_copy = depot.shallow_copy()
             # depot_copy.add_distance_to_another_location('Deposito', self.infinity)
             self.locations.append(depot_copy)
+            # clones share the depot name, the name keeps resolving to the depot
+            self.nodes_index.setdefault(depot_copy.name, len(self.locations) - 1)
         # depot.service_time = 0
+        self.statistics.clear()
 
     def set_refill_depots_demand(self, refill_depot_demand):
         for location in self.locations:
             if location.is_depot and location.is_clone:
                 location.demand = -refill_depot_demand
 
+    def get_depot_copies_nodes(self):
+        return [location_node for location_node, location in enumerate(self.locations)
+                if location.is_depot and location.is_clone]
+
+    def set_vehicles_refill_depots(self, vehicles_reloads: List[int], vehicles_max_load_weights: List[int]):
+        """Gives vehicles_reloads[i] depot copies to the vehicle i, in order.
+           A copy refills the capacity of its own vehicle."""
+        depot_copies_nodes = iter(self.get_depot_copies_nodes())
+        self.refill_depots_vehicles = {}
+        for vehicle_index, (num_reloads, max_load_weight) in enumerate(zip(vehicles_reloads,
+                                                                          vehicles_max_load_weights)):
+            for location_node in islice(depot_copies_nodes, num_reloads):
+                self.locations[location_node].demand = -max_load_weight
+                self.refill_depots_vehicles[location_node] = vehicle_index
+
+    def get_vehicle_refill_depots_nodes(self, vehicle_index):
+        """Depot copies the vehicle may reload at, its own ones or all of them when they are shared."""
+        if not self.refill_depots_vehicles:
+            return self.get_depot_copies_nodes()
+        return [location_node for location_node, refill_vehicle_index in self.refill_depots_vehicles.items()
+                if refill_vehicle_index == vehicle_index]
+
     def get_refill_depots_nodes(self):
         refill_depots_nodes = []
         for location_node, location in enumerate(self.locations):
@@ -48,33 +88,132 @@ class LocationsService:
                 refill_depots_nodes.append(location_node)
         return refill_depots_nodes
 
-    def build_distance_map(self):
-        self.distance_map = {
-            location.name: location.distance_map for location in self.locations
-        }
+    def build_nodes_index(self):
+        """Node of each location name, the first one if there are locations with the same name."""
+        self.nodes_index = {}
+        for location_node, location in enumerate(self.locations):
+            self.nodes_index.setdefault(location.name, location_node)
+
+    def get_shared_distance_matrix(self) -> DistanceMatrix:
+        """Matrix all the locations distances are read from, None if a location has its own distances."""
+        return get_shared_distance_matrix(self.locations)
+
+    def build_distance_matrix(self):
+        """Dense node indexed copy of the distances. Missing distances are set to infinity."""
+        shared_distance_matrix = self.get_shared_distance_matrix()
+        if shared_distance_matrix is not None:
+            rows = [location.distance_map.index for location in self.locations]
+            self.distance_matrix = shared_distance_matrix.matrix[numpy.ix_(rows, rows)].astype(numpy.int64)
+            return
+        num_locations = self.get_num_locations()
+        nodes_by_name = {}
+        for location_node, location in enumerate(self.locations):
+            nodes_by_name.setdefault(location.name, []).append(location_node)
+        from_nodes = []
+        to_nodes = []
+        distances = []
+        for from_node, from_location in enumerate(self.locations):
+            for to_name, distance in from_location.distance_map.items():
+                for to_node in nodes_by_name.get(to_name, []):
+                    from_nodes.append(from_node)
+                    to_nodes.append(to_node)
+                    distances.append(distance)
+        self.distance_matrix = numpy.full((num_locations, num_locations), self.infinity, dtype=numpy.int64)
+        self.distance_matrix[from_nodes, to_nodes] = distances
+
+    def estimate_distances(self):
+        """Fills the missing distances with the travel times estimated from the coordinates at the default speed.
+           The transit matrices use the speed of their vehicle types. With the table method the road travel times
+           of the table service are used for every vehicle type."""
+        if self.distance_estimation is None:
+            return
+        self.estimated_arcs = self.distance_matrix >= self.infinity
+        if not self.estimated_arcs.any():
+            self.estimated_arcs = None
+            return
+        coordinates = numpy.array([location.coordinates for location in self.locations], dtype=numpy.float64)
+        if self.distance_estimation.method == 'table':
+            table_distances = table_service.get_matrix(coordinates)
+            self.distance_matrix = numpy.where(self.estimated_arcs, table_distances, self.distance_matrix)
+            self.estimated_arcs = None
+            return
+        get_kilometers = DISTANCE_ESTIMATION_METHODS[self.distance_estimation.method]
+        self.estimated_kilometers = get_kilometers(coordinates, EARTH_RADIUS)
+        estimated_distances = self.get_estimated_distances(self.estimated_kilometers)
+        self.distance_matrix = numpy.where(self.estimated_arcs, estimated_distances, self.distance_matrix)
+
+    def get_estimated_distances(self, kilometers, vehicle_types=()):
+        """Minutes to travel the kilometers at the speed of the vehicle types."""
+        speed = self.distance_estimation.get_speed(vehicle_types)
+        minutes = numpy.ceil(kilometers * self.distance_estimation.detour_factor * 60 / speed)
+        return numpy.minimum(minutes, self.infinity).astype(numpy.int64)
+
+    def get_vehicle_distance_matrix(self, vehicle_types):
+        """Distances between the nodes, the estimated ones at the speed of the vehicle types."""
+        if self.estimated_arcs is None:
+            return self.distance_matrix
+        estimated_distances = self.get_estimated_distances(self.estimated_kilometers, vehicle_types)
+        return numpy.where(self.estimated_arcs, estimated_distances, self.distance_matrix)
+
+    def get_statistic(self, name, calc):
+        """Instance wide value, like the ones used by the penalty strategies, computed once by calc(self).
+           Values are cleared when the depot is cloned."""
+        if name not in self.statistics:
+            self.statistics[name] = calc(self)
+        return self.statistics[name]
+
+    def get_unique_nodes(self):
+        """First node of each location name, depot clones are left out."""
+        return list(self.nodes_index.values())
+
+    def get_accessibility_mask(self, vehicle_types):
+        return numpy.array([has_accessibility(vehicle_types, location) for location in self.locations], dtype=bool)
+
+    def get_service_times_array(self):
+        return numpy.array([location.service_time for location in self.locations], dtype=numpy.int64)
+
+    def get_transit_matrix(self, vehicle_types):
+        """Transit cost from node i to node j for vehicles of the given types.
+           The service time of the origin is added to the distance and arcs touching
+           locations the vehicle can't access cost infinity.
+           Matrices are built once per distinct set of vehicle types.
+        Returns:
+            numpy.ndarray: num_locations x num_locations integer matrix
+        """
+        vehicle_types = frozenset(vehicle_types)
+        if vehicle_types not in self.transit_matrices:
+            accessibility_mask = self.get_accessibility_mask(vehicle_types)
+            accessible_arcs = numpy.outer(accessibility_mask, accessibility_mask)
+            distances = numpy.where(accessible_arcs, self.get_vehicle_distance_matrix(vehicle_types), self.infinity)
+            service_times = self.get_service_times_array()
+            self.transit_matrices[vehicle_types] = distances + service_times[:, numpy.newaxis]
+        return self.transit_matrices[vehicle_types]
 
     def get_location_from_index(self, index):
         return self.locations[index]
 
-    def get_location_from_name(self, name):
-        for location in self.locations:
-            if location.name == name:
-                return location
-        else:
+    def get_node_from_name(self, name):
+        try:
+            return self.nodes_index[name]
+        except KeyError:
             raise LocationNameError(name)
 
+    def get_location_from_name(self, name):
+        return self.get_location_from_index(self.get_node_from_name(name))
+
     def get_name_from_index(self, index):
         return self.get_location_from_index(index).name
 
     def get_distance_by_index(self, vehicle_types, from_index, to_index):
-        from_name = self.get_name_from_index(from_index)
-        to_name = self.get_name_from_index(to_index)
         to_location = self.get_location_from_index(to_index)
         from_location = self.get_location_from_index(from_index)
-        if has_accessibility(vehicle_types, to_location) and has_accessibility(vehicle_types, from_location):
-            distance = self.distance_map[from_name].get(to_name, self.infinity)
-        else:
+        if not (has_accessibility(vehicle_types, to_location) and has_accessibility(vehicle_types, from_location)):
             distance = self.infinity
+        elif self.estimated_arcs is not None and self.estimated_arcs[from_index, to_index]:
+            kilometers = self.estimated_kilometers[from_index, to_index]
+            distance = int(self.get_estimated_distances(kilometers, vehicle_types))
+        else:
+            distance = int(self.distance_matrix[from_index, to_index])
         return distance
 
     def has_penalty(self, location: Location):
@@ -105,29 +244,34 @@ class LocationsService:
         location = self.get_location_from_index(index)
         return location.demand
 
+    def get_demands(self) -> List[int]:
+        """Demand of each node, negative for the depot copies that refill the vehicles."""
+        return [location.demand for location in self.locations]
+
     def get_location_forbidden_time_window(self, location):
-        allowed_intervals = intervals.empty()
-        for time_window in location.time_windows:
-            start = time_window.start
-            end = time_window.end
-            allowed_interval = intervals.closed(start, end)
-            allowed_intervals = allowed_intervals | allowed_interval
-        full_day_interval = intervals.closed(0, 24 * 60)
-        forbidden_intervals = full_day_interval - allowed_intervals
-        forbidden_start = []
-        forbidden_end = []
-        for interval in forbidden_intervals:
-            start_modifier = 0 if interval.left else 1
-            end_modifier = 0 if interval.right else -1
-            if not interval.is_empty():
-                forbidden_start.append(interval.lower + start_modifier)
-                forbidden_end.append(interval.upper + end_modifier)
-        return {'start': forbidden_start, 'end': forbidden_end}
+        return get_forbidden_ranges([location.time_windows], self.day_end)[0]
+
+    def get_forbidden_time_windows(self):
+        """Forbidden time windows of every node, computed once for all the locations."""
+        return self.get_statistic('forbidden_time_windows', lambda locations_service: get_forbidden_ranges(
+            [location.time_windows for location in locations_service.locations], locations_service.day_end))
 
     def get_location_forbidden_time_window_by_index(self, index):
-        location = self.get_location_from_index(index)
-        time_windows = self.get_location_forbidden_time_window(location)
-        return time_windows
+        return self.get_forbidden_time_windows()[index]
+
+    def get_location_allowed_range_by_index(self, index):
+        """Start and end of the only range of the day the location can be visited, None if its time windows
+           leave more than one range. The end is None if the location can be visited after the end of the day."""
+        forbidden_time_window = self.get_location_forbidden_time_window_by_index(index)
+        start, end = 0, None
+        for forbidden_start, forbidden_end in zip(forbidden_time_window['start'], forbidden_time_window['end']):
+            if forbidden_start == 0 and forbidden_end < self.day_end:
+                start = forbidden_end + 1
+            elif forbidden_start > 0 and forbidden_end == self.day_end:
+                end = forbidden_start - 1
+            else:
+                return None
+        return start, end
 
     def get_depot_index(self):
         return self.depot_index
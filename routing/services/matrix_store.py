@@ -0,0 +1,91 @@
+import os
+import tempfile
+import threading
+import numpy
+from routing.entities.exception import InvalidDistanceMatrixError, MatrixStoreError
+from routing.settings import MATRIX_STORE_PATH
+
+MATRIX_STORE_DTYPE = numpy.dtype('<i4')
+
+
+def load_matrix(path) -> numpy.ndarray:
+    """Square int32 matrix of the .npy file, memory mapped read only."""
+    try:
+        matrix = numpy.load(path, mmap_mode='r', allow_pickle=False)
+    except (OSError, ValueError) as e:
+        raise MatrixStoreError(f'Matrix store {path} can\'t be read: {e}')
+    if matrix.dtype != MATRIX_STORE_DTYPE or matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise MatrixStoreError(f'Matrix store {path} must be a square int32 matrix, '
+                               f'found {matrix.dtype} {matrix.shape}.')
+    return matrix
+
+
+def write_matrix(path, matrix):
+    """Writes the matrix to a file next to the store and renames it over the store, the rename is atomic:
+       readers see either the old or the new matrix, the processes that mapped the old file keep reading it
+       until they map the new one."""
+    matrix = numpy.asarray(matrix)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise MatrixStoreError(f'Matrix store must be a square matrix, found {matrix.shape}.')
+    matrix = numpy.ceil(matrix).astype(MATRIX_STORE_DTYPE) if matrix.dtype.kind == 'f' else matrix
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.matrix_store', suffix='.npy')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as file:
+            numpy.save(file, matrix.astype(MATRIX_STORE_DTYPE, copy=False), allow_pickle=False)
+            file.flush()
+            os.fsync(file.fileno())
+        # the workers may run as another user, the store is read only for them
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.unlink(temporary_path)
+        raise
+
+
+class MatrixStore:
+    """Distances between the locations of a catalogue, row and column i are the location with catalogue id i.
+       The int32 matrix is a .npy file memory mapped read only, the processes share the pages of the file and only
+       the sub matrices of the requests are copied. When the file is replaced the new one is mapped on the next
+       request. The store is disabled while the path is None."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.matrix = None
+        self.file_id = None
+        self.lock = threading.Lock()
+
+    def get_file_id(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            raise MatrixStoreError(f'Matrix store {self.path} not found.')
+        # a replaced file is a new inode
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def get_matrix(self) -> numpy.ndarray:
+        if self.path is None:
+            raise MatrixStoreError('There is no matrix store, set MATRIX_STORE_PATH to use catalogue ids.')
+        file_id = self.get_file_id()
+        with self.lock:
+            if file_id != self.file_id:
+                self.matrix = load_matrix(self.path)
+                self.file_id = file_id
+            return self.matrix
+
+    def get_sub_matrix(self, catalogue_ids) -> numpy.ndarray:
+        """Distances between the catalogue ids, in their order. Only the sub matrix is read from the file."""
+        matrix = self.get_matrix()
+        catalogue_ids = numpy.asarray(catalogue_ids, dtype=numpy.int64)
+        invalid_ids = catalogue_ids[(catalogue_ids < 0) | (catalogue_ids >= len(matrix))]
+        if invalid_ids.size:
+            raise InvalidDistanceMatrixError(f'Catalogue ids {invalid_ids.tolist()} are not in the matrix store '
+                                             f'of {len(matrix)} locations.')
+        return matrix[numpy.ix_(catalogue_ids, catalogue_ids)]
+
+    def write(self, matrix):
+        write_matrix(self.path, matrix)
+
+
+matrix_store = MatrixStore(MATRIX_STORE_PATH)
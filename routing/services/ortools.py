@@ -1,4 +1,3 @@
-import functools
 from typing import List, Dict
 from ortools.constraint_solver import pywrapcp
 from routing.services.locations import LocationsService
@@ -49,19 +48,30 @@ class ORToolsService:
             allowed_vehicles = self.vehicles_service.get_allowed_vehicles_to_location(location)
             self.routing_model.SetAllowedVehiclesForIndex(allowed_vehicles, location_index)
 
-    def set_vehicle_distance_transit_callback(self, vehicle_index, vehicle: Vehicle, distance_callback):
-        vehicle_types = vehicle.types
-        distance_with_type = functools.partial(distance_callback, vehicle_types)
-        transit_callback_index = self.routing_model.RegisterTransitCallback(distance_with_type)
-        self.routing_model.SetArcCostEvaluatorOfVehicle(transit_callback_index, vehicle_index)
+    def set_allowed_vehicles_to_refill_depots(self):
+        """Each depot copy given to a vehicle can only be visited by it, or be left out (vehicle -1).
+           Same as SetAllowedVehiclesForIndex, whose python binding doesn't accept the list of vehicles."""
+        for location_node, vehicle_index in self.locations_service.refill_depots_vehicles.items():
+            location_index = self.index_manager.NodeToIndex(location_node)
+            self.routing_model.VehicleVar(location_index).SetValues([-1, vehicle_index])
+
+    def set_vehicles_distance_transit_matrix(self, vehicle_types, vehicle_indices: List[int]):
+        """Registers the transit costs of vehicles of the given types as a matrix,
+           OR Tools evaluates arcs without calling back into python during the search.
+           Vehicles with the same types share the registered matrix."""
+        transit_matrix = self.locations_service.get_transit_matrix(vehicle_types)
+        transit_callback_index = self.routing_model.RegisterTransitMatrix(transit_matrix.tolist())
+        for vehicle_index in vehicle_indices:
+            self.routing_model.SetArcCostEvaluatorOfVehicle(transit_callback_index, vehicle_index)
         return transit_callback_index
 
-    def setup_vehicle_distance_transit_cost(self, distance_callback):
-        transit_callback_indices = []
-        for vehicle_index, vehicle in enumerate(self.vehicles_service.vehicles):
-            transit_callback_index = self.set_vehicle_distance_transit_callback(
-                vehicle_index, vehicle, distance_callback)
-            transit_callback_indices.append(transit_callback_index)
+    def setup_vehicle_distance_transit_cost(self):
+        transit_callback_indices = [None] * self.vehicles_service.get_num_vehicles()
+        vehicles_indices_by_types = self.vehicles_service.get_vehicles_indices_by_types()
+        for vehicle_types, vehicle_indices in vehicles_indices_by_types.items():
+            transit_callback_index = self.set_vehicles_distance_transit_matrix(vehicle_types, vehicle_indices)
+            for vehicle_index in vehicle_indices:
+                transit_callback_indices[vehicle_index] = transit_callback_index
         return transit_callback_indices
 
     def setup_transit_dimension(self, slack, vehicle_max_distance, cumul_to_zero, dimension_name, callback_indices):
@@ -77,15 +87,22 @@ class ORToolsService:
     def setup_forbidden_time_window_constraints(self, dimension_name):
         """Set time windows when the nodes must not be visited.
            The only way to consider multiple delivering time windows for a location
-           in OR Tools is excluding forbidden time windows from possible solutions."""
+           in OR Tools is excluding forbidden time windows from possible solutions.
+           Locations with a single allowed range have their cumul var range set instead, which propagates faster."""
         dimension = self.routing_model.GetDimensionOrDie(dimension_name)
         for location_node, location in enumerate(self.locations_service.locations):
             if location.is_depot:
                 continue
             location_index = self.index_manager.NodeToIndex(location_node)
-            forbidden_time_window = self.locations_service.get_location_forbidden_time_window(location)
-            self.routing_model.solver().AddConstraint(self.routing_model.solver().NotMemberCt(dimension.CumulVar(
-                location_index), forbidden_time_window['start'], forbidden_time_window['end']))
+            cumul_var = dimension.CumulVar(location_index)
+            allowed_range = self.locations_service.get_location_allowed_range_by_index(location_node)
+            if allowed_range is not None:
+                start, end = allowed_range
+                cumul_var.SetRange(start, end if end is not None else cumul_var.Max())
+                continue
+            forbidden_time_window = self.locations_service.get_location_forbidden_time_window_by_index(location_node)
+            self.routing_model.solver().AddConstraint(self.routing_model.solver().NotMemberCt(
+                cumul_var, forbidden_time_window['start'], forbidden_time_window['end']))
 
     def setup_depot_time_var_to_minimize(self, dimension_name):
         depot_index = self.locations_service.get_depot_index()
@@ -107,10 +124,12 @@ class ORToolsService:
             self.routing_model.AddVariableMinimizedByFinalizer(
                 dimension.CumulVar(vehicle_end_node))
 
-    def setup_max_load_weight_constraints(self, callback):
+    def setup_max_load_weight_constraints(self):
+        """Registers the demands of the nodes as a vector, OR Tools reads the load of a node without calling back
+           into python during the search."""
         vehicle_max_load_weights = self.vehicles_service.get_vehicles_max_load_weights()
         max_load_weight = max(vehicle_max_load_weights)
-        demand_callback_index = self.routing_model.RegisterUnaryTransitCallback(callback)
+        demand_callback_index = self.routing_model.RegisterUnaryTransitVector(self.locations_service.get_demands())
         dimension_name = 'load_weight'
         self.routing_model.AddDimensionWithVehicleCapacity(
             demand_callback_index, max_load_weight, vehicle_max_load_weights, True, dimension_name)
@@ -199,7 +218,7 @@ class ORToolsService:
             break_.maximum_start,  # maximum start time
             break_.duration,  # duration of break
             optional,  # if optional break
-            f'{break_._id}')
+            str(break_.get_break_id()))
 
     def get_node_cumul_var_bounds(self, solution, dimension, index):
         return (solution.Min(dimension.CumulVar(index)),
@@ -273,57 +292,35 @@ class ORToolsService:
     def break_was_performed(self, break_):
         return break_.PerformedValue()
 
-    def is_break_from_vehicle(self, vehicle_index, break_):
-        expected_vehicle_breaks = self.vehicles_service.get_vehicle_breaks_from_index(vehicle_index)
-        expected_vehicle_beaks_ids = expected_vehicle_breaks.get_breaks_ids()
-        break_name = break_.Var().Name()
-        # TODO: expected_vehicle_beaks_ids could be a hash table (set) and this would be O(1)?
-        for break_id in expected_vehicle_beaks_ids:
-            if break_name == break_id:
-                return True
-        return False
-
-    def get_vehicle_break_type(self, vehicle_index, break_name) -> BreakType:
-        vehicle_breaks = self.vehicles_service.get_vehicle_breaks_from_index(vehicle_index)
-        break_type = vehicle_breaks.get_type_from_id(break_name)
-        return break_type
-
-    def get_vehicle_breaks_solution(self, distance_dimension,
-                                    solution, vehicle_index) -> Dict[str, VehicleBreakSolution]:
-        vehicle_start_time = self.get_vehicle_route_start_time(distance_dimension, solution, vehicle_index)
-        vehicle_end_time = self.get_vehicle_route_end_time(distance_dimension, solution, vehicle_index)
+    def get_vehicles_breaks_solution(self, distance_dimension, solution) -> List[List[VehicleBreakSolution]]:
+        """Breaks performed by each vehicle inside its route, in a single pass over the intervals of the solution.
+           The intervals are named by the break ids, they are mapped to the vehicles by the breaks index."""
+        num_vehicles = self.vehicles_service.get_num_vehicles()
+        vehicles_start_times = [self.get_vehicle_route_start_time(distance_dimension, solution, vehicle_index)
+                                for vehicle_index in range(num_vehicles)]
+        vehicles_end_times = [self.get_vehicle_route_end_time(distance_dimension, solution, vehicle_index)
+                              for vehicle_index in range(num_vehicles)]
+        vehicles_breaks = [[] for _ in range(num_vehicles)]
         intervals = solution.IntervalVarContainer()
-        vehicle_breaks = {}
-
         for interval in range(intervals.Size()):
             break_ = intervals.Element(interval)
-            break_name = break_.Var().Name()
-            if not self.break_was_performed(break_) or not self.is_break_from_vehicle(vehicle_index, break_):
+            if not self.break_was_performed(break_):
                 continue
-            break_type = self.get_vehicle_break_type(vehicle_index, break_name)
+            vehicle_index, vehicle_break = self.vehicles_service.get_break_from_id(int(break_.Var().Name()))
             break_start = int(break_.StartValue())
-            if break_start < vehicle_start_time or break_start >= vehicle_end_time:
+            if break_start < vehicles_start_times[vehicle_index] or break_start >= vehicles_end_times[vehicle_index]:
                 continue
             break_duration = int(break_.DurationValue())
-            vehicle_breaks[break_name] = VehicleBreakSolution(break_start, break_duration, break_type)
-        return vehicle_breaks
+            vehicles_breaks[vehicle_index].append(VehicleBreakSolution(break_start, break_duration, vehicle_break.type))
+        return vehicles_breaks
 
-    def get_vehicle_lunch_break_from_solution(self, distance_dimension, solution, vehicle_index):
-        vehicle_breaks = self.get_vehicle_breaks_solution(distance_dimension, solution, vehicle_index)
-        for vehicle_break in vehicle_breaks.items():
-            if vehicle_break[1].type != BreakType.LUNCH:
-                continue
-            return vehicle_break
-
-    def get_vehicle_short_breaks_from_solution(self, distance_dimension, solution, vehicle_index):
-        vehicle_breaks = self.get_vehicle_breaks_solution(distance_dimension, solution, vehicle_index)
-        lunch_break_name = None
-        for vehicle_break in vehicle_breaks.items():
-            if vehicle_break[1].type == BreakType.LUNCH:
-                lunch_break_name = vehicle_break[0]
-        if lunch_break_name is not None:
-            del vehicle_breaks[lunch_break_name]
-        return vehicle_breaks.values()
+    def get_vehicle_lunch_break_from_solution(self, vehicle_breaks: List[VehicleBreakSolution]) -> VehicleBreakSolution:
+        for vehicle_break in vehicle_breaks:
+            if vehicle_break.type == BreakType.LUNCH:
+                return vehicle_break
+
+    def get_vehicle_short_breaks_from_solution(self, vehicle_breaks: List[VehicleBreakSolution]):
+        return [vehicle_break for vehicle_break in vehicle_breaks if vehicle_break.type != BreakType.LUNCH]
 
     def parse_solution(self, solution) -> RoutingSolution:
         routing_solution = RoutingSolution(self.locations_service)
@@ -335,18 +332,16 @@ class ORToolsService:
         load_weight_dimension = self.routing_model.GetDimensionOrDie('load_weight')
         routing_solution.set_status(RoutingSolutionStatus.SUCCESS, 'Solution found')
         routing_solution.objective_cost = solution.ObjectiveValue()
+        vehicles_breaks = self.get_vehicles_breaks_solution(distance_dimension, solution)
         for vehicle_index in range(self.vehicles_service.get_num_vehicles()):
             vehicle = self.vehicles_service.get_vehicle_from_index(vehicle_index)
             vehicle_routing_solution = VehicleRoutingSolution(vehicle)
             vehicle_route = self.get_vehicle_route(
                 solution, vehicle_index, distance_dimension, load_weight_dimension)
             vehicle_routing_solution.vehicle_route = vehicle_route
-            vehicle_short_breaks = self.get_vehicle_short_breaks_from_solution(
-                distance_dimension, solution, vehicle_index)
-            vehicle_lunch_break = self.get_vehicle_lunch_break_from_solution(
-                distance_dimension, solution, vehicle_index)
-            if vehicle_lunch_break is not None:
-                vehicle_routing_solution.vehicle_lunch_break = vehicle_lunch_break[1]
-            vehicle_routing_solution.vehicle_short_breaks = vehicle_short_breaks
+            vehicle_routing_solution.vehicle_lunch_break = self.get_vehicle_lunch_break_from_solution(
+                vehicles_breaks[vehicle_index])
+            vehicle_routing_solution.vehicle_short_breaks = self.get_vehicle_short_breaks_from_solution(
+                vehicles_breaks[vehicle_index])
             routing_solution.add_vehicle_routing_solution(vehicle_routing_solution)
         return routing_solution
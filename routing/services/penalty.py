@@ -7,51 +7,65 @@ if TYPE_CHECKING:
     from routing.services.locations import LocationsService
 
 import math
+import numpy
 
 
-def calc_max_route(locations_service: LocationsService, **kwargs):
+def get_max_route(locations_service: LocationsService):
+    """Length of the greedy route from the depot always going to the farthest location not visited yet,
+       then back to the depot. Ties are broken by the order of the locations."""
+    nodes = locations_service.get_unique_nodes()
+    depot_node = nodes.index(locations_service.get_depot_index())
+    distances = locations_service.distance_matrix[numpy.ix_(nodes, nodes)]
+    exit_routes = numpy.where(distances < locations_service.infinity, distances, -1)
+    not_visited = numpy.ones(len(nodes), dtype=bool)
+    not_visited[depot_node] = False
+
     max_route = 0
-    visited_nodes = []
-    to_visit_nodes = len(locations_service.locations)
-
-    depot_index = locations_service.get_depot_index()
-    depot_name = locations_service.get_name_from_index(depot_index)
-    current_node = depot_name
-
-    while to_visit_nodes > 0:
-        visited_nodes.append(current_node)
-        exit_routes = locations_service.distance_map[current_node]
-        next_node = max(
-            exit_routes, key=lambda next: exit_routes[next]
-            if not next == depot_name and next not in visited_nodes else -1)
-        max_route += exit_routes[next_node]
+    current_node = depot_node
+    for _ in range(len(nodes)):
+        candidates = numpy.where(not_visited, exit_routes[current_node], -1)
+        next_node = int(numpy.argmax(candidates))
+        if candidates[next_node] < 0:
+            break
+        max_route += int(candidates[next_node])
+        not_visited[next_node] = False
         current_node = next_node
-        to_visit_nodes -= 1
-
-    exit_routes = locations_service.distance_map[current_node]
-    max_route += exit_routes[depot_name]
 
+    max_route += int(distances[current_node, depot_node])
     return max_route
 
 
-def calc_demand_multiplier(locations_service: LocationsService, location, **kwargs):
+def calc_max_route(locations_service: LocationsService, **kwargs):
+    return locations_service.get_statistic('max_route', get_max_route)
+
+
+def get_demand_penalty_param(locations_service: LocationsService):
     max_route = calc_max_route(locations_service)
     magnitude = round(math.log(max_route, 10))
-    penalty_param = 10**magnitude
+    return 10**magnitude
+
+
+def calc_demand_multiplier(locations_service: LocationsService, location, **kwargs):
+    penalty_param = locations_service.get_statistic('demand_penalty_param', get_demand_penalty_param)
     return penalty_param * location.demand
 
 
+def get_max_distance(locations_service: LocationsService):
+    """Longest distance between two locations plus the service time of the destiny."""
+    nodes = locations_service.get_unique_nodes()
+    distances = locations_service.distance_matrix[numpy.ix_(nodes, nodes)]
+    service_times = locations_service.get_service_times_array()[nodes]
+    transit_times = numpy.where(distances < locations_service.infinity, distances + service_times, 0)
+    return 2 * int(transit_times.max())
+
+
 def calc_max_distance(locations_service: LocationsService, **kwargs):
-    max_distance = 0
-    for destinies in locations_service.distance_map.values():
-        for name, distance in destinies.items():
-            service_time = locations_service.get_location_from_name(name).service_time
-            distance = distance + service_time
-            if distance > max_distance:
-                max_distance = distance
-    return 2 * max_distance
+    return locations_service.get_statistic('max_distance', get_max_distance)
 
 
 def calc_depot_distance(locations_service: LocationsService, location: Location, **kwargs):
     depot = locations_service.get_depot()
-    return 2 * location.distance_to(depot.name) + location.service_time + depot.service_time + 60 * 24
+    # from the matrix of the service, it has the estimated distances
+    location_node = locations_service.get_node_from_name(location.name)
+    depot_distance = int(locations_service.distance_matrix[location_node, locations_service.get_depot_index()])
+    return 2 * depot_distance + location.service_time + depot.service_time + 60 * 24
@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List
+from routing.entities.routing_solution import RoutingSolution, RoutingSolutionStatus
+from routing.entities.search_strategy import SearchStrategy
+from routing.entities.system_entities import SystemEntities
+
+
+def timed_solve(solve: Callable, system_entities: SystemEntities, search_strategy: SearchStrategy):
+    start = time.perf_counter()
+    solution = solve(system_entities, search_strategy)
+    return solution, time.perf_counter() - start
+
+
+class PortfolioService:
+    """Builds the same model in one process per search strategy and searches them in parallel,
+       all of them with the same time limit. The best solution found is kept."""
+
+    def __init__(self, solve: Callable, system_entities: SystemEntities, search_strategies: List[SearchStrategy]):
+        self.solve = solve
+        self.system_entities = system_entities
+        self.search_strategies = search_strategies
+
+    def get_solutions(self):
+        with ProcessPoolExecutor(max_workers=len(self.search_strategies)) as executor:
+            futures = [executor.submit(timed_solve, self.solve, self.system_entities, search_strategy)
+                       for search_strategy in self.search_strategies]
+            return [future.result() for future in futures]
+
+    def get_best_solution(self, solutions: List[RoutingSolution]) -> RoutingSolution:
+        found_solutions = [solution for solution in solutions if solution.status == RoutingSolutionStatus.SUCCESS]
+        if not found_solutions:
+            return solutions[0]
+        return min(found_solutions, key=lambda solution: solution.objective_cost)
+
+    def get_strategies_metadata(self, solutions_and_times):
+        strategies_metadata = []
+        for search_strategy, (solution, solve_time) in zip(self.search_strategies, solutions_and_times):
+            strategy_metadata = search_strategy.to_json()
+            strategy_metadata['objective_cost'] = solution.objective_cost
+            strategy_metadata['time'] = round(solve_time, 3)
+            strategies_metadata.append(strategy_metadata)
+        return strategies_metadata
+
+    def start(self) -> RoutingSolution:
+        solutions_and_times = self.get_solutions()
+        solution = self.get_best_solution([solution for solution, _ in solutions_and_times])
+        solution.metadata['portfolio'] = self.get_strategies_metadata(solutions_and_times)
+        return solution
@@ -1,87 +1,177 @@
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
+from ortools.util import optional_boolean_pb2
+from typing import Dict, List
 
-from routing.services.logging import log_exception
+from routing.services.logging import logger
 from routing.services.locations import LocationsService
 from routing.services.vehicles import VehiclesService
 from routing.services.ortools import ORToolsService
+from routing.services.utils import has_accessibility
+from routing.services.timings import Timings
+from routing.services.search_monitor import SearchMonitor
 from routing.entities.routing_solution import RoutingSolution, RoutingSolutionStatus
+from routing.entities.search_strategy import SearchStrategy
+from routing.entities.stopping_criteria import StoppingCriteria
+from routing.entities.search_parameters import SearchParameters
+from routing.settings import DISTANCE_SLACK, VEHICLE_MAX_DISTANCE
 
 
 class RoutingService:
     def __init__(self, locations_service: LocationsService,
                  vehicles_service: VehiclesService,
                  solver_service: ORToolsService,
-                 search_time_limit: int):
+                 search_time_limit: float,
+                 initial_routes: Dict[str, List[str]] = None,
+                 search_strategy: SearchStrategy = None,
+                 timings: Timings = None,
+                 stopping_criteria: StoppingCriteria = None,
+                 search_parameters: SearchParameters = None,
+                 vehicles_reloads: List[int] = None):
         self.locations_service = locations_service
         self.vehicles_service = vehicles_service
         self.solver_service = solver_service
         self.search_time_limit = search_time_limit
+        self.initial_routes = initial_routes if initial_routes is not None else {}
+        self.search_strategy = search_strategy if search_strategy is not None else SearchStrategy()
+        self.timings = timings if timings is not None else Timings()
+        self.stopping_criteria = stopping_criteria if stopping_criteria is not None else StoppingCriteria()
+        self.search_parameters = search_parameters if search_parameters is not None else SearchParameters()
+        # depot copies of each vehicle, None when they are shared by the vehicles
+        self.vehicles_reloads = vehicles_reloads
         self.index_manager = solver_service.get_index_manager()
         self.routing_model = solver_service.get_routing_model()
+        self.search_monitor = SearchMonitor(self.routing_model, self.stopping_criteria)
         self.solution = None
         self.setup_model()
 
-    def distance_callback(self, vehicle_type, from_index, to_index):
-        """Returns the distance between the two nodes."""
-        # Convert from routing variable Index to distance matrix NodeIndex.
-        # ortools suppress the exception, we're at least logging it
-        try:
-            from_node = self.index_manager.IndexToNode(from_index)
-            to_node = self.index_manager.IndexToNode(to_index)
-            distance = self.locations_service.get_distance_by_index(vehicle_type, from_node, to_node)
-            service_time = self.locations_service.get_service_time_by_index(from_node)
-            return service_time + distance
-        except Exception as e:
-            log_exception('distance_callback', locals(), e)
-
-    def demand_callback(self, location_index):
-        location_node = self.index_manager.IndexToNode(location_index)
-        demand = self.locations_service.get_demand_by_index(location_node)
-        return demand
-
     def setup_model(self):
         vehicle_max_load_weights = self.vehicles_service.get_vehicles_max_load_weights()
-        self.locations_service.set_refill_depots_demand(max(vehicle_max_load_weights))
+        if self.vehicles_reloads is None:
+            self.locations_service.set_refill_depots_demand(max(vehicle_max_load_weights))
+        else:
+            self.locations_service.set_vehicles_refill_depots(self.vehicles_reloads, vehicle_max_load_weights)
+            self.solver_service.set_allowed_vehicles_to_refill_depots()
         # self.solver_service.set_allowed_vehicles_to_nodes()
-        transit_callback_indices = self.solver_service.setup_vehicle_distance_transit_cost(self.distance_callback)
-        distance_slack = 90
-        vehicle_max_distance = 10_000
+        with self.timings.measure('transit_cost'):
+            transit_callback_indices = self.solver_service.setup_vehicle_distance_transit_cost()
         distance_dimension_name = 'distance'
-        self.solver_service.setup_transit_dimension(callback_indices=transit_callback_indices,
-                                                    slack=distance_slack,
-                                                    vehicle_max_distance=vehicle_max_distance,
-                                                    cumul_to_zero=False,
-                                                    dimension_name=distance_dimension_name)
-        self.solver_service.set_max_vehicle_journey(distance_dimension_name)
-        self.solver_service.set_vehicle_breaks(distance_dimension_name)
+        with self.timings.measure('distance_dimension'):
+            self.solver_service.setup_transit_dimension(callback_indices=transit_callback_indices,
+                                                        slack=DISTANCE_SLACK,
+                                                        vehicle_max_distance=VEHICLE_MAX_DISTANCE,
+                                                        cumul_to_zero=False,
+                                                        dimension_name=distance_dimension_name)
+            self.solver_service.set_max_vehicle_journey(distance_dimension_name)
+        with self.timings.measure('breaks'):
+            self.solver_service.set_vehicle_breaks(distance_dimension_name)
         # dimension = self.routing_model.GetDimensionOrDie(distance_dimension_name)
         # dimension.SetGlobalSpanCostCoefficient(1000)
-        self.solver_service.setup_forbidden_time_window_constraints(distance_dimension_name)
-        self.solver_service.setup_depot_time_var_to_minimize(distance_dimension_name)
-        self.solver_service.setup_max_load_weight_constraints(self.demand_callback)
-        self.solver_service.setup_dropping_penalties()
+        with self.timings.measure('forbidden_time_windows'):
+            self.solver_service.setup_forbidden_time_window_constraints(distance_dimension_name)
+            self.solver_service.setup_depot_time_var_to_minimize(distance_dimension_name)
+        with self.timings.measure('capacity'):
+            self.solver_service.setup_max_load_weight_constraints()
+        with self.timings.measure('penalties'):
+            self.solver_service.setup_dropping_penalties()
+        self.search_monitor.setup()
 
     def get_search_parameters(self):
         search_parameters = pywrapcp.DefaultRoutingSearchParameters()
         search_parameters.local_search_metaheuristic = (
-            routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
+            routing_enums_pb2.LocalSearchMetaheuristic.Value.Value(self.search_strategy.local_search_metaheuristic))
         search_parameters.first_solution_strategy = (
-            routing_enums_pb2.FirstSolutionStrategy.LOCAL_CHEAPEST_ARC)
-        search_parameters.time_limit.seconds = self.search_time_limit
-        # search_parameters.solution_limit = 1
-        # search_parameters.log_search = True
+            routing_enums_pb2.FirstSolutionStrategy.Value.Value(self.search_strategy.first_solution_strategy))
+        search_parameters.time_limit.FromMilliseconds(round(self.search_time_limit * 1000))
+        if self.search_parameters.lns_time_limit is not None:
+            search_parameters.lns_time_limit.FromMilliseconds(round(self.search_parameters.lns_time_limit * 1000))
+        if self.search_parameters.guided_local_search_lambda_coefficient is not None:
+            search_parameters.guided_local_search_lambda_coefficient = (
+                self.search_parameters.guided_local_search_lambda_coefficient)
+        for operator, enabled in self.search_parameters.local_search_operators.items():
+            setattr(search_parameters.local_search_operators, operator,
+                    optional_boolean_pb2.BOOL_TRUE if enabled else optional_boolean_pb2.BOOL_FALSE)
+        if self.stopping_criteria.solution_limit is not None:
+            search_parameters.solution_limit = self.stopping_criteria.solution_limit
         return search_parameters
 
+    def get_initial_routes_indices(self) -> List[List[int]]:
+        """Maps the location names of the initial routes to routing indices, one route per vehicle.
+           Depot names on the route ends are implicit and ignored, a depot name inside the route is a reload
+           and takes a depot copy of the vehicle not used yet.
+           Unknown, repeated or inaccessible locations are dropped.
+        """
+        depot_name = self.locations_service.get_depot().name
+        visited_nodes = set()
+        routes_indices = []
+        for vehicle_index, vehicle in enumerate(self.vehicles_service.vehicles):
+            refill_depots_nodes = [location_node for location_node in
+                                   self.locations_service.get_vehicle_refill_depots_nodes(vehicle_index)
+                                   if location_node not in visited_nodes]
+            route = list(self.initial_routes.get(vehicle.name, []))
+            while route and route[0] == depot_name:
+                route.pop(0)
+            while route and route[-1] == depot_name:
+                route.pop()
+            route_indices = []
+            for location_name in route:
+                if location_name == depot_name:
+                    location_node = refill_depots_nodes.pop(0) if refill_depots_nodes else None
+                else:
+                    location_node = self.locations_service.nodes_index.get(location_name)
+                if location_node is None or location_node in visited_nodes:
+                    continue
+                location = self.locations_service.get_location_from_index(location_node)
+                if not has_accessibility(vehicle.types, location):
+                    continue
+                visited_nodes.add(location_node)
+                route_indices.append(self.index_manager.NodeToIndex(location_node))
+            routes_indices.append(route_indices)
+        return routes_indices
+
+    def get_feasible_initial_solution(self, routes_indices: List[List[int]]):
+        """Reads the routes as an assignment. If the routes break a constraint (time windows, capacity...)
+           the locations that can't be added are dropped one by one."""
+        initial_solution = self.routing_model.ReadAssignmentFromRoutes(routes_indices, True)
+        if initial_solution is not None:
+            return initial_solution
+        feasible_routes_indices = [[] for _ in routes_indices]
+        for vehicle_index, route_indices in enumerate(routes_indices):
+            for index in route_indices:
+                feasible_routes_indices[vehicle_index].append(index)
+                if self.routing_model.ReadAssignmentFromRoutes(feasible_routes_indices, True) is None:
+                    feasible_routes_indices[vehicle_index].pop()
+        logger.info('Initial routes are infeasible, %s locations dropped',
+                    sum(map(len, routes_indices)) - sum(map(len, feasible_routes_indices)))
+        return self.routing_model.ReadAssignmentFromRoutes(feasible_routes_indices, True)
+
+    def get_initial_solution(self, search_parameters):
+        if not self.initial_routes:
+            return None
+        # the model must be closed with the search parameters before reading the routes
+        self.routing_model.CloseModelWithParameters(search_parameters)
+        routes_indices = self.get_initial_routes_indices()
+        return self.get_feasible_initial_solution(routes_indices)
+
     def solve_problem(self, search_parameters):
-        solution = self.routing_model.SolveWithParameters(search_parameters)
+        with self.timings.measure('initial_solution'):
+            initial_solution = self.get_initial_solution(search_parameters)
+        with self.timings.measure('search'):
+            self.search_monitor.start()
+            if initial_solution is not None:
+                solution = self.routing_model.SolveFromAssignmentWithParameters(initial_solution, search_parameters)
+            else:
+                solution = self.routing_model.SolveWithParameters(search_parameters)
+            self.search_monitor.finish(self.search_time_limit)
         return solution
 
     def start(self):
         self.solution = self.solve_problem(self.get_search_parameters())
 
     def get_solution(self) -> RoutingSolution:
-        solution = self.solver_service.parse_solution(self.solution)
+        with self.timings.measure('parse_solution'):
+            solution = self.solver_service.parse_solution(self.solution)
+        solution.metadata['search'] = self.search_monitor.to_json()
         return solution
 
     def print_solution(self):
@@ -0,0 +1,97 @@
+import copy
+from math import ceil
+import yaml
+import jsonschema
+from routing.entities.exception import SchemaValidationError
+from routing.settings import SCHEMA_DISTANCES_VALIDATION, SCHEMA_DISTANCES_SAMPLE_SIZE
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+
+def inline_refs(schema, definitions):
+    """Schema with every #/definitions/ reference replaced by the definition it points to."""
+    if isinstance(schema, dict):
+        if '$ref' in schema:
+            return inline_refs(definitions[schema['$ref'].split('/')[-1]], definitions)
+        return {key: inline_refs(value, definitions) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [inline_refs(value, definitions) for value in schema]
+    return schema
+
+
+def compile_schema(schema):
+    """Function raising SchemaValidationError with the path of the first error of the data.
+       Uses the code generated by fastjsonschema when it is installed, jsonschema otherwise."""
+    if fastjsonschema is not None:
+        fast_validate = fastjsonschema.compile(schema, use_default=False)
+
+        def validate(data):
+            try:
+                fast_validate(data)
+            except fastjsonschema.JsonSchemaValueException as e:
+                # message starts with the name of the value, like data.locations[0].demand
+                message = e.message[len(e.name):].strip()
+                raise SchemaValidationError(message, [str(key) for key in e.path[1:]])
+        return validate
+
+    validator = jsonschema.validators.validator_for(schema)(schema)
+
+    def validate(data):
+        error = jsonschema.exceptions.best_match(validator.iter_errors(data))
+        if error is not None:
+            raise SchemaValidationError(error.message, [str(key) for key in error.absolute_path])
+    return validate
+
+
+class SchemaValidator:
+    """Validator of a definition of an open api file, compiled once.
+       The distances of the locations and the distance matrix are O(N²), depending on distances_validation
+       they are validated in full, only their types ('structural') or their types plus the distances
+       of at most sample_size locations ('sampled')."""
+
+    def __init__(self, schema_path, definition, distances_validation=SCHEMA_DISTANCES_VALIDATION,
+                 sample_size=SCHEMA_DISTANCES_SAMPLE_SIZE):
+        with open(schema_path) as file:
+            definitions = yaml.safe_load(file)['definitions']
+        self.distances_validation = distances_validation
+        self.sample_size = sample_size
+
+        full_definitions = copy.deepcopy(definitions)
+        if distances_validation != 'full':
+            definitions['Location']['properties']['distances'] = {'type': 'array'}
+            definitions[definition]['properties']['distance_matrix'] = {'type': 'array',
+                                                                        'items': {'type': 'array'}}
+        self.validate_input = compile_schema(inline_refs(definitions[definition], definitions))
+        self.validate_distances = compile_schema(
+            inline_refs(full_definitions['Location']['properties']['distances'], full_definitions))
+        self.validate_distance_matrix_row = compile_schema(
+            inline_refs(full_definitions[definition]['properties']['distance_matrix']['items'], full_definitions))
+
+    def get_sample(self, items):
+        """Indices of evenly spaced items, at most sample_size of them."""
+        step = max(1, ceil(len(items) / self.sample_size))
+        return range(0, len(items), step)
+
+    @staticmethod
+    def validate_at(validate, data, path):
+        try:
+            validate(data)
+        except SchemaValidationError as e:
+            raise SchemaValidationError(str(e), path + e.path)
+
+    def validate(self, input_json):
+        self.validate_input(input_json)
+        if self.distances_validation != 'sampled':
+            return
+        locations = input_json['locations']
+        for index in self.get_sample(locations):
+            if 'distances' in locations[index]:
+                self.validate_at(self.validate_distances, locations[index]['distances'],
+                                 ['locations', str(index), 'distances'])
+        distance_matrix = input_json.get('distance_matrix', [])
+        for index in self.get_sample(distance_matrix):
+            self.validate_at(self.validate_distance_matrix_row, distance_matrix[index],
+                             ['distance_matrix', str(index)])
@@ -0,0 +1,105 @@
+import bisect
+import time
+from ortools.constraint_solver import pywrapcp
+from ortools.constraint_solver import routing_enums_pb2
+from routing.entities.stopping_criteria import StoppingCriteria
+from routing.services.logging import logger
+from routing.settings import LOG_SEARCH
+
+
+class StopReason:
+    OBJECTIVE_TARGET = 'OBJECTIVE_TARGET'
+    PLATEAU = 'PLATEAU'
+    SOLUTION_LIMIT = 'SOLUTION_LIMIT'
+    TIME_LIMIT = 'TIME_LIMIT'
+    COMPLETED = 'COMPLETED'
+
+
+class SearchMonitor:
+    """Follows the objective of the solutions found by the search and stops it on the stopping criteria.
+       The plateau and the objective target are checked by a custom limit, called by the solver on every
+       search node, so it only compares the time with the improvements recorded on each solution."""
+    # seconds, the solver time limit clock doesn't start exactly with the search
+    time_limit_tolerance = 0.01
+
+    def __init__(self, routing_model: pywrapcp.RoutingModel, stopping_criteria: StoppingCriteria = None):
+        self.routing_model = routing_model
+        self.stopping_criteria = stopping_criteria if stopping_criteria is not None else StoppingCriteria()
+        self.start_time = None
+        self.end_time = None
+        self.num_solutions = 0
+        # time and objective of each solution improving the best objective
+        self.improvement_times = []
+        self.improvement_objectives = []
+        self.stop_reason = None
+
+    def setup(self):
+        self.routing_model.AddAtSolutionCallback(self.on_solution)
+        # the limit must live as long as the model
+        self.limit = self.routing_model.solver().CustomLimit(self.should_stop)
+        self.routing_model.AddSearchMonitor(self.limit)
+
+    def get_elapsed_time(self):
+        return time.perf_counter() - self.start_time
+
+    def on_solution(self):
+        objective = self.routing_model.CostVar().Max()
+        self.num_solutions += 1
+        if not self.improvement_objectives or objective < self.improvement_objectives[-1]:
+            self.improvement_times.append(self.get_elapsed_time())
+            self.improvement_objectives.append(objective)
+        if LOG_SEARCH:
+            logger.info('Search solution %d: objective %d, %d branches, %d ms',
+                        self.num_solutions, objective, self.routing_model.solver().Branches(),
+                        self.routing_model.solver().WallTime())
+
+    def has_reached_objective_target(self):
+        objective_target = self.stopping_criteria.objective_target
+        return (objective_target is not None and bool(self.improvement_objectives)
+                and self.improvement_objectives[-1] <= objective_target)
+
+    def has_reached_plateau(self):
+        plateau_time = self.stopping_criteria.plateau_time
+        if plateau_time is None or not self.improvement_times:
+            return False
+        plateau_start = self.get_elapsed_time() - plateau_time
+        if plateau_start < self.improvement_times[0]:
+            return False
+        # best objective at the start of the plateau
+        previous_improvement = bisect.bisect_right(self.improvement_times, plateau_start) - 1
+        previous_objective = self.improvement_objectives[previous_improvement]
+        improvement = previous_objective - self.improvement_objectives[-1]
+        return improvement <= abs(previous_objective) * self.stopping_criteria.plateau_improvement / 100
+
+    def should_stop(self):
+        if self.has_reached_objective_target():
+            self.stop_reason = StopReason.OBJECTIVE_TARGET
+        elif self.has_reached_plateau():
+            self.stop_reason = StopReason.PLATEAU
+        return self.stop_reason is not None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+
+    def finish(self, time_limit):
+        self.end_time = self.get_elapsed_time()
+        if self.stop_reason is not None:
+            return
+        search_status = self.routing_model.status()
+        solution_limit = self.stopping_criteria.solution_limit
+        if solution_limit is not None and self.num_solutions >= solution_limit:
+            self.stop_reason = StopReason.SOLUTION_LIMIT
+        elif self.end_time >= time_limit - self.time_limit_tolerance or search_status in (
+                routing_enums_pb2.RoutingSearchStatus.ROUTING_PARTIAL_SUCCESS_LOCAL_OPTIMUM_NOT_REACHED,
+                routing_enums_pb2.RoutingSearchStatus.ROUTING_FAIL_TIMEOUT):
+            self.stop_reason = StopReason.TIME_LIMIT
+        else:
+            self.stop_reason = StopReason.COMPLETED
+
+    def to_json(self):
+        return {
+            'stop_reason': self.stop_reason,
+            'solutions': self.num_solutions,
+            'time_to_best': round(self.improvement_times[-1], 3) if self.improvement_times else None,
+            'search_time': round(self.end_time, 3) if self.end_time is not None else None
+        }
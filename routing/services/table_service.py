@@ -0,0 +1,153 @@
+import http.client
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import numpy
+from routing.entities.exception import TableServiceError
+from routing.settings import (INFINITY,
+                              TABLE_SERVICE_URL,
+                              TABLE_SERVICE_PROFILE,
+                              TABLE_SERVICE_TILE_SIZE,
+                              TABLE_SERVICE_WORKERS,
+                              TABLE_SERVICE_CACHE_SIZE,
+                              TABLE_SERVICE_TIMEOUT)
+
+
+def get_tiles(nodes, tile_size):
+    return [nodes[start:start + tile_size] for start in range(0, len(nodes), tile_size)]
+
+
+class TableClient:
+    """Keep-alive HTTP connections to the table service. A connection can't be shared between threads, each thread
+       opens its own and reuses it for all its requests."""
+
+    def __init__(self, url, timeout):
+        split_url = urlsplit(url)
+        self.connection_class = (http.client.HTTPSConnection if split_url.scheme == 'https'
+                                 else http.client.HTTPConnection)
+        self.host = split_url.hostname
+        self.port = split_url.port
+        self.path = split_url.path.rstrip('/')
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def get_connection(self):
+        if getattr(self.local, 'connection', None) is None:
+            self.local.connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+        return self.local.connection
+
+    def close(self):
+        """Closes the connection of the calling thread."""
+        if getattr(self.local, 'connection', None) is not None:
+            self.local.connection.close()
+            self.local.connection = None
+
+    def get(self, path):
+        """Decoded JSON response of the GET. The request is sent again on a new connection once, the server may have
+           closed the kept alive one."""
+        for attempt in range(2):
+            connection = self.get_connection()
+            try:
+                connection.request('GET', self.path + path)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                self.close()
+                if attempt:
+                    raise TableServiceError(f'Table service {self.host}:{self.port} failed: {e}')
+                continue
+            if response.status != 200:
+                raise TableServiceError(f'Table service {self.host}:{self.port} answered {response.status}: '
+                                        f'{body[:200].decode(errors="replace")}')
+            return json.loads(body)
+
+
+class TableService:
+    """Travel times in minutes between coordinates, from the durations of an OSRM compatible table service.
+       The matrix is fetched in tiles, in parallel, each thread on its own keep-alive connection. The rows of the
+       last cache_size coordinates are cached, only the sources missing a destination are fetched again.
+       Unreachable pairs are infinity. The service is disabled while the url is None."""
+
+    def __init__(self, url=None, profile=TABLE_SERVICE_PROFILE, tile_size=TABLE_SERVICE_TILE_SIZE,
+                 workers=TABLE_SERVICE_WORKERS, cache_size=TABLE_SERVICE_CACHE_SIZE, timeout=TABLE_SERVICE_TIMEOUT):
+        self.url = url
+        self.profile = profile
+        self.tile_size = tile_size
+        self.workers = workers
+        self.cache_size = cache_size
+        self.client = TableClient(url, timeout) if url is not None else None
+        # minutes from a (latitude, longitude) to the destinations fetched with it, least recently used first
+        self.rows = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def get_executor(self):
+        # created on first use, after gunicorn forked the worker process. The threads and their connections are
+        # kept between the matrices
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='table-service')
+            return self.executor
+
+    def get_tile(self, sources, destinations):
+        """Minutes from each source to each destination, (latitude, longitude) pairs."""
+        coordinates = ';'.join(f'{longitude},{latitude}' for latitude, longitude in sources + destinations)
+        sources_indexes = ';'.join(map(str, range(len(sources))))
+        destinations_indexes = ';'.join(map(str, range(len(sources), len(sources) + len(destinations))))
+        response = self.client.get(f'/table/v1/{self.profile}/{coordinates}?sources={sources_indexes}'
+                                   f'&destinations={destinations_indexes}&annotations=duration')
+        if response.get('code') != 'Ok':
+            raise TableServiceError(f'Table service failed: {response.get("code")} {response.get("message", "")}')
+        # unreachable destinations are null
+        durations = numpy.array(response['durations'], dtype=numpy.float64)
+        return numpy.where(numpy.isnan(durations), INFINITY, numpy.ceil(durations / 60)).astype(numpy.int64)
+
+    def get_cached_rows(self, coordinates, matrix):
+        """Fills the rows of the matrix cached for all the coordinates, returns the indexes of the other ones."""
+        missing_sources = []
+        with self.lock:
+            for index, source in enumerate(coordinates):
+                row = self.rows.get(source)
+                if row is None or any(destination not in row for destination in coordinates):
+                    missing_sources.append(index)
+                    continue
+                self.rows.move_to_end(source)
+                matrix[index] = [row[destination] for destination in coordinates]
+        return missing_sources
+
+    def cache_rows(self, coordinates, matrix, sources):
+        with self.lock:
+            for index in sources:
+                row = self.rows.pop(coordinates[index], {})
+                row.update(zip(coordinates, matrix[index].tolist()))
+                self.rows[coordinates[index]] = row
+            while len(self.rows) > self.cache_size:
+                self.rows.popitem(last=False)
+
+    def get_matrix(self, coordinates) -> numpy.ndarray:
+        """Minutes between every pair of (latitude, longitude), locations at the same coordinates, like the depot
+           copies, are fetched once."""
+        if self.client is None:
+            raise TableServiceError('There is no table service, set TABLE_SERVICE_URL to estimate the distances '
+                                    'with the table method.')
+        unique_coordinates, inverse = numpy.unique(numpy.asarray(coordinates, dtype=numpy.float64), axis=0,
+                                                   return_inverse=True)
+        unique_coordinates = [tuple(coordinate) for coordinate in unique_coordinates.tolist()]
+        matrix = numpy.empty((len(unique_coordinates), len(unique_coordinates)), dtype=numpy.int64)
+        missing_sources = self.get_cached_rows(unique_coordinates, matrix)
+        if missing_sources:
+            tiles = [(sources, destinations) for sources in get_tiles(missing_sources, self.tile_size)
+                     for destinations in get_tiles(list(range(len(unique_coordinates))), self.tile_size)]
+            tiles_durations = self.get_executor().map(
+                lambda tile: self.get_tile([unique_coordinates[index] for index in tile[0]],
+                                           [unique_coordinates[index] for index in tile[1]]), tiles)
+            for (sources, destinations), durations in zip(tiles, tiles_durations):
+                matrix[numpy.ix_(sources, destinations)] = durations
+            self.cache_rows(unique_coordinates, matrix, missing_sources)
+        inverse = inverse.reshape(-1)
+        return matrix[numpy.ix_(inverse, inverse)]
+
+
+table_service = TableService(TABLE_SERVICE_URL)
@@ -0,0 +1,64 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable
+
+
+class Timings:
+    """Seconds spent on each phase of a request, phases measured more than once are summed."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0) + seconds
+
+    def update(self, phases: Dict[str, float]):
+        for phase, seconds in phases.items():
+            self.add(phase, seconds)
+
+    def to_json(self):
+        return {phase: round(seconds, 6) for phase, seconds in self.phases.items()}
+
+
+class TimingsHistograms:
+    """Prometheus histograms of the phases durations, labeled by phase."""
+
+    def __init__(self, name: str, buckets: Iterable[float]):
+        self.name = name
+        self.buckets = sorted(buckets)
+        self.bucket_counts: Dict[str, list] = {}
+        self.sums: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, phases: Dict[str, float]):
+        with self.lock:
+            for phase, seconds in phases.items():
+                bucket_counts = self.bucket_counts.setdefault(phase, [0] * len(self.buckets))
+                for bucket_index, bucket in enumerate(self.buckets):
+                    if seconds <= bucket:
+                        bucket_counts[bucket_index] += 1
+                self.sums[phase] = self.sums.get(phase, 0) + seconds
+                self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def to_prometheus(self):
+        """Histograms in the Prometheus text exposition format."""
+        lines = [f'# HELP {self.name} Duration of the routing phases in seconds.',
+                 f'# TYPE {self.name} histogram']
+        with self.lock:
+            for phase in sorted(self.counts):
+                for bucket, bucket_count in zip(self.buckets, self.bucket_counts[phase]):
+                    lines.append(f'{self.name}_bucket{{phase="{phase}",le="{bucket}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{phase="{phase}",le="+Inf"}} {self.counts[phase]}')
+                lines.append(f'{self.name}_sum{{phase="{phase}"}} {self.sums[phase]}')
+                lines.append(f'{self.name}_count{{phase="{phase}"}} {self.counts[phase]}')
+        return '\n'.join(lines) + '\n'
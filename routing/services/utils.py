@@ -3,7 +3,10 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from routing.entities.location import Location
+    from routing.entities.location import Location, TimeWindow
+
+from typing import List
+import numpy
 
 
 def has_accessibility(vehicle_type, location: Location):
@@ -13,3 +16,66 @@ def has_accessibility(vehicle_type, location: Location):
         Vehicle is accessible to location if the intersect of the sets are not empty
     """
     return bool(vehicle_type.intersection(location.accessibility))
+
+
+def get_forbidden_ranges(time_windows: List[List[TimeWindow]], day_end: int):
+    """Integer ranges of [0, day_end] outside the time windows of each location, found in one sweep
+       over the time windows sorted by location and start. Overlapping and adjacent windows are merged.
+    Returns:
+        List[Dict]: start and end lists of the forbidden ranges, in order, for each location
+    """
+    location_nodes = numpy.array([node for node, windows in enumerate(time_windows) for _ in windows],
+                                 dtype=numpy.int64)
+    starts = numpy.array([window.start for windows in time_windows for window in windows], dtype=numpy.int64)
+    ends = numpy.array([window.end for windows in time_windows for window in windows], dtype=numpy.int64)
+    starts = numpy.maximum(starts, 0)
+    ends = numpy.minimum(ends, day_end)
+    non_empty = starts <= ends
+    location_nodes, starts, ends = location_nodes[non_empty], starts[non_empty], ends[non_empty]
+    order = numpy.lexsort((starts, location_nodes))
+    location_nodes, starts, ends = location_nodes[order], starts[order], ends[order]
+
+    # running max of the ends per location, each location is shifted above the previous ones
+    offsets = location_nodes * (day_end + 1)
+    reached = numpy.maximum.accumulate(ends + offsets) - offsets
+    is_first = numpy.ones(len(location_nodes), dtype=bool)
+    is_first[1:] = location_nodes[1:] != location_nodes[:-1]
+    is_last = numpy.ones(len(location_nodes), dtype=bool)
+    is_last[:-1] = is_first[1:]
+    previous_reached = numpy.where(is_first, -1, numpy.roll(reached, 1))
+
+    gaps = starts > previous_reached + 1
+    tails = is_last & (reached < day_end)
+    without_windows = numpy.setdiff1d(numpy.arange(len(time_windows)), location_nodes)
+    forbidden_nodes = numpy.concatenate((location_nodes[gaps], location_nodes[tails], without_windows))
+    forbidden_starts = numpy.concatenate((previous_reached[gaps] + 1, reached[tails] + 1,
+                                          numpy.zeros(len(without_windows), dtype=numpy.int64)))
+    forbidden_ends = numpy.concatenate((starts[gaps] - 1, numpy.full(tails.sum(), day_end),
+                                        numpy.full(len(without_windows), day_end)))
+    order = numpy.lexsort((forbidden_starts, forbidden_nodes))
+
+    forbidden_ranges = [{'start': [], 'end': []} for _ in time_windows]
+    for node, start, end in zip(forbidden_nodes[order].tolist(), forbidden_starts[order].tolist(),
+                                forbidden_ends[order].tolist()):
+        forbidden_ranges[node]['start'].append(start)
+        forbidden_ranges[node]['end'].append(end)
+    return forbidden_ranges
+
+
+def get_haversine_matrix(coordinates: numpy.ndarray, radius: float) -> numpy.ndarray:
+    """Great circle distance between every pair of (latitude, longitude) in degrees, in the unit of the radius."""
+    latitudes, longitudes = numpy.radians(coordinates).T
+    latitudes_sin = numpy.sin((latitudes[:, numpy.newaxis] - latitudes) / 2)
+    longitudes_sin = numpy.sin((longitudes[:, numpy.newaxis] - longitudes) / 2)
+    latitudes_cos = numpy.cos(latitudes)
+    haversine = latitudes_sin ** 2 + numpy.outer(latitudes_cos, latitudes_cos) * longitudes_sin ** 2
+    return 2 * radius * numpy.arcsin(numpy.sqrt(numpy.clip(haversine, 0, 1)))
+
+
+def get_equirectangular_matrix(coordinates: numpy.ndarray, radius: float) -> numpy.ndarray:
+    """Distance between every pair of (latitude, longitude) in degrees on the plane projection at their mean
+       latitude, in the unit of the radius. Cheaper than haversine and close to it inside a city."""
+    latitudes, longitudes = numpy.radians(coordinates).T
+    x = (longitudes[:, numpy.newaxis] - longitudes) * numpy.cos((latitudes[:, numpy.newaxis] + latitudes) / 2)
+    y = latitudes[:, numpy.newaxis] - latitudes
+    return radius * numpy.hypot(x, y)
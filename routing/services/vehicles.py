@@ -1,10 +1,9 @@
-import uuid
-
 from routing.entities.location import Location
 from routing.entities.vehicle import Vehicle
 from routing.services.utils import has_accessibility
 from enum import Enum, auto
-from typing import List, Dict
+from math import ceil
+from typing import List, Dict, Tuple
 
 
 class BreakType(Enum):
@@ -13,19 +12,16 @@ class BreakType(Enum):
 
 
 class Break:
-    def __init__(self, break_type: BreakType, minimum_start, maximum_start, duration, vehicle_name):
+    def __init__(self, break_type: BreakType, minimum_start, maximum_start, duration, break_id: int):
         self.type = break_type
         self.minimum_start = minimum_start
         self.maximum_start = maximum_start
         self.duration = duration
-        self._id = self.generate_id(vehicle_name)
+        self._id = break_id
 
     def get_break_id(self):
         return self._id
 
-    def generate_id(self, vehicle_name):
-        return f'{vehicle_name}-{self.type}-{str(uuid.uuid4())}'
-
 
 class VehicleBreaks:
     def __init__(self):
@@ -36,8 +32,8 @@ class VehicleBreaks:
 
     def add_new_break(self, break_type: BreakType,
                       minimum_start, maximum_start,
-                      duration, vehicle_name) -> Break:
-        break_ = Break(break_type, minimum_start, maximum_start, duration, vehicle_name)
+                      duration, break_id) -> Break:
+        break_ = Break(break_type, minimum_start, maximum_start, duration, break_id)
         self.add_break(break_)
         return break_
 
@@ -61,6 +57,8 @@ class VehiclesService:
     def __init__(self, vehicles: List[Vehicle]):
         self.vehicles = vehicles
         self.vehicles_breaks: List[VehicleBreaks] = [VehicleBreaks() for _ in self.vehicles]
+        # vehicle index and break by break id, the ids are sequential integers
+        self.breaks_index: Dict[int, Tuple[int, Break]] = {}
 
     def get_name_from_index(self, index):
         return self.vehicles[index].name
@@ -79,24 +77,56 @@ class VehiclesService:
                 allowed_vehicles.append(vehicle_index)
         return allowed_vehicles
 
+    def get_vehicles_indices_by_types(self) -> Dict[frozenset, List[int]]:
+        """Groups vehicles sharing the same set of types, they have the same transit costs."""
+        vehicles_indices_by_types = {}
+        for vehicle_index, vehicle in enumerate(self.vehicles):
+            vehicle_types = frozenset(vehicle.types)
+            vehicles_indices_by_types.setdefault(vehicle_types, []).append(vehicle_index)
+        return vehicles_indices_by_types
+
     def get_vehicles_max_load_weights(self):
         return [vehicle.max_load_weight for vehicle in self.vehicles]
 
     def get_vehicle_max_load_weight_by_index(self, index):
         return self.vehicles[index].max_load_weight
 
+    def get_vehicles_reloads(self, locations: List[Location], max_reload) -> List[int]:
+        """Reloads each vehicle may need, at most max_reload. Reloading only when the next location doesn't fit,
+           two trips in a row carry more than the capacity: the demand the vehicle can access takes at most
+           2 * ceil(demand / capacity) - 1 trips."""
+        demands_by_types = {}
+        vehicles_reloads = []
+        for vehicle in self.vehicles:
+            vehicle_types = frozenset(vehicle.types)
+            if vehicle_types not in demands_by_types:
+                demands_by_types[vehicle_types] = sum(location.demand for location in locations
+                                                      if not location.is_depot and location.demand > 0
+                                                      and has_accessibility(vehicle_types, location))
+            if vehicle.max_load_weight <= 0:
+                vehicles_reloads.append(0)
+                continue
+            num_trips = 2 * ceil(demands_by_types[vehicle_types] / vehicle.max_load_weight) - 1
+            vehicles_reloads.append(max(0, min(max_reload, num_trips - 1)))
+        return vehicles_reloads
+
     def get_vehicle_breaks_from_index(self, vehicle_index):
         return self.vehicles_breaks[vehicle_index]
 
     def add_break_to_vehicle_index(self, vehicle_index, break_: Break):
         self.vehicles_breaks[vehicle_index].add_break(break_)
+        self.breaks_index[break_.get_break_id()] = (vehicle_index, break_)
 
     def add_new_break_to_vehicle(self, vehicle_index, break_type: BreakType, minimum_start, maximum_start, duration):
-        vehicle = self.get_vehicle_from_index(vehicle_index)
         vehicle_breaks = self.vehicles_breaks[vehicle_index]
         break_ = vehicle_breaks.add_new_break(break_type,
                                               minimum_start,
                                               maximum_start,
                                               duration,
-                                              vehicle.name)
+                                              len(self.breaks_index))
+        self.breaks_index[break_.get_break_id()] = (vehicle_index, break_)
         return break_
+
+    def get_break_from_id(self, break_id) -> Tuple[int, Break]:
+        """Index of the vehicle taking the break and the break."""
+        return self.breaks_index[break_id]
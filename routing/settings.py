@@ -1,6 +1,9 @@
+import os
+import tempfile
 from routing.services.penalty import (calc_max_distance,
                                       calc_depot_distance,
                                       calc_demand_multiplier)
+from routing.services.utils import get_haversine_matrix, get_equirectangular_matrix
 
 APP_NAME = 'routing'
 
@@ -11,3 +14,129 @@ PENALTY_FUNCS = {
     'distancia maxima': calc_max_distance,
     'demanda': calc_demand_multiplier
 }
+
+# waiting allowed at each location and horizon of the time (distance) dimension of the routes
+DISTANCE_SLACK = 90
+VEHICLE_MAX_DISTANCE = 10_000
+
+# processes serving the API, set by gunicorn.conf.py, each one has its own solver workers
+API_WORKERS = int(os.environ.get('GUNICORN_WORKERS', 1))
+# background solver workers used by the jobs API, the cores are divided between the API processes
+SOLVER_WORKERS = max((os.cpu_count() or 1) // API_WORKERS, 1)
+SOLVER_QUEUE_SIZE = 2 * SOLVER_WORKERS
+FINISHED_JOBS_RETENTION = 1000
+# sqlite database of the jobs, shared by the API processes, a job is found by any of them
+JOBS_PATH = os.environ.get('JOBS_PATH', os.path.join(tempfile.gettempdir(), 'routing_jobs.db'))
+# seconds after which a job not finished is failed, the process running it may have died
+JOB_TIMEOUT = 60 * 60
+
+# batches of independent problems share a deadline (seconds), problems get at least the minimum search time
+BATCH_DEADLINE = 10 * 60
+BATCH_MIN_SEARCH_TIME_LIMIT = 0.01
+# batches solved at the same time by an API process, each on a pool of SOLVER_WORKERS processes, more are refused
+MAX_CONCURRENT_BATCHES = 1
+
+# solutions of repeated inputs, the sqlite tier is disabled while the path is None
+SOLUTION_CACHE_SIZE = 128
+SOLUTION_CACHE_PATH = None
+SOLUTION_CACHE_TTL = 24 * 60 * 60
+
+# catalogue distance matrix, an int32 .npy file memory mapped by every process, locations reference its rows by
+# catalogue_id. Disabled while the path is None
+MATRIX_STORE_PATH = os.environ.get('MATRIX_STORE_PATH')
+
+# travel times estimated from the coordinates for the pairs of locations without distance, kilometers of the
+# method times the detour factor at the speed (km/h) of the vehicle types, DISTANCE_ESTIMATION_SPEED without speed
+DISTANCE_ESTIMATION_METHODS = {'haversine': get_haversine_matrix, 'equirectangular': get_equirectangular_matrix}
+DISTANCE_ESTIMATION_METHOD = 'haversine'
+DISTANCE_ESTIMATION_SPEED = 30
+DISTANCE_ESTIMATION_DETOUR_FACTOR = 1.3
+EARTH_RADIUS = 6371.0088
+
+# road travel times of the OSRM compatible table service, for the distance estimation method 'table'. Matrices are
+# fetched in tiles of TABLE_SERVICE_TILE_SIZE sources by as many destinations, TABLE_SERVICE_WORKERS at a time, and
+# the rows of the last TABLE_SERVICE_CACHE_SIZE coordinates are cached. Disabled while the url is None
+TABLE_SERVICE_URL = os.environ.get('TABLE_SERVICE_URL')
+TABLE_SERVICE_PROFILE = 'driving'
+TABLE_SERVICE_TILE_SIZE = 50
+TABLE_SERVICE_WORKERS = 4
+TABLE_SERVICE_CACHE_SIZE = 2000
+# seconds
+TABLE_SERVICE_TIMEOUT = 10
+
+# search strategies of the parallel portfolio, the first ones are used when the width is smaller
+PORTFOLIO_WIDTH = SOLVER_WORKERS
+PORTFOLIO_STRATEGIES = [
+    {'first_solution_strategy': 'PATH_CHEAPEST_ARC', 'local_search_metaheuristic': 'GUIDED_LOCAL_SEARCH'},
+    {'first_solution_strategy': 'SAVINGS', 'local_search_metaheuristic': 'SIMULATED_ANNEALING'},
+    {'first_solution_strategy': 'PARALLEL_CHEAPEST_INSERTION', 'local_search_metaheuristic': 'TABU_SEARCH'},
+    {'first_solution_strategy': 'SAVINGS', 'local_search_metaheuristic': 'GUIDED_LOCAL_SEARCH'},
+    {'first_solution_strategy': 'PARALLEL_CHEAPEST_INSERTION', 'local_search_metaheuristic': 'SIMULATED_ANNEALING'},
+    {'first_solution_strategy': 'PATH_CHEAPEST_ARC', 'local_search_metaheuristic': 'TABU_SEARCH'},
+    {'first_solution_strategy': 'PARALLEL_CHEAPEST_INSERTION', 'local_search_metaheuristic': 'GUIDED_LOCAL_SEARCH'},
+    {'first_solution_strategy': 'PATH_CHEAPEST_ARC', 'local_search_metaheuristic': 'SIMULATED_ANNEALING'},
+    {'first_solution_strategy': 'SAVINGS', 'local_search_metaheuristic': 'TABU_SEARCH'},
+]
+
+# instances with more locations are decomposed in clusters solved in parallel
+DECOMPOSITION_THRESHOLD = 800
+DECOMPOSITION_CLUSTER_SIZE = 200
+# share of the search time limit left to solve again the clusters that received dropped locations
+DECOMPOSITION_REPAIR_TIME_SHARE = 0.25
+
+# instances a single vehicle without breaks can serve are routed without the solver, exactly (branch and bound
+# limited to FAST_PATH_MAX_EXPANSIONS nodes) up to FAST_PATH_EXACT_STOPS stops, heuristically up to FAST_PATH_MAX_STOPS
+FAST_PATH_MAX_STOPS = 30
+FAST_PATH_EXACT_STOPS = 10
+FAST_PATH_MAX_EXPANSIONS = 20_000
+
+# max_reload reload nodes (depot copies) of the model: 'shared' by every vehicle, max_reload in total, or 'vehicle',
+# max_reload of each vehicle that only the vehicle may visit, fewer if the vehicle carries the whole demand sooner
+RELOAD_MODEL = 'shared'
+
+# validation of the O(N²) distances of the input: 'full', 'structural' (only their types)
+# or 'sampled' (structural plus the distances of at most SCHEMA_DISTANCES_SAMPLE_SIZE locations)
+SCHEMA_DISTANCES_VALIDATION = 'sampled'
+SCHEMA_DISTANCES_SAMPLE_SIZE = 50
+
+# example solved once on start, the process is ready after it, with the OR Tools initialization paid
+WARM_UP_INPUT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'test', 'input_settings', 'simple_routing_demand_and_time_in_minutes.yaml')
+WARM_UP_SEARCH_TIME_LIMIT = 0.1
+
+# durations of the request phases, exposed on /metrics as histograms with these buckets (seconds)
+TIMINGS_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300]
+# log every solution found by the search, from a solution callback: the log_search search parameter of OR Tools
+# writes to the stderr of the process, bypassing the logger
+LOG_SEARCH = False
+
+# named search parameters, the values given on the request take precedence
+SEARCH_TIME_LIMIT = 3
+SEARCH_PRESETS = {
+    # answers in a few hundred milliseconds for tens of locations, without the slowest operators
+    'interactive': {
+        'search_time_limit': 0.25,
+        'lns_time_limit': 0.01,
+        'local_search_operators': {
+            'use_relocate_expensive_chain': False,
+            'use_relocate_subtrip': False,
+            'use_exchange_subtrip': False,
+            'use_global_cheapest_insertion_path_lns': False,
+            'use_local_cheapest_insertion_path_lns': False,
+            'use_relocate_path_global_cheapest_insertion_insert_unperformed': False
+        }
+    },
+    'balanced': {
+        'search_time_limit': SEARCH_TIME_LIMIT,
+        'lns_time_limit': 0.1
+    },
+    'quality': {
+        'search_time_limit': 30,
+        'lns_time_limit': 1,
+        'local_search_operators': {
+            'use_path_lns': True,
+            'use_inactive_lns': True,
+            'use_cross_exchange': True
+        }
+    }
+}
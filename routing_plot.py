@@ -1,10 +1,10 @@
 import functools
 import numpy
-from matplotlib import pyplot
-from matplotlib import patches
 
 
+# matplotlib is imported by the functions that plot, importing this module is cheap
 def discrete_cmap(N, base_cmap=None):
+    from matplotlib import pyplot
     base = pyplot.cm.get_cmap(base_cmap)
     color_list = base(numpy.linspace(0, 1, N))
     cmap_name = base.name + str(N)
@@ -34,6 +34,7 @@ def plot_depot(ax1, locations):
 
 
 def plot_vehicle_routes(routes_plan, ax1):
+    from matplotlib import patches
     num_vehicles = len(routes_plan)
     cmap = discrete_cmap(num_vehicles + 2, 'nipy_spectral')
     legend_handles = []
@@ -97,6 +98,7 @@ def hover(ax1, annotation, fig, locations_plots, event):
 
 
 def plot_route_to_figure(solution):
+    from matplotlib import pyplot
     fig = pyplot.figure()
     ax = fig.add_subplot(111)
     # Plot all the nodes as black dots.
@@ -0,0 +1,54 @@
+import json
+import threading
+import pytest
+import routing.app
+from routing.api import app
+
+
+@pytest.fixture(scope='function')
+def client():
+    return app.test_client()
+
+
+def test_routing(client, routing_yaml):
+    routing_yaml['search_time_limit'] = 0.1
+    response = client.get('/v1/routing', json=routing_yaml)
+    assert response.status_code == 200
+    assert response.json['status'] == 'SUCCESS'
+
+
+def test_routing_schema_error(client, routing_yaml):
+    del routing_yaml['vehicles']
+    response = client.get('/v1/routing', json=routing_yaml)
+    assert response.status_code == 400
+    assert json.loads(response.data)['status'] == 'ERROR'
+
+
+def test_routing_invalid_distance_matrix(client, routing_yaml):
+    # the schema can't check the size of the matrix
+    for location in routing_yaml['locations']:
+        del location['distances']
+    routing_yaml['distance_matrix'] = [[0, 1], [1, 0]]
+    response = client.get('/v1/routing', json=routing_yaml)
+    assert response.status_code == 400
+    assert response.json['status'] == 'ERROR'
+    assert 'Distance matrix' in response.json['message']
+
+
+def test_routing_without_matrix_store(client, routing_yaml, monkeypatch):
+    monkeypatch.setattr('routing.services.matrix_store.matrix_store.path', None)
+    for location_index, location in enumerate(routing_yaml['locations']):
+        del location['distances']
+        location['catalogue_id'] = location_index
+    response = client.get('/v1/routing', json=routing_yaml)
+    assert response.status_code == 400
+    assert response.json == {'status': 'ERROR',
+                             'message': 'There is no matrix store, set MATRIX_STORE_PATH to use catalogue ids.'}
+
+
+def test_routing_batch_limit(client, routing_yaml, monkeypatch):
+    monkeypatch.setattr('routing.app.batch_slots', threading.BoundedSemaphore(1))
+    routing.app.batch_slots.acquire()
+    response = client.post('/v1/routing/batch', json={'problems': [routing_yaml]})
+    assert response.status_code == 429
+    assert response.json['status'] == 'ERROR'
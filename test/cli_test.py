@@ -0,0 +1,76 @@
+import io
+import json
+import numpy
+import subprocess
+import sys
+import yaml
+from routing.cli import main
+
+
+def get_input_path(tmp_path, routing_yaml):
+    routing_yaml['search_time_limit'] = 0.1
+    input_path = tmp_path / 'input.json'
+    input_path.write_text(json.dumps(routing_yaml))
+    return str(input_path)
+
+
+def test_solve(tmp_path, routing_yaml):
+    input_path = get_input_path(tmp_path, routing_yaml)
+    yaml_path = tmp_path / 'input.yaml'
+    yaml_path.write_text(yaml.safe_dump(routing_yaml))
+    output = io.StringIO()
+    assert main(['solve', input_path, str(yaml_path)], output) == 0
+    solutions = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [solution['status'] for solution in solutions] == ['SUCCESS', 'SUCCESS']
+
+
+def test_solve_invalid_input(tmp_path, routing_yaml, capsys):
+    del routing_yaml['vehicles']
+    input_path = get_input_path(tmp_path, routing_yaml)
+    output = io.StringIO()
+    assert main(['solve', input_path], output) == 1
+    assert output.getvalue() == ''
+    assert 'vehicles' in capsys.readouterr().err
+
+
+def test_solve_unknown_search_preset(tmp_path, routing_yaml, capsys):
+    routing_yaml['search_parameters'] = {'preset': 'fastest'}
+    input_path = get_input_path(tmp_path, routing_yaml)
+    output = io.StringIO()
+    assert main(['solve', '--no-validate', input_path], output) == 1
+    assert output.getvalue() == ''
+    assert 'fastest' in capsys.readouterr().err
+
+
+def test_solve_stdin(routing_yaml):
+    routing_yaml['search_time_limit'] = 0.1
+    result = subprocess.run([sys.executable, '-m', 'routing', 'solve'], input=json.dumps(routing_yaml),
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+    assert json.loads(result.stdout)['status'] == 'SUCCESS'
+
+
+def test_solver_does_not_import_web_stack():
+    result = subprocess.run([sys.executable, '-c', 'import sys, routing.cli; print("flask" in sys.modules)'],
+                            capture_output=True, text=True)
+    assert result.stdout.strip() == 'False'
+
+
+def test_matrix_store(tmp_path):
+    source_path = tmp_path / 'matrix.json'
+    source_path.write_text(json.dumps([[0, 1.5], [2, 0]]))
+    store_path = str(tmp_path / 'store.npy')
+    output = io.StringIO()
+    assert main(['matrix-store', 'build', str(source_path), '--store', store_path], output) == 0
+    assert main(['matrix-store', 'info', '--store', store_path], output) == 0
+    assert [json.loads(line) for line in output.getvalue().splitlines()] == [{'path': store_path, 'locations': 2}] * 2
+    assert numpy.load(store_path).tolist() == [[0, 2], [2, 0]]
+
+
+def test_matrix_store_invalid_source(tmp_path, capsys):
+    source_path = tmp_path / 'matrix.json'
+    source_path.write_text(json.dumps([[0, 1, 2]]))
+    store_path = tmp_path / 'store.npy'
+    assert main(['matrix-store', 'build', str(source_path), '--store', str(store_path)], io.StringIO()) == 1
+    assert 'square' in capsys.readouterr().err
+    assert not store_path.exists()
@@ -1,5 +1,7 @@
+import numpy
 import pytest
-from routing.entities.location import Location
+from routing.entities.location import Location, DistanceMatrix
+from routing.settings import INFINITY
 
 
 def test_location_add_and_get_distance():
@@ -15,3 +17,35 @@ def test_location_get_undefined_distance():
     location.add_distance_to_another_location('pytest_destiny', 100)
     with pytest.raises(KeyError):
         location.distance_to('undefined') == 100
+
+
+def get_distance_matrix():
+    matrix = numpy.array([[0, 5, INFINITY],
+                          [7, 0, 3],
+                          [INFINITY, 2, 0]], dtype=numpy.int32)
+    return DistanceMatrix(matrix, ['pytest_a', 'pytest_b', 'pytest_c'])
+
+
+def test_distance_row_behaves_like_a_dict():
+    distance_row = get_distance_matrix().get_row(1)
+    assert dict(distance_row) == {'pytest_b': 0, 'pytest_a': 7, 'pytest_c': 3}
+    assert list(distance_row) == ['pytest_b', 'pytest_a', 'pytest_c']
+    assert distance_row['pytest_c'] == 3
+    assert len(distance_row) == 3
+
+
+def test_distance_row_missing_distance():
+    distance_row = get_distance_matrix().get_row(0)
+    assert 'pytest_c' not in distance_row
+    assert distance_row.get('pytest_c', INFINITY) == INFINITY
+    with pytest.raises(KeyError):
+        distance_row['undefined']
+
+
+def test_location_with_distance_row():
+    distance_matrix = get_distance_matrix()
+    location = Location(name='pytest_a', accessibility={'pytest_accessibility1'}, time_windows=[], demand=1,
+                        service_time=0, distance_map=distance_matrix.get_row(0))
+    location.add_distance_to_another_location('pytest_c', 100)
+    assert location.distance_to('pytest_c') == 100
+    assert distance_matrix.matrix[0, 2] == 100
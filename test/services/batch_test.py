@@ -0,0 +1,75 @@
+import threading
+import time
+import pytest
+from routing.entities.exception import BatchLimitError, InvalidSearchParametersError
+from routing.services.batch import BatchService, get_time_budgets
+
+
+def budget_solver(input_json):
+    return {'status': 'SUCCESS', 'name': input_json['name']}
+
+
+def failing_solver(input_json):
+    raise ValueError('pytest_error')
+
+
+def slow_solver(input_json):
+    # the model build and search overrun the budget
+    time.sleep(0.6)
+    return {'status': 'SUCCESS'}
+
+
+def get_inputs(num_locations, search_time_limit=3):
+    return [{'name': f'problem {index}', 'locations': [{}] * size, 'search_time_limit': search_time_limit}
+            for index, size in enumerate(num_locations)]
+
+
+@pytest.mark.parametrize('sizes, search_time_limits, capacity, budgets', [
+    ([10, 30], [10, 10], 8, [2, 6]),
+    # the first problem doesn't need its share, what is left goes to the second
+    ([10, 30], [1, 10], 8, [1, 7]),
+    ([10, 30], [1, 2], 8, [1, 2]),
+])
+def test_get_time_budgets(sizes, search_time_limits, capacity, budgets):
+    assert get_time_budgets(sizes, search_time_limits, capacity) == pytest.approx(budgets)
+
+
+def test_batch_solve():
+    batch_service = BatchService(budget_solver, max_workers=2, deadline=4)
+    results = list(batch_service.solve(get_inputs([10, 30, 20])))
+    assert sorted(result['index'] for result in results) == [0, 1, 2]
+    for result in results:
+        assert result['name'] == f'problem {result["index"]}'
+    # 8 seconds of the workers, 3 seconds at most per problem
+    search_time_limits = {result['index']: result['search_time_limit'] for result in results}
+    assert search_time_limits == pytest.approx({0: 2, 1: 3, 2: 3})
+
+
+def test_batch_solve_failure():
+    batch_service = BatchService(failing_solver, max_workers=1, deadline=1)
+    assert list(batch_service.solve(get_inputs([10]))) == [{'index': 0, 'status': 'ERROR', 'message': 'pytest_error'}]
+
+
+def test_batch_solve_deadline():
+    # one worker, the second problem would start after the deadline
+    batch_service = BatchService(slow_solver, max_workers=1, deadline=0.5)
+    results = sorted(batch_service.solve(get_inputs([10, 10])), key=lambda result: result['index'])
+    assert [result['status'] for result in results] == ['SUCCESS', 'ERROR']
+
+
+def test_batch_input_errors_are_raised_before_the_results():
+    inputs = get_inputs([10])
+    inputs[0]['search_parameters'] = {'preset': 'undefined'}
+    with pytest.raises(InvalidSearchParametersError):
+        BatchService(budget_solver, max_workers=1, deadline=1).solve(inputs)
+
+
+def test_batch_limit():
+    slots = threading.BoundedSemaphore(1)
+    batch_service = BatchService(slow_solver, max_workers=1, deadline=2, slots=slots)
+    results = batch_service.solve(get_inputs([10]))
+    with pytest.raises(BatchLimitError):
+        batch_service.solve(get_inputs([10]))
+    assert [result['status'] for result in results] == ['SUCCESS']
+    # the slot is released once the problem is finished
+    assert slots.acquire(timeout=5)
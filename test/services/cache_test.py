@@ -0,0 +1,110 @@
+import copy
+import time
+import pytest
+from routing.app import routing, solution_cache
+from routing.entities.routing_solution import CachedRoutingSolution
+from routing.services.cache import SolutionCache
+from routing.services.input_parser import InputParser
+
+
+def test_get_key_is_deterministic(routing_yaml):
+    system_entities = InputParser(copy.deepcopy(routing_yaml)).parse()
+    same_system_entities = InputParser(copy.deepcopy(routing_yaml)).parse()
+    assert SolutionCache.get_key(system_entities) == SolutionCache.get_key(same_system_entities)
+
+
+def test_get_key_changes_with_input(routing_yaml):
+    system_entities = InputParser(copy.deepcopy(routing_yaml)).parse()
+    routing_yaml['search_time_limit'] = 1
+    other_system_entities = InputParser(routing_yaml).parse()
+    assert SolutionCache.get_key(system_entities) != SolutionCache.get_key(other_system_entities)
+
+
+@pytest.mark.parametrize('field, value', [('high_priority', True),
+                                          ('coordinates', {'latitude': -22.9, 'longitude': -43.2}),
+                                          ('demand', 7),
+                                          ('service_time', 7),
+                                          ('accessibility', ['Moto']),
+                                          ('time_windows', [{'start': 0, 'end': 7}])])
+def test_get_key_changes_with_location_fields(routing_yaml, field, value):
+    system_entities = InputParser(copy.deepcopy(routing_yaml)).parse()
+    routing_yaml['locations'][1][field] = value
+    other_system_entities = InputParser(routing_yaml).parse()
+    assert SolutionCache.get_key(system_entities) != SolutionCache.get_key(other_system_entities)
+
+
+def test_get_key_changes_with_distances(routing_yaml):
+    system_entities = InputParser(copy.deepcopy(routing_yaml)).parse()
+    routing_yaml['locations'][1]['distances'][0]['distance'] += 1
+    other_system_entities = InputParser(routing_yaml).parse()
+    assert SolutionCache.get_key(system_entities) != SolutionCache.get_key(other_system_entities)
+
+
+def test_get_key_of_distance_matrix(routing_yaml):
+    system_entities = InputParser(copy.deepcopy(routing_yaml)).parse()
+    matrix = system_entities.locations[0].distance_map.distance_matrix.matrix
+    for location in routing_yaml['locations']:
+        del location['distances']
+    routing_yaml['distance_matrix'] = matrix.tolist()
+    # the same distances, given as a matrix
+    assert SolutionCache.get_key(InputParser(copy.deepcopy(routing_yaml)).parse()) == \
+        SolutionCache.get_key(system_entities)
+    routing_yaml['distance_matrix'][1][2] += 1
+    assert SolutionCache.get_key(InputParser(routing_yaml).parse()) != SolutionCache.get_key(system_entities)
+
+
+def test_get_key_ignores_use_cache(routing_yaml):
+    system_entities = InputParser(copy.deepcopy(routing_yaml)).parse()
+    routing_yaml['use_cache'] = False
+    other_system_entities = InputParser(routing_yaml).parse()
+    assert SolutionCache.get_key(system_entities) == SolutionCache.get_key(other_system_entities)
+
+
+def test_hits_and_misses():
+    solution_cache = SolutionCache(max_size=2)
+    assert solution_cache.get('pytest_key') is None
+    solution_cache.set('pytest_key', 'pytest_solution')
+    assert solution_cache.get('pytest_key') == 'pytest_solution'
+    assert solution_cache.get_stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+
+def test_least_recently_used_is_evicted():
+    solution_cache = SolutionCache(max_size=2)
+    solution_cache.set('pytest_key_1', 1)
+    solution_cache.set('pytest_key_2', 2)
+    solution_cache.get('pytest_key_1')
+    solution_cache.set('pytest_key_3', 3)
+    assert solution_cache.get('pytest_key_2') is None
+    assert solution_cache.get('pytest_key_1') == 1
+    assert solution_cache.get('pytest_key_3') == 3
+
+
+def test_disk_tier_is_shared(tmp_path):
+    path = str(tmp_path / 'solutions.db')
+    SolutionCache(max_size=2, path=path).set('pytest_key', {'pytest': 1})
+    assert SolutionCache(max_size=2, path=path).get('pytest_key') == {'pytest': 1}
+
+
+def test_expired_entries(tmp_path, monkeypatch):
+    path = str(tmp_path / 'solutions.db')
+    solution_cache = SolutionCache(max_size=2, path=path, ttl=60)
+    solution_cache.set('pytest_key', 1)
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert solution_cache.get('pytest_key') is None
+    assert SolutionCache(max_size=2, path=path, ttl=60).get('pytest_key') is None
+
+
+def test_routing_caches_the_solution_json(routing_yaml):
+    routing_yaml['use_cache'] = True
+    routing_yaml['timings'] = True
+    solution_json = routing(copy.deepcopy(routing_yaml)).to_json()
+    cached_solution = routing(copy.deepcopy(routing_yaml))
+    assert isinstance(cached_solution, CachedRoutingSolution)
+    cache_key = SolutionCache.get_key(InputParser(routing_yaml).parse())
+    # the routes and their locations are not kept, only the JSON without the timings of the request that solved it
+    assert 'timings' not in solution_cache.get(cache_key)
+    cached_solution_json = cached_solution.to_json()
+    assert 'cache' in cached_solution_json.pop('timings')
+    solution_json.pop('timings')
+    assert cached_solution_json == solution_json
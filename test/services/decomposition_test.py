@@ -0,0 +1,112 @@
+import pytest
+from routing.app import solve
+from routing.entities.decomposition import Decomposition
+from routing.entities.location import Location, TimeWindow
+from routing.entities.routing_solution import RoutingSolutionStatus
+from routing.entities.system_entities import SystemEntities
+from routing.entities.search_parameters import SearchParameters
+from routing.entities.vehicle import Vehicle
+from routing.services.decomposition import DecompositionService
+from routing.settings import PENALTY_FUNCS
+
+
+def get_system_entities(cluster_size=2):
+    locations_info = [
+        ('test_loc_deposit', ['truck', 'car'], (0, 0), True),
+        ('test_loc_north_1', ['truck'], (1, 0), False),
+        ('test_loc_north_2', ['truck'], (2, 0.1), False),
+        ('test_loc_south_1', ['car'], (-1, 0), False),
+        ('test_loc_south_2', ['car'], (-2, -0.1), False)
+    ]
+    locations = []
+    for name, accessibility, coordinates, is_depot in locations_info:
+        location = Location(name=name, accessibility=accessibility, time_windows=[TimeWindow(0, 24 * 60)],
+                            demand=0 if is_depot else 1, service_time=5, is_depot=is_depot, coordinates=coordinates)
+        for destiny_name, _, destiny_coordinates, _ in locations_info:
+            distance = abs(coordinates[0] - destiny_coordinates[0]) * 10
+            location.add_distance_to_another_location(destiny_name, int(distance))
+        locations.append(location)
+    vehicles = [
+        Vehicle(name='test_truck', max_load_weight=10, types=['truck']),
+        Vehicle(name='test_car', max_load_weight=10, types=['car'])
+    ]
+    return SystemEntities(locations=locations, vehicles=vehicles, max_reload=0,
+                          penalty_type=PENALTY_FUNCS['distancia deposito'], search_time_limit=1,
+                          decomposition=Decomposition(enabled=True, cluster_size=cluster_size))
+
+
+def get_names(locations):
+    return sorted(location.name for location in locations)
+
+
+def test_clusters_are_swept_around_the_depot():
+    decomposition_service = DecompositionService(solve, get_system_entities(), 1)
+    clusters = decomposition_service.get_clusters()
+    assert sorted(get_names(cluster.locations) for cluster in clusters) == [
+        ['test_loc_north_1', 'test_loc_north_2'],
+        ['test_loc_south_1', 'test_loc_south_2']]
+
+
+def test_num_clusters_is_limited_by_vehicles():
+    decomposition_service = DecompositionService(solve, get_system_entities(cluster_size=1), 1)
+    clusters = decomposition_service.get_clusters()
+    assert len(clusters) == 2
+
+
+def test_vehicles_are_assigned_by_accessibility():
+    decomposition_service = DecompositionService(solve, get_system_entities(), 1)
+    clusters = decomposition_service.get_clusters()
+    decomposition_service.assign_vehicles(clusters)
+    for cluster in clusters:
+        assert len(cluster.vehicles) == 1
+        vehicle = cluster.vehicles[0]
+        assert all(vehicle.types & location.accessibility for location in cluster.locations)
+
+
+def test_clusters_keep_the_search_parameters():
+    system_entities = get_system_entities()
+    system_entities.search_parameters = SearchParameters(lns_time_limit=0.05,
+                                                         guided_local_search_lambda_coefficient=0.2,
+                                                         local_search_operators={'use_relocate_subtrip': False})
+    decomposition_service = DecompositionService(solve, system_entities, 1)
+    clusters = decomposition_service.get_clusters()
+    decomposition_service.assign_vehicles(clusters)
+    cluster_system_entities = decomposition_service.get_cluster_system_entities(clusters[0], 0.5)
+    assert cluster_system_entities.search_parameters.to_json() == system_entities.search_parameters.to_json()
+
+
+class DroppedLocationsSolution:
+    def __init__(self, status, dropped_locations):
+        self.status = status
+        self.dropped_locations = dropped_locations
+        self.routes_plan = []
+
+    def get_dropped_locations(self):
+        return self.dropped_locations
+
+
+def test_clusters_exchanging_dropped_locations():
+    decomposition_service = DecompositionService(solve, get_system_entities(), 1)
+    north_cluster, south_cluster = sorted(decomposition_service.get_clusters(),
+                                          key=lambda cluster: get_names(cluster.locations))
+    # each cluster drops the location closest to the other one, the south one failed
+    north_cluster.solution = DroppedLocationsSolution(RoutingSolutionStatus.SUCCESS, ['test_loc_north_1'])
+    south_cluster.solution = DroppedLocationsSolution(RoutingSolutionStatus.FAILED, [])
+    repaired_clusters = decomposition_service.get_repaired_clusters([north_cluster, south_cluster])
+    assert get_names(repaired_clusters[0].locations) == ['test_loc_north_2', 'test_loc_south_1',
+                                                         'test_loc_south_2']
+    assert get_names(repaired_clusters[1].locations) == ['test_loc_north_1']
+    # the moved locations leave their cluster, every location is in one cluster only
+    assert get_names(north_cluster.locations) == ['test_loc_north_2']
+    assert south_cluster.locations == []
+
+
+@pytest.mark.slow
+def test_decomposition_solution():
+    system_entities = get_system_entities()
+    solution = DecompositionService(solve, system_entities, 2).start()
+    assert solution.status == RoutingSolutionStatus.SUCCESS
+    assert solution.get_dropped_locations() == []
+    assert [vehicle_routing_solution.vehicle.name for vehicle_routing_solution in solution.routes_plan] == [
+        'test_truck', 'test_car']
+    assert len(solution.metadata['decomposition']) == 2
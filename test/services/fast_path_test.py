@@ -0,0 +1,100 @@
+import pytest
+from routing.app import routing, solve_fast_path
+from routing.services.input_parser import InputParser
+from routing.services.locations import LocationsService
+from routing.services.vehicles import VehiclesService
+from routing.services.fast_path import FastPathService, shift_intervals, intersect_intervals
+from routing.services.solution_verifier import SolutionVerifier
+from routing.entities.routing_solution import RoutingSolutionStatus
+
+
+@pytest.fixture(scope='function')
+def single_vehicle_yaml(routing_yaml):
+    """Lambreta, the only vehicle, without breaks, can serve every location."""
+    for vehicle in routing_yaml['vehicles']:
+        del vehicle['lunch_time_window']
+        del vehicle['short_break']
+        vehicle['types'] = ['Carro', 'Moto']
+        vehicle['max_load_weight'] = 10
+        vehicle['journey'] = 900
+    routing_yaml['vehicles'] = routing_yaml['vehicles'][:1]
+    for location in routing_yaml['locations']:
+        location['accessibility'] = ['Carro', 'Moto']
+    routing_yaml['use_cache'] = False
+    return routing_yaml
+
+
+def get_fast_path_service(routing_yaml, **kwargs):
+    system_entities = InputParser(routing_yaml).parse()
+    locations_service = LocationsService(system_entities.locations, system_entities.penalty_type)
+    vehicles_service = VehiclesService(system_entities.vehicles)
+    return FastPathService(locations_service, vehicles_service, **kwargs)
+
+
+def get_route_names(solution, vehicle_index):
+    return [route_step.location.name for route_step in solution.routes_plan[vehicle_index].vehicle_route]
+
+
+def test_shift_and_intersect_intervals():
+    # the waiting joins the shifted intervals
+    assert shift_intervals([[0, 10], [50, 60]], 5, 40) == [[5, 105]]
+    assert shift_intervals([[0, 10], [100, 110]], 5, 40) == [[5, 55], [105, 155]]
+    assert intersect_intervals([[5, 55], [105, 155]], [[50, 110], [150, 200]]) == [[50, 55], [105, 110], [150, 155]]
+    assert intersect_intervals([[0, 10]], [[11, 20]]) == []
+
+
+@pytest.mark.parametrize('exact_stops, method', [(10, 'exact'), (0, 'heuristic')])
+def test_fast_path_solution(single_vehicle_yaml, exact_stops, method):
+    solution = get_fast_path_service(single_vehicle_yaml, exact_stops=exact_stops).solve()
+    # the cost OR Tools finds
+    assert solution.objective_cost == 604
+    assert solution.metadata['fast_path'] == {'method': method, 'vehicle': 'Lambreta'}
+    assert get_route_names(solution, 0) == ['Deposito', 'Ponto Tres', 'Ponto Dois', 'Ponto Quatro', 'Deposito']
+    assert solution.get_dropped_locations() == []
+    # Ponto Dois is visited on its second time window, after waiting at most 90 minutes
+    route = solution.routes_plan[0].vehicle_route
+    assert [route_step.arrival_time for route_step in route] == [522, 600, 866, 1016, 1126]
+    assert [route_step.departure_load for route_step in route] == [5, 4, 2, 0, 0]
+    SolutionVerifier(InputParser(single_vehicle_yaml).parse(), solution).verify_solution()
+    assert solution.status == RoutingSolutionStatus.SUCCESS
+
+
+def test_fast_path_not_eligible(routing_yaml):
+    # vehicles with breaks, locations accessible to one vehicle type only
+    assert get_fast_path_service(routing_yaml).solve() is None
+
+
+def test_fast_path_not_eligible_capacity(single_vehicle_yaml):
+    single_vehicle_yaml['vehicles'][0]['max_load_weight'] = 4
+    assert get_fast_path_service(single_vehicle_yaml).solve() is None
+
+
+def test_fast_path_not_eligible_fleet(single_vehicle_yaml):
+    # both vehicles can serve every location, OR Tools splits them between the vehicles for a cost of 559
+    single_vehicle_yaml['vehicles'].append(dict(single_vehicle_yaml['vehicles'][0], name='Corsa'))
+    assert get_fast_path_service(single_vehicle_yaml).solve() is None
+    # the other vehicle can serve Ponto Tres only
+    single_vehicle_yaml['vehicles'][1]['types'] = ['Carro']
+    for location in single_vehicle_yaml['locations'][1:]:
+        location['accessibility'] = ['Moto']
+    single_vehicle_yaml['locations'][2]['accessibility'] = ['Carro', 'Moto']
+    assert get_fast_path_service(single_vehicle_yaml).solve() is None
+    # the other vehicle can't serve any stop
+    single_vehicle_yaml['locations'][2]['accessibility'] = ['Moto']
+    assert get_fast_path_service(single_vehicle_yaml).solve() is not None
+
+
+def test_fast_path_infeasible_route(single_vehicle_yaml):
+    # no single route respects the journey, the solver drops a location
+    for vehicle in single_vehicle_yaml['vehicles']:
+        vehicle['journey'] = 480
+    assert solve_fast_path(InputParser(single_vehicle_yaml).parse()) is None
+
+
+def test_routing_fast_path(single_vehicle_yaml):
+    single_vehicle_yaml['timings'] = True
+    solution = routing(single_vehicle_yaml)
+    assert solution.status == RoutingSolutionStatus.SUCCESS
+    assert solution.metadata['fast_path']['method'] == 'exact'
+    assert 'search' not in solution.timings
+    assert 'fast_path' in solution.timings
@@ -1,5 +1,9 @@
+import base64
 import json
+import copy
+import pytest
 from routing.services.input_parser import InputParser
+from routing.entities.exception import InvalidDistanceMatrixError, InvalidSearchParametersError
 
 
 def test_input_parser_locations(routing_yaml):
@@ -28,3 +32,115 @@ def test_input_parser_locationsvehicles(routing_yaml):
     internal_representation = input_parser.parse()
     vehicles = json.loads(repr(internal_representation.vehicles))
     assert vehicles == routing_yaml['vehicles']
+
+
+def test_input_parser_initial_routes(routing_yaml):
+    routing_yaml['initial_routes'] = [{'vehicle': 'Lambreta', 'route': ['Deposito', 'Ponto Tres', 'Deposito']}]
+    input_parser = InputParser(routing_yaml)
+    internal_representation = input_parser.parse()
+    assert internal_representation.initial_routes == {'Lambreta': ['Deposito', 'Ponto Tres', 'Deposito']}
+
+
+def test_input_parser_portfolio(routing_yaml):
+    routing_yaml['portfolio'] = {
+        'width': 1,
+        'strategies': [{'first_solution_strategy': 'SAVINGS', 'local_search_metaheuristic': 'TABU_SEARCH'},
+                       {'first_solution_strategy': 'PATH_CHEAPEST_ARC'}]
+    }
+    input_parser = InputParser(routing_yaml)
+    portfolio = input_parser.parse().portfolio
+    assert [search_strategy.to_json() for search_strategy in portfolio] == [
+        {'first_solution_strategy': 'SAVINGS', 'local_search_metaheuristic': 'TABU_SEARCH'}]
+
+
+def test_input_parser_without_portfolio(routing_yaml):
+    input_parser = InputParser(routing_yaml)
+    assert input_parser.parse().portfolio == []
+
+
+def test_input_parser_shared_distance_matrix(routing_yaml):
+    input_parser = InputParser(routing_yaml)
+    locations = input_parser.parse().locations
+    distance_matrix = locations[0].distance_map.distance_matrix
+    assert all(location.distance_map.distance_matrix is distance_matrix for location in locations)
+    assert distance_matrix.names == [location['name'] for location in routing_yaml['locations']]
+    assert locations[1].distance_to('Deposito') == 228
+    assert distance_matrix.matrix[1, 0] == 228
+
+
+def get_compact_input(routing_yaml):
+    compact_input = copy.deepcopy(routing_yaml)
+    matrix = InputParser(routing_yaml).parse().locations[0].distance_map.distance_matrix.matrix
+    for location in compact_input['locations']:
+        del location['distances']
+    return compact_input, matrix
+
+
+def test_input_parser_distance_matrix(routing_yaml):
+    compact_input, matrix = get_compact_input(routing_yaml)
+    compact_input['distance_matrix'] = matrix.tolist()
+    locations = InputParser(compact_input).parse().locations
+    assert repr(locations) == repr(InputParser(routing_yaml).parse().locations)
+
+
+def test_input_parser_distance_matrix_base64(routing_yaml):
+    compact_input, matrix = get_compact_input(routing_yaml)
+    compact_input['distance_matrix_base64'] = base64.b64encode(matrix.astype('<i4').tobytes()).decode()
+    locations = InputParser(compact_input).parse().locations
+    assert repr(locations) == repr(InputParser(routing_yaml).parse().locations)
+
+
+def test_input_parser_distance_matrix_overridden_by_locations_distances(routing_yaml):
+    _, matrix = get_compact_input(routing_yaml)
+    routing_yaml['distance_matrix_base64'] = base64.b64encode((matrix * 0 + 7).astype('<i4').tobytes()).decode()
+    locations = InputParser(routing_yaml).parse().locations
+    assert locations[1].distance_to('Deposito') == 228
+
+
+def test_input_parser_distance_matrix_wrong_size(routing_yaml):
+    compact_input, matrix = get_compact_input(routing_yaml)
+    compact_input['distance_matrix'] = matrix[1:].tolist()
+    with pytest.raises(InvalidDistanceMatrixError):
+        InputParser(compact_input).parse()
+
+
+def test_input_parser_distance_estimation(routing_yaml):
+    routing_yaml['distance_estimation'] = {'method': 'equirectangular', 'speeds': {'Moto': 40}}
+    with pytest.raises(InvalidDistanceMatrixError):
+        InputParser(routing_yaml).parse()
+    for location in routing_yaml['locations']:
+        location['coordinates'] = {'latitude': -23, 'longitude': -43.6}
+    system_entities = InputParser(routing_yaml).parse()
+    assert system_entities.distance_estimation.to_json() == {'method': 'equirectangular', 'speeds': {'Moto': 40},
+                                                             'default_speed': 30, 'detour_factor': 1.3}
+    # the estimated distances depend on the coordinates, they are part of the representation
+    routing_yaml['locations'][1]['coordinates']['latitude'] = -22
+    assert repr(InputParser(routing_yaml).parse()) != repr(system_entities)
+
+
+def test_input_parser_search_time_limit_in_milliseconds(routing_yaml):
+    routing_yaml['search_time_limit'] = 0.25
+    assert InputParser(routing_yaml).parse().search_time_limit == 0.25
+
+
+def test_input_parser_search_parameters_preset(routing_yaml):
+    del routing_yaml['search_time_limit']
+    routing_yaml['search_parameters'] = {'preset': 'interactive', 'lns_time_limit': 0.05,
+                                         'local_search_operators': {'use_relocate_subtrip': True}}
+    system_entities = InputParser(routing_yaml).parse()
+    assert system_entities.search_time_limit == 0.25
+    assert system_entities.search_parameters.lns_time_limit == 0.05
+    assert system_entities.search_parameters.local_search_operators['use_relocate_subtrip']
+    assert not system_entities.search_parameters.local_search_operators['use_relocate_expensive_chain']
+
+
+def test_input_parser_unknown_search_preset(routing_yaml):
+    routing_yaml['search_parameters'] = {'preset': 'fastest'}
+    with pytest.raises(InvalidSearchParametersError, match='interactive'):
+        InputParser(routing_yaml).parse()
+
+
+def test_input_parser_unknown_local_search_operator(routing_yaml):
+    routing_yaml['search_parameters'] = {'local_search_operators': {'use_magic': True}}
+    with pytest.raises(InvalidSearchParametersError):
+        InputParser(routing_yaml).parse()
@@ -0,0 +1,111 @@
+import os
+import time
+import pytest
+from routing.entities.exception import JobNotFoundError, JobQueueFullError
+from routing.services.jobs import JobsService, JobStatus
+
+
+def echo_solver(input_json):
+    return {'echo': input_json}
+
+
+def failing_solver(input_json):
+    raise ValueError('pytest_error')
+
+
+def crashing_solver(input_json):
+    if input_json.get('crash'):
+        os._exit(1)
+    return input_json
+
+
+def slow_solver(input_json):
+    time.sleep(0.5)
+    return input_json
+
+
+@pytest.fixture(scope='function')
+def jobs_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+
+def wait_job(jobs_service, job_id, status=None, timeout=30):
+    """Job once it is finished, or has the status."""
+    end = time.monotonic() + timeout
+    while True:
+        job = jobs_service.get_job(job_id)
+        if job.get_status() == status or (status is None and job.is_finished()) or time.monotonic() > end:
+            return job
+        time.sleep(0.01)
+
+
+def test_submit_and_get_job_result(jobs_path):
+    jobs_service = JobsService(echo_solver, max_workers=1, max_queue_size=1, path=jobs_path)
+    job = jobs_service.submit({'pytest': 1})
+    assert job.get_status() == JobStatus.QUEUED
+    job = wait_job(jobs_service, job.job_id)
+    assert job.get_status() == JobStatus.DONE
+    assert job.to_json() == {'job_id': job.job_id, 'status': 'DONE', 'result': {'echo': {'pytest': 1}}}
+    jobs_service.shutdown()
+
+
+def test_failed_job(jobs_path):
+    jobs_service = JobsService(failing_solver, max_workers=1, max_queue_size=1, path=jobs_path)
+    job = wait_job(jobs_service, jobs_service.submit({}).job_id)
+    assert job.to_json() == {'job_id': job.job_id, 'status': 'FAILED', 'message': 'pytest_error'}
+    jobs_service.shutdown()
+
+
+def test_get_unknown_job(jobs_path):
+    jobs_service = JobsService(echo_solver, max_workers=1, max_queue_size=1, path=jobs_path)
+    with pytest.raises(JobNotFoundError):
+        jobs_service.get_job('undefined')
+
+
+def test_submit_to_full_queue(jobs_path):
+    jobs_service = JobsService(slow_solver, max_workers=1, max_queue_size=1, path=jobs_path)
+    jobs_service.submit({})
+    jobs_service.submit({})
+    with pytest.raises(JobQueueFullError):
+        jobs_service.submit({})
+    jobs_service.shutdown()
+
+
+def test_old_finished_jobs_are_removed(jobs_path):
+    jobs_service = JobsService(echo_solver, max_workers=1, max_queue_size=1, finished_jobs_retention=1,
+                               path=jobs_path)
+    first_job = wait_job(jobs_service, jobs_service.submit({}).job_id)
+    second_job = wait_job(jobs_service, jobs_service.submit({}).job_id)
+    wait_job(jobs_service, jobs_service.submit({}).job_id)
+    with pytest.raises(JobNotFoundError):
+        jobs_service.get_job(first_job.job_id)
+    assert jobs_service.get_job(second_job.job_id).get_status() == JobStatus.DONE
+    jobs_service.shutdown()
+
+
+def test_jobs_are_shared_by_the_processes(jobs_path):
+    # another API worker process using the same database
+    jobs_service = JobsService(slow_solver, max_workers=1, max_queue_size=1, path=jobs_path)
+    other_jobs_service = JobsService(slow_solver, max_workers=1, max_queue_size=1, path=jobs_path)
+    job = jobs_service.submit({'pytest': 1})
+    assert wait_job(other_jobs_service, job.job_id, JobStatus.RUNNING).get_status() == JobStatus.RUNNING
+    assert wait_job(other_jobs_service, job.job_id).to_json() == {'job_id': job.job_id, 'status': 'DONE',
+                                                                  'result': {'pytest': 1}}
+    jobs_service.shutdown()
+
+
+def test_dead_solver_process(jobs_path):
+    jobs_service = JobsService(crashing_solver, max_workers=1, max_queue_size=1, path=jobs_path)
+    job = wait_job(jobs_service, jobs_service.submit({'crash': True}).job_id)
+    assert job.get_status() == JobStatus.FAILED
+    # the broken pool is replaced
+    job = wait_job(jobs_service, jobs_service.submit({'pytest': 1}).job_id)
+    assert job.to_json() == {'job_id': job.job_id, 'status': 'DONE', 'result': {'pytest': 1}}
+    jobs_service.shutdown()
+
+
+def test_expired_job(jobs_path):
+    jobs_service = JobsService(slow_solver, max_workers=1, max_queue_size=1, path=jobs_path, job_timeout=0)
+    job = jobs_service.get_job(jobs_service.submit({}).job_id)
+    assert job.to_json() == {'job_id': job.job_id, 'status': 'FAILED', 'message': 'Job expired before finishing.'}
+    jobs_service.shutdown()
@@ -1,6 +1,9 @@
 import pytest
 from routing.services.locations import LocationsService
+from routing.services.input_parser import InputParser
 from routing.entities.location import Location, TimeWindow
+from routing.entities.distance_estimation import DistanceEstimation
+from routing.entities.exception import LocationNameError
 
 
 def get_locations_service():
@@ -50,6 +53,37 @@ def test_get_name_from_index_exception_from_invalid_index():
         locations_service.get_name_from_index(len(locations_info))
 
 
+def test_get_location_from_name():
+    locations_info, locations_service = get_locations_service()
+    for index, location_info in enumerate(locations_info):
+        assert locations_service.get_location_from_name(location_info[0]) is locations_service.locations[index]
+
+
+def test_get_location_from_name_exception_from_invalid_name():
+    locations_info, locations_service = get_locations_service()
+    with pytest.raises(LocationNameError):
+        locations_service.get_location_from_name('undefined')
+
+
+def test_depot_copies_name_resolves_to_depot():
+    locations_info, locations_service = get_locations_service()
+    locations_service.add_depot_copies(2)
+    depot_name = locations_info[0][0]
+    assert locations_service.get_node_from_name(depot_name) == locations_service.get_depot_index()
+    assert locations_service.get_unique_nodes() == list(range(len(locations_info)))
+
+
+def test_vehicles_refill_depots():
+    locations_info, locations_service = get_locations_service()
+    locations_service.add_depot_copies(3)
+    assert locations_service.get_vehicle_refill_depots_nodes(1) == [4, 5, 6]
+    locations_service.set_vehicles_refill_depots([2, 0, 1], [5, 10, 3])
+    assert locations_service.refill_depots_vehicles == {4: 0, 5: 0, 6: 2}
+    assert [locations_service.get_demand_by_index(node) for node in (4, 5, 6)] == [-5, -5, -3]
+    assert locations_service.get_vehicle_refill_depots_nodes(0) == [4, 5]
+    assert locations_service.get_vehicle_refill_depots_nodes(1) == []
+
+
 def test_distance_by_index_same_index():
     locations_info, locations_service = get_locations_service()
     for index, location_info in enumerate(locations_info):
@@ -80,7 +114,69 @@ def test_get_location_forbidden_time_window_by_index():
     assert locations_service.get_location_forbidden_time_window_by_index(2)['end'] == []
 
 
+def test_get_location_allowed_range_by_index():
+    _, locations_service = get_locations_service()
+    assert locations_service.get_location_allowed_range_by_index(1) == (8 * 60, 20 * 60)
+    assert locations_service.get_location_allowed_range_by_index(2) == (0, None)
+    locations_service.locations[3].time_windows = [TimeWindow(8 * 60, 12 * 60), TimeWindow(14 * 60, 18 * 60)]
+    locations_service.statistics.clear()
+    assert locations_service.get_location_allowed_range_by_index(3) is None
+
+
 def test_get_demand_by_index():
     _, locations_service = get_locations_service()
     assert locations_service.get_demand_by_index(0) == 0
     assert locations_service.get_demand_by_index(1) == 2
+
+
+def test_get_transit_matrix():
+    _, locations_service = get_locations_service()
+    transit_matrix = locations_service.get_transit_matrix({'truck'})
+    # service time of the origin is added to the distance
+    assert transit_matrix[1][2] == 1 + 10
+    assert transit_matrix[2][1] == 1 + 0
+    assert transit_matrix[0][0] == 0
+    assert transit_matrix[1][3] == LocationsService.infinity + 10
+    assert transit_matrix[3][0] == LocationsService.infinity + 10
+
+
+def test_get_transit_matrix_is_built_once_per_vehicle_types():
+    _, locations_service = get_locations_service()
+    transit_matrix = locations_service.get_transit_matrix({'truck', 'car'})
+    assert locations_service.get_transit_matrix(['car', 'truck']) is transit_matrix
+
+
+def test_distance_matrix_from_shared_matrix(routing_yaml):
+    system_entities = InputParser(routing_yaml).parse()
+    locations_service = LocationsService(system_entities.locations, num_depot_copies=1)
+    # the depot copy is the last node
+    assert locations_service.distance_matrix[1, 4] == locations_service.distance_matrix[1, 0] == 228
+    assert locations_service.distance_matrix[4, 1] == locations_service.distance_matrix[0, 1] == 132
+
+
+def test_estimated_distances(routing_yaml):
+    routing_yaml['distance_estimation'] = {'speeds': {'Moto': 60}, 'default_speed': 30, 'detour_factor': 1}
+    for location_index, location in enumerate(routing_yaml['locations']):
+        location['coordinates'] = {'latitude': -23 + location_index / 10, 'longitude': -43.6}
+        location['accessibility'] = ['Carro', 'Moto']
+    # Ponto Dois has no distances, only the distance from the depot to it is given
+    del routing_yaml['locations'][1]['distances']
+    system_entities = InputParser(routing_yaml).parse()
+    locations_service = LocationsService(system_entities.locations, num_depot_copies=1,
+                                         distance_estimation=system_entities.distance_estimation)
+    assert locations_service.distance_matrix[0, 1] == 132
+    # 0.1 degree of latitude is 11.12 km, 23 minutes at 30 km/h
+    assert locations_service.distance_matrix[1, 0] == locations_service.distance_matrix[1, 4] == 23
+    assert locations_service.distance_matrix[1, 2] == 23
+    # at the speed of the vehicle types, on the transit matrix and on the distance by index
+    assert locations_service.get_distance_by_index({'Moto'}, 1, 0) == 12
+    assert locations_service.get_distance_by_index({'Moto', 'Carro'}, 1, 0) == 12
+    assert locations_service.get_distance_by_index({'Carro'}, 1, 0) == 23
+    assert locations_service.get_transit_matrix({'Carro'})[1, 0] == 23 + routing_yaml['locations'][1]['service_time']
+
+
+def test_distance_estimation_speeds():
+    distance_estimation = DistanceEstimation(speeds={'car': 30, 'bike': 15}, default_speed=20)
+    assert distance_estimation.get_speed(['car']) == 30
+    assert distance_estimation.get_speed(['car', 'bike']) == 15
+    assert distance_estimation.get_speed(['truck']) == 20
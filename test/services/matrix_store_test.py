@@ -0,0 +1,80 @@
+import os
+import numpy
+import pytest
+from routing.services.input_parser import InputParser
+from routing.services.matrix_store import MatrixStore
+from routing.entities.exception import InvalidDistanceMatrixError, MatrixStoreError
+
+
+@pytest.fixture(scope='function')
+def store(tmp_path):
+    store = MatrixStore(str(tmp_path / 'matrix_store.npy'))
+    store.write(numpy.arange(16).reshape(4, 4))
+    return store
+
+
+@pytest.fixture(scope='function')
+def catalogue_yaml(routing_yaml, tmp_path, monkeypatch):
+    """The distances of the locations moved to a store, the catalogue ids are the locations in reverse order."""
+    matrix = InputParser(routing_yaml).parse().locations[0].distance_map.distance_matrix.matrix
+    store = MatrixStore(str(tmp_path / 'catalogue.npy'))
+    store.write(matrix[::-1, ::-1])
+    monkeypatch.setattr('routing.services.input_parser.matrix_store', store)
+    for location_index, location in enumerate(routing_yaml['locations']):
+        location['catalogue_id'] = len(routing_yaml['locations']) - 1 - location_index
+        del location['distances']
+    return routing_yaml
+
+
+def get_distances(system_entities):
+    return [dict(location.distance_map) for location in system_entities.locations]
+
+
+def test_sub_matrix(store):
+    sub_matrix = store.get_sub_matrix([3, 1])
+    assert sub_matrix.tolist() == [[15, 13], [7, 5]]
+    assert sub_matrix.flags.writeable
+    # the store is mapped, not read
+    assert isinstance(store.get_matrix(), numpy.memmap)
+    assert not store.get_matrix().flags.writeable
+
+
+def test_store_is_swapped(store):
+    matrix = store.get_matrix()
+    store.write(numpy.zeros((2, 2), dtype=numpy.int32))
+    assert store.get_matrix().shape == (2, 2)
+    # the old mapping keeps reading the old file
+    assert matrix[3, 3] == 15
+    assert os.listdir(os.path.dirname(store.path)) == ['matrix_store.npy']
+
+
+def test_invalid_store(store, tmp_path):
+    with pytest.raises(InvalidDistanceMatrixError):
+        store.get_sub_matrix([0, 4])
+    with pytest.raises(MatrixStoreError):
+        MatrixStore().get_matrix()
+    with pytest.raises(MatrixStoreError):
+        MatrixStore(str(tmp_path / 'undefined.npy')).get_matrix()
+    with pytest.raises(MatrixStoreError):
+        store.write(numpy.zeros((2, 3)))
+    numpy.save(store.path, numpy.zeros((2, 2)))
+    with pytest.raises(MatrixStoreError):
+        store.get_matrix()
+
+
+def test_catalogue_distances(catalogue_yaml):
+    distances = get_distances(InputParser(catalogue_yaml).parse())
+    assert distances[0] == {'Deposito': 0, 'Ponto Dois': 132, 'Ponto Tres': 78, 'Ponto Quatro': 160}
+    assert distances[2] == {'Ponto Tres': 0, 'Deposito': 69, 'Ponto Dois': 246, 'Ponto Quatro': 120}
+
+
+def test_catalogue_distances_with_locations_distances(catalogue_yaml):
+    # Ponto Dois has no catalogue id, the distances of the location take precedence over the store
+    del catalogue_yaml['locations'][1]['catalogue_id']
+    catalogue_yaml['locations'][1]['distances'] = [{'name': 'Deposito', 'distance': 1}]
+    catalogue_yaml['locations'][2]['distances'] = [{'name': 'Deposito', 'distance': 2}]
+    distances = get_distances(InputParser(catalogue_yaml).parse())
+    assert distances[1] == {'Ponto Dois': 0, 'Deposito': 1}
+    assert distances[2]['Deposito'] == 2
+    assert distances[2]['Ponto Quatro'] == 120
+    assert 'Ponto Dois' not in distances[0]
@@ -1,5 +1,5 @@
 import pytest
-from routing.services.penalty import calc_depot_distance
+from routing.services.penalty import calc_depot_distance, calc_max_route, calc_max_distance, calc_demand_multiplier
 from routing.services.locations import LocationsService
 from routing.entities.location import Location
 from routing.entities.location import TimeWindow
@@ -31,3 +31,29 @@ def test_calc_depot_distance():
 
     depot_penalty = calc_depot_distance(locations_service, location)
     assert depot_penalty == 2 * 2 + 10 + 24 * 60
+
+
+def test_calc_max_route():
+    locations_info, locations_service = get_locations_service()
+    assert calc_max_route(locations_service) == 4 * 2
+
+
+def test_calc_max_route_ignores_depot_copies():
+    locations_info, locations_service = get_locations_service()
+    locations_service.add_depot_copies(2)
+    locations_service.build_distance_matrix()
+    assert calc_max_route(locations_service) == 4 * 2
+
+
+def test_calc_max_distance():
+    locations_info, locations_service = get_locations_service()
+    assert calc_max_distance(locations_service) == 2 * (2 + 10)
+
+
+def test_calc_demand_multiplier_is_computed_once():
+    locations_info, locations_service = get_locations_service()
+    location = locations_service.locations[1]
+    assert calc_demand_multiplier(locations_service, location) == 10 * 2
+    assert locations_service.statistics == {'max_route': 8, 'demand_penalty_param': 10}
+    locations_service.statistics['demand_penalty_param'] = 100
+    assert calc_demand_multiplier(locations_service, location) == 100 * 2
@@ -0,0 +1,54 @@
+import pytest
+from routing.app import solve
+from routing.entities.routing_solution import RoutingSolution, RoutingSolutionStatus
+from routing.entities.search_strategy import SearchStrategy
+from routing.services.input_parser import InputParser
+from routing.services.locations import LocationsService
+from routing.services.portfolio import PortfolioService
+from routing.entities.location import Location, TimeWindow
+
+
+def get_locations_service():
+    depot = Location('test_loc_deposit', ['truck'], [TimeWindow(0 * 60, 24 * 60)], 0, 0, True)
+    return LocationsService(locations=[depot])
+
+
+def get_routing_solution(locations_service: LocationsService, status, objective_cost):
+    routing_solution = RoutingSolution(locations_service)
+    routing_solution.set_status(status, '')
+    routing_solution.objective_cost = objective_cost
+    return routing_solution
+
+
+def test_get_best_solution():
+    locations_service = get_locations_service()
+    solutions = [
+        get_routing_solution(locations_service, RoutingSolutionStatus.SUCCESS, 20),
+        get_routing_solution(locations_service, RoutingSolutionStatus.FAILED, None),
+        get_routing_solution(locations_service, RoutingSolutionStatus.SUCCESS, 10)
+    ]
+    portfolio_service = PortfolioService(solve, None, [])
+    assert portfolio_service.get_best_solution(solutions) is solutions[2]
+
+
+def test_get_best_solution_without_success():
+    locations_service = get_locations_service()
+    solutions = [
+        get_routing_solution(locations_service, RoutingSolutionStatus.FAILED, None),
+        get_routing_solution(locations_service, RoutingSolutionStatus.FAILED, None)
+    ]
+    portfolio_service = PortfolioService(solve, None, [])
+    assert portfolio_service.get_best_solution(solutions) is solutions[0]
+
+
+@pytest.mark.slow
+def test_portfolio_metadata(routing_yaml):
+    routing_yaml['search_time_limit'] = 1
+    system_entities = InputParser(routing_yaml).parse()
+    search_strategies = [SearchStrategy('SAVINGS', 'TABU_SEARCH'), SearchStrategy('PATH_CHEAPEST_ARC')]
+    solution = PortfolioService(solve, system_entities, search_strategies).start()
+    assert solution.status == RoutingSolutionStatus.SUCCESS
+    strategies_metadata = solution.metadata['portfolio']
+    assert [strategy_metadata['first_solution_strategy'] for strategy_metadata in strategies_metadata] == [
+        'SAVINGS', 'PATH_CHEAPEST_ARC']
+    assert solution.objective_cost == min(strategy_metadata['objective_cost'] for strategy_metadata in strategies_metadata)
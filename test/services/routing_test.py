@@ -0,0 +1,90 @@
+import pytest
+from routing.services.input_parser import InputParser
+from routing.services.locations import LocationsService
+from routing.services.vehicles import VehiclesService
+from routing.services.ortools import ORToolsService
+from routing.services.routing import RoutingService
+from routing.entities.routing_solution import RoutingSolutionStatus
+from routing.entities.search_parameters import SearchParameters
+from ortools.util import optional_boolean_pb2
+
+
+def get_routing_service(routing_yaml, initial_routes, vehicles_reloads=None):
+    routing_yaml['max_reload'] = 1
+    system_entities = InputParser(routing_yaml).parse()
+    num_depot_copies = system_entities.max_reload if vehicles_reloads is None else sum(vehicles_reloads)
+    locations_service = LocationsService(system_entities.locations,
+                                         system_entities.penalty_type,
+                                         num_depot_copies)
+    vehicles_service = VehiclesService(system_entities.vehicles)
+    ortools_service = ORToolsService(vehicles_service, locations_service)
+    return RoutingService(locations_service, vehicles_service, ortools_service, 1, initial_routes,
+                          vehicles_reloads=vehicles_reloads)
+
+
+def get_route_names(routing_service, route_indices):
+    return [routing_service.locations_service.get_name_from_index(routing_service.index_manager.IndexToNode(index))
+            for index in route_indices]
+
+
+def test_initial_routes_indices(routing_yaml):
+    initial_routes = {
+        # Lambreta (Moto) has no access to Ponto Dois
+        'Lambreta': ['Deposito', 'Ponto Tres', 'Ponto Dois', 'Deposito', 'Ponto Quatro', 'Deposito'],
+        # Ponto Quatro was already visited by Lambreta
+        'Corsa': ['undefined', 'Ponto Dois', 'Ponto Quatro']
+    }
+    routing_service = get_routing_service(routing_yaml, initial_routes)
+    routes_indices = routing_service.get_initial_routes_indices()
+    assert get_route_names(routing_service, routes_indices[0]) == ['Ponto Tres', 'Deposito', 'Ponto Quatro']
+    assert get_route_names(routing_service, routes_indices[1]) == ['Ponto Dois']
+    # the reload takes the depot copy, not the depot
+    reload_node = routing_service.index_manager.IndexToNode(routes_indices[0][1])
+    assert routing_service.locations_service.get_location_from_index(reload_node).is_clone
+
+
+def test_vehicles_reloads(routing_yaml):
+    initial_routes = {
+        'Lambreta': ['Ponto Tres', 'Deposito', 'Ponto Quatro'],
+        # Corsa has a single depot copy, the second reload is dropped, Ponto Quatro was visited by Lambreta
+        'Corsa': ['Ponto Dois', 'Deposito', 'Deposito', 'Ponto Quatro']
+    }
+    routing_service = get_routing_service(routing_yaml, initial_routes, vehicles_reloads=[1, 1])
+    routes_indices = routing_service.get_initial_routes_indices()
+    lambreta_reload_index = routes_indices[0][1]
+    corsa_reload_index = routes_indices[1][1]
+    assert get_route_names(routing_service, routes_indices[0]) == ['Ponto Tres', 'Deposito', 'Ponto Quatro']
+    assert get_route_names(routing_service, routes_indices[1]) == ['Ponto Dois', 'Deposito']
+    # each vehicle reloads at its own depot copy, the other vehicle can't visit it
+    assert routing_service.index_manager.IndexToNode(lambreta_reload_index) == 4
+    assert routing_service.index_manager.IndexToNode(corsa_reload_index) == 5
+    assert not routing_service.routing_model.VehicleVar(lambreta_reload_index).Contains(1)
+    assert not routing_service.routing_model.VehicleVar(corsa_reload_index).Contains(0)
+    # the copies refill the capacity of their own vehicles, 5 and 3
+    assert routing_service.locations_service.get_demand_by_index(4) == -5
+    assert routing_service.locations_service.get_demand_by_index(5) == -3
+
+
+def test_initial_routes_of_unknown_vehicle(routing_yaml):
+    routing_service = get_routing_service(routing_yaml, {'undefined': ['Ponto Tres']})
+    assert routing_service.get_initial_routes_indices() == [[], []]
+
+
+@pytest.mark.slow
+def test_solve_from_initial_routes(routing_yaml):
+    routing_service = get_routing_service(routing_yaml, {'Lambreta': ['Ponto Tres', 'Ponto Quatro']})
+    routing_service.start()
+    assert routing_service.get_solution().status == RoutingSolutionStatus.SUCCESS
+
+
+def test_search_parameters(routing_yaml):
+    routing_service = get_routing_service(routing_yaml, {})
+    routing_service.search_time_limit = 0.25
+    routing_service.search_parameters = SearchParameters(lns_time_limit=0.02,
+                                                         guided_local_search_lambda_coefficient=0.5,
+                                                         local_search_operators={'use_two_opt': False})
+    search_parameters = routing_service.get_search_parameters()
+    assert search_parameters.time_limit.ToMilliseconds() == 250
+    assert search_parameters.lns_time_limit.ToMilliseconds() == 20
+    assert search_parameters.guided_local_search_lambda_coefficient == 0.5
+    assert search_parameters.local_search_operators.use_two_opt == optional_boolean_pb2.BOOL_FALSE
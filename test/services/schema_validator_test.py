@@ -0,0 +1,43 @@
+import pytest
+from routing.services.schema_validator import SchemaValidator
+from routing.entities.exception import SchemaValidationError
+
+SCHEMA_PATH = './routing/open_api/routing.yaml'
+
+
+@pytest.mark.parametrize('distances_validation', ['full', 'sampled', 'structural'])
+def test_schema_validator_valid_input(routing_yaml, distances_validation):
+    schema_validator = SchemaValidator(SCHEMA_PATH, 'Routing', distances_validation)
+    schema_validator.validate(routing_yaml)
+
+
+@pytest.mark.parametrize('distances_validation', ['full', 'sampled', 'structural'])
+def test_schema_validator_error_path(routing_yaml, distances_validation):
+    schema_validator = SchemaValidator(SCHEMA_PATH, 'Routing', distances_validation)
+    del routing_yaml['locations'][2]['demand']
+    with pytest.raises(SchemaValidationError) as error:
+        schema_validator.validate(routing_yaml)
+    assert error.value.path == ['locations', '2']
+
+
+@pytest.mark.parametrize('distances_validation, raises', [('full', True), ('sampled', True), ('structural', False)])
+def test_schema_validator_distances(routing_yaml, distances_validation, raises):
+    schema_validator = SchemaValidator(SCHEMA_PATH, 'Routing', distances_validation)
+    routing_yaml['locations'][1]['distances'][0]['distance'] = 'far'
+    if not raises:
+        schema_validator.validate(routing_yaml)
+        return
+    with pytest.raises(SchemaValidationError) as error:
+        schema_validator.validate(routing_yaml)
+    assert error.value.path == ['locations', '1', 'distances', '0', 'distance']
+
+
+def test_schema_validator_sampled_distances(routing_yaml):
+    schema_validator = SchemaValidator(SCHEMA_PATH, 'Routing', 'sampled', sample_size=2)
+    # with 4 locations and a sample of 2 only the first and the third are validated
+    routing_yaml['locations'][1]['distances'][0]['distance'] = 'far'
+    schema_validator.validate(routing_yaml)
+    routing_yaml['distance_matrix'] = [[0, 1, 1, 1], [1, 0, 1, 1], [1, 1, 'far', 1], [1, 1, 1, 0]]
+    with pytest.raises(SchemaValidationError) as error:
+        schema_validator.validate(routing_yaml)
+    assert error.value.path == ['distance_matrix', '2', '2']
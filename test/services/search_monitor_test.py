@@ -0,0 +1,58 @@
+import time
+import pytest
+from routing.entities.stopping_criteria import StoppingCriteria
+from routing.services.search_monitor import SearchMonitor, StopReason
+from routing.app import solve
+from routing.services.input_parser import InputParser
+
+
+def get_search_monitor(stopping_criteria, improvements, elapsed_time):
+    search_monitor = SearchMonitor(None, stopping_criteria)
+    search_monitor.start_time = time.perf_counter() - elapsed_time
+    search_monitor.improvement_times = [improvement_time for improvement_time, _ in improvements]
+    search_monitor.improvement_objectives = [objective for _, objective in improvements]
+    return search_monitor
+
+
+@pytest.mark.parametrize('improvements, should_stop', [
+    ([], False),
+    # no time without improvements yet
+    ([(9.5, 100)], False),
+    ([(1, 100), (5, 90)], True),
+    ([(1, 100), (9, 90)], False),
+])
+def test_search_monitor_plateau(improvements, should_stop):
+    search_monitor = get_search_monitor(StoppingCriteria(plateau_time=2), improvements, elapsed_time=10)
+    assert search_monitor.should_stop() == should_stop
+    assert search_monitor.stop_reason == (StopReason.PLATEAU if should_stop else None)
+
+
+def test_search_monitor_plateau_improvement():
+    improvements = [(1, 100), (8.5, 99)]
+    search_monitor = get_search_monitor(StoppingCriteria(plateau_time=2), improvements, elapsed_time=10)
+    assert not search_monitor.should_stop()
+    search_monitor = get_search_monitor(StoppingCriteria(plateau_time=2, plateau_improvement=1),
+                                        improvements, elapsed_time=10)
+    assert search_monitor.should_stop()
+
+
+def test_search_monitor_objective_target():
+    search_monitor = get_search_monitor(StoppingCriteria(objective_target=95), [(1, 100)], elapsed_time=2)
+    assert not search_monitor.should_stop()
+    search_monitor.improvement_objectives.append(90)
+    assert search_monitor.should_stop()
+    assert search_monitor.stop_reason == StopReason.OBJECTIVE_TARGET
+
+
+@pytest.mark.parametrize('stopping_criteria, stop_reason', [
+    ({'solution_limit': 2}, StopReason.SOLUTION_LIMIT),
+    ({'objective_target': 10_000_000}, StopReason.OBJECTIVE_TARGET),
+])
+def test_search_stop_reason(routing_yaml, stopping_criteria, stop_reason):
+    routing_yaml['search_time_limit'] = 10
+    routing_yaml['stopping_criteria'] = stopping_criteria
+    start = time.perf_counter()
+    solution = solve(InputParser(routing_yaml).parse())
+    assert time.perf_counter() - start < 10
+    assert solution.metadata['search']['stop_reason'] == stop_reason
+    assert solution.metadata['search']['time_to_best'] is not None
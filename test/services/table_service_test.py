@@ -0,0 +1,77 @@
+import pytest
+from routing.services.input_parser import InputParser
+from routing.services.locations import LocationsService
+from routing.services.table_service import TableService
+from routing.entities.exception import TableServiceError
+from routing.settings import INFINITY
+from test.table_service_stub import TableServiceStub
+
+COORDINATES = [(-23, -43), (-22, -43), (-23, -41), (-23, -43), (-20, -40)]
+
+
+@pytest.fixture(scope='function')
+def stub():
+    with TableServiceStub(max_table_size=4) as stub:
+        yield stub
+
+
+@pytest.fixture(scope='function')
+def table_service(stub):
+    return TableService(stub.url, tile_size=2, workers=2, cache_size=3)
+
+
+def test_table_matrix(stub, table_service):
+    matrix = table_service.get_matrix(COORDINATES)
+    assert matrix.tolist() == [[0, 1, 2, 0, 6],
+                               [1, 0, 3, 1, 5],
+                               [2, 3, 0, 2, 4],
+                               [0, 1, 2, 0, 6],
+                               [6, 5, 4, 6, 0]]
+    # 4 distinct coordinates in tiles of 2 by 2, the repeated coordinate is fetched once
+    assert len(stub.requests) == 4
+    # the connections are kept alive, at most one per thread
+    assert len({client_address for client_address, _ in stub.requests}) <= 2
+
+
+def test_table_rows_cache(stub, table_service):
+    table_service.get_matrix(COORDINATES[:3])
+    assert len(stub.requests) == 4
+    # every row is cached
+    assert table_service.get_matrix(COORDINATES[2::-1]).tolist() == [[0, 3, 2], [3, 0, 1], [2, 1, 0]]
+    assert len(stub.requests) == 4
+    # the cached rows miss the new destination, they are fetched again and the least recently used is dropped
+    table_service.get_matrix(COORDINATES[1:])
+    assert len(stub.requests) == 8
+    assert list(table_service.rows) == [(-23, -41), (-22, -43), (-20, -40)]
+
+
+def test_table_errors(stub):
+    assert TableService(stub.url, tile_size=1).get_matrix([(0, 0), (90, 0)]).tolist() == [[0, INFINITY],
+                                                                                           [INFINITY, 0]]
+    with pytest.raises(TableServiceError):
+        TableService(stub.url, tile_size=3).get_matrix(COORDINATES)
+    with pytest.raises(TableServiceError):
+        TableService().get_matrix(COORDINATES)
+    stub.shutdown()
+    stub.server_close()
+    with pytest.raises(TableServiceError):
+        TableService(stub.url, timeout=1).get_matrix(COORDINATES)
+
+
+def test_table_distances(routing_yaml, table_service, monkeypatch):
+    monkeypatch.setattr('routing.services.locations.table_service', table_service)
+    routing_yaml['distance_estimation'] = {'method': 'table', 'speeds': {'Moto': 60}}
+    for location, (latitude, longitude) in zip(routing_yaml['locations'], COORDINATES):
+        location['coordinates'] = {'latitude': latitude, 'longitude': longitude}
+        location['accessibility'] = ['Carro', 'Moto']
+    # Ponto Dois has no distances, only the distance from the depot to it is given
+    del routing_yaml['locations'][1]['distances']
+    system_entities = InputParser(routing_yaml).parse()
+    locations_service = LocationsService(system_entities.locations, num_depot_copies=1,
+                                         distance_estimation=system_entities.distance_estimation)
+    assert locations_service.distance_matrix[0, 1] == 132
+    assert locations_service.distance_matrix[1, 0] == locations_service.distance_matrix[1, 4] == 1
+    assert locations_service.distance_matrix[1, 2] == 3
+    # the road travel times are the same for every vehicle type
+    assert locations_service.get_distance_by_index({'Moto'}, 1, 2) == 3
+    assert locations_service.get_transit_matrix({'Carro'})[1, 2] == 3 + routing_yaml['locations'][1]['service_time']
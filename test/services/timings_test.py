@@ -0,0 +1,27 @@
+from routing.services.timings import Timings, TimingsHistograms
+
+
+def test_timings_sum_repeated_phases():
+    timings = Timings()
+    timings.add('parse', 1.5)
+    timings.update({'parse': 0.5, 'search': 2})
+    with timings.measure('verify'):
+        pass
+    assert timings.phases['parse'] == 2
+    assert timings.phases['search'] == 2
+    assert list(timings.to_json()) == ['parse', 'search', 'verify']
+
+
+def test_timings_histograms_to_prometheus():
+    timings_histograms = TimingsHistograms('routing_phase_seconds', [1, 0.1])
+    timings_histograms.observe({'search': 0.5})
+    timings_histograms.observe({'search': 2})
+    lines = timings_histograms.to_prometheus().splitlines()
+    assert lines[1] == '# TYPE routing_phase_seconds histogram'
+    assert lines[2:] == [
+        'routing_phase_seconds_bucket{phase="search",le="0.1"} 0',
+        'routing_phase_seconds_bucket{phase="search",le="1"} 1',
+        'routing_phase_seconds_bucket{phase="search",le="+Inf"} 2',
+        'routing_phase_seconds_sum{phase="search"} 2.5',
+        'routing_phase_seconds_count{phase="search"} 2',
+    ]
@@ -0,0 +1,32 @@
+from routing.entities.location import TimeWindow
+import numpy
+from routing.services.utils import get_forbidden_ranges, get_haversine_matrix, get_equirectangular_matrix
+
+
+def test_get_forbidden_ranges():
+    time_windows = [
+        [TimeWindow(0, 24 * 60)],
+        [TimeWindow(8 * 60, 12 * 60), TimeWindow(14 * 60, 18 * 60)],
+        [],
+    ]
+    assert get_forbidden_ranges(time_windows, 24 * 60) == [
+        {'start': [], 'end': []},
+        {'start': [0, 12 * 60 + 1, 18 * 60 + 1], 'end': [8 * 60 - 1, 14 * 60 - 1, 24 * 60]},
+        {'start': [0], 'end': [24 * 60]},
+    ]
+
+
+def test_get_forbidden_ranges_merges_windows():
+    # unordered, overlapping, adjacent and out of the day time windows
+    time_windows = [[TimeWindow(600, 700), TimeWindow(-10, 100), TimeWindow(650, 800), TimeWindow(801, 900),
+                     TimeWindow(1400, 1600), TimeWindow(2000, 2100)]]
+    assert get_forbidden_ranges(time_windows, 24 * 60) == [{'start': [101, 901], 'end': [599, 1399]}]
+
+
+def test_coordinates_distance_matrices():
+    coordinates = numpy.array([(-23, -43.6), (-22, -43.6), (-23, -42.6)])
+    haversine_matrix = get_haversine_matrix(coordinates, 6371)
+    # a degree of latitude is 111.2 km, a degree of longitude is shorter away from the equator
+    assert numpy.allclose(haversine_matrix[0], [0, 111.19, 102.35], atol=0.01)
+    assert numpy.allclose(haversine_matrix, haversine_matrix.T)
+    assert numpy.allclose(get_equirectangular_matrix(coordinates, 6371), haversine_matrix, rtol=1e-3)
@@ -1,6 +1,7 @@
 import pytest
-from routing.services.vehicles import VehiclesService
+from routing.services.vehicles import VehiclesService, BreakType
 from routing.entities.vehicle import Vehicle
+from routing.entities.location import Location
 
 
 def get_vechicles_service():
@@ -36,3 +37,42 @@ def test_get_vehicle_max_load_weight_by_index():
 def test_get_vehicles_max_load_weights():
     vehicles_info, vehicles_service = get_vechicles_service()
     assert vehicles_service.get_vehicles_max_load_weights() == [3, 0]
+
+
+def test_get_vehicles_reloads():
+    locations = [Location('depot', ['truck', 'car'], [], 0, 0, True),
+                 Location('A', ['truck'], [], 2, 0, False),
+                 Location('B', ['truck', 'car'], [], 4, 0, False)]
+    vehicles_service = VehiclesService([Vehicle('truck', 6, ['truck']),
+                                        Vehicle('small truck', 1, ['truck']),
+                                        Vehicle('car', 2, ['car']),
+                                        Vehicle('empty car', 0, ['car'])])
+    # the truck carries the whole demand at once, the small truck makes at most 11 trips, the car at most 3
+    assert vehicles_service.get_vehicles_reloads(locations, 5) == [0, 5, 2, 0]
+    assert vehicles_service.get_vehicles_reloads(locations, 0) == [0, 0, 0, 0]
+
+
+def test_get_vehicles_indices_by_types():
+    vehicles = [
+        Vehicle('test_truck_1', 3, ['truck']),
+        Vehicle('test_car', 1, ['car']),
+        Vehicle('test_truck_2', 3, ['truck']),
+        Vehicle('test_van', 2, ['truck', 'car']),
+        Vehicle('test_van_2', 2, ['car', 'truck'])
+    ]
+    vehicles_service = VehiclesService(vehicles)
+    assert vehicles_service.get_vehicles_indices_by_types() == {
+        frozenset(['truck']): [0, 2],
+        frozenset(['car']): [1],
+        frozenset(['truck', 'car']): [3, 4]
+    }
+
+
+def test_add_new_break_to_vehicle():
+    _, vehicles_service = get_vechicles_service()
+    lunch_break = vehicles_service.add_new_break_to_vehicle(1, BreakType.LUNCH, 660, 780, 60)
+    short_break = vehicles_service.add_new_break_to_vehicle(0, BreakType.SHORT, 570, 630, 15)
+    assert [lunch_break.get_break_id(), short_break.get_break_id()] == [0, 1]
+    assert vehicles_service.get_break_from_id(0) == (1, lunch_break)
+    assert vehicles_service.get_break_from_id(1) == (0, short_break)
+    assert vehicles_service.get_vehicle_breaks_from_index(1).get_lunch_break() is lunch_break
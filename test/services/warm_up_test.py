@@ -0,0 +1,11 @@
+from routing.app import warm_up, warm_up_done, solution_cache, timings_histograms
+
+
+def test_warm_up():
+    cache_size = len(solution_cache.memory)
+    counts = dict(timings_histograms.counts)
+    warm_up()
+    assert warm_up_done.is_set()
+    # the warm up is not a request
+    assert len(solution_cache.memory) == cache_size
+    assert timings_histograms.counts == counts
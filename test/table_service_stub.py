@@ -0,0 +1,63 @@
+"""Local stand-in of an OSRM table service. The duration between two coordinates is one minute per degree of
+   latitude plus longitude, the coordinates at latitude 90 can't be reached."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+def get_duration(source, destination):
+    if 90 in (source[1], destination[1]) and source != destination:
+        return None
+    return 60 * (abs(source[0] - destination[0]) + abs(source[1] - destination[1]))
+
+
+class TableHandler(BaseHTTPRequestHandler):
+    # keep-alive
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.server.requests.append((self.client_address, url.path))
+        coordinates = [tuple(map(float, coordinate.split(','))) for coordinate in url.path.split('/')[-1].split(';')]
+        query = parse_qs(url.query)
+        sources = [coordinates[int(index)] for index in query['sources'][0].split(';')]
+        destinations = [coordinates[int(index)] for index in query['destinations'][0].split(';')]
+        if len(coordinates) > self.server.max_table_size:
+            status, response = 400, {'code': 'TooBig', 'message': 'Too many table coordinates'}
+        else:
+            status, response = 200, {'code': 'Ok', 'durations': [[get_duration(source, destination)
+                                                                   for destination in destinations]
+                                                                  for source in sources]}
+        body = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TableServiceStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, max_table_size=100):
+        super().__init__(('127.0.0.1', 0), TableHandler)
+        self.max_table_size = max_table_size
+        # (client address, path) of every request
+        self.requests = []
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()